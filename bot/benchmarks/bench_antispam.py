@@ -0,0 +1,88 @@
+import random
+from types import SimpleNamespace
+from config import Config
+from cogs.antispam import AntiSpamCog
+from utils.antispam import AntiSpamEngine, SpamThresholds
+from utils.guild_config import GuildConfigService
+from benchmarks.common import measure
+
+GUILD_ID = 200000000000000000
+BATCH = 1000
+
+def stub_messages(count: int, users: int, channels: int, seed: int = 7) -> list:
+    """Stand-ins for discord.Message with a realistic mix of plain text, mentions and links"""
+    rng = random.Random(seed)
+    guild = SimpleNamespace(id=GUILD_ID)
+    channel_list = [SimpleNamespace(id=GUILD_ID + 1000 + i) for i in range(channels)]
+    texts = ["hello", "lol", "anyone up for a game?", "check https://example.com/page", "ok", "gg wp"]
+    messages = []
+    for i in range(count):
+        mentioned = [SimpleNamespace(id=1)] if rng.random() < 0.1 else []
+        messages.append(SimpleNamespace(
+            guild=guild,
+            channel=rng.choice(channel_list),
+            author=SimpleNamespace(id=GUILD_ID + 10 ** 6 + rng.randrange(users), bot=False),
+            content=f"{rng.choice(texts)} {i % 50}",
+            mentions=mentioned,
+            role_mentions=[],
+            mention_everyone=False
+        ))
+    return messages
+
+async def bench_antispam(iterations: int) -> dict:
+    """Messages/sec through the sliding-window engine and the cog's on_message handler"""
+    results = {}
+    # Limits high enough that ordinary traffic never trips them, so only the counting path is timed
+    relaxed = SpamThresholds(10 ** 6, 10 ** 6, 10 ** 6, 10 ** 6, 10 ** 6, 10 ** 6)
+    messages = stub_messages(BATCH * 20, users=10000, channels=200)
+    
+    engine = AntiSpamEngine(max_users=50000)
+    clock = [0.0]
+    
+    async def check(i):
+        # 1000 messages per simulated second, so buckets roll over as they would live
+        clock[0] += 1.0
+        start = (i % 20) * BATCH
+        for message in messages[start:start + BATCH]:
+            engine.check(message.guild.id, message.channel.id, message.author.id, message.content,
+                         len(message.mentions), 0, relaxed, clock[0])
+    
+    results["antispam.engine.check[10k_users]"] = await measure(check, iterations, ops_per_call=BATCH)
+    
+    # Twice as many active members as the LRU holds, so every batch evicts
+    churn_messages = stub_messages(BATCH * 20, users=100000, channels=200, seed=11)
+    churn_engine = AntiSpamEngine(max_users=50000)
+    
+    async def churn(i):
+        start = (i % 20) * BATCH
+        for message in churn_messages[start:start + BATCH]:
+            churn_engine.check(message.guild.id, message.channel.id, message.author.id, message.content,
+                               len(message.mentions), 0, relaxed, float(i))
+    
+    results["antispam.engine.check[100k_users,lru_evicting]"] = await measure(churn, iterations, ops_per_call=BATCH)
+    
+    # One member repeating a link-and-mention message: every limit trips on every message
+    strict = SpamThresholds(5, 5, 5, 3, 40, 150)
+    flood_engine = AntiSpamEngine()
+    
+    async def flood(i):
+        for _ in range(BATCH):
+            flood_engine.check(GUILD_ID, 1, 2, "join https://spam.example @everyone", 3, 1, strict, float(i))
+    
+    results["antispam.engine.check[flood]"] = await measure(flood, iterations, ops_per_call=BATCH)
+    
+    # The full listener: thresholds from the settings cache, mention/link extraction and counting
+    guild_config = GuildConfigService(None, Config)
+    guild_config.cache[str(GUILD_ID)] = {'antispam': 'on'}
+    guild_config.cache[str(GUILD_ID)].update(
+        {f'antispam:{name}': str(10 ** 6) for name in SpamThresholds._fields}
+    )
+    cog = AntiSpamCog(SimpleNamespace(config=Config, guild_config=guild_config))
+    
+    async def handler(i):
+        start = (i % 20) * BATCH
+        for message in messages[start:start + BATCH]:
+            await cog.on_message(message)
+    
+    results["antispam.on_message[handler]"] = await measure(handler, iterations, ops_per_call=BATCH)
+    return results
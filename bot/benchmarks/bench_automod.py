@@ -0,0 +1,73 @@
+import random
+import re
+from utils.keyword_filter import KeywordMatcher
+from benchmarks.common import measure
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ra', 'zu', 'te', 'no', 'shi', 'vel', 'dor', 'an', 'ex', 'qua', 'bri']
+
+def stub_terms(count: int, seed: int = 3) -> tuple:
+    """Made-up blocked words and domains that never appear in the generated messages"""
+    rng = random.Random(seed)
+    words, domains = set(), set()
+    while len(words) < count:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) + 'x')
+    while len(domains) < count // 4:
+        domains.add(''.join(rng.choice(SYLLABLES) for _ in range(3)) + rng.choice(['.com', '.gg', '.ru']))
+    return sorted(words), sorted(domains)
+
+def stub_message(length: int, seed: int = 5) -> str:
+    """Ordinary chat text of roughly length characters, with a link and some punctuation"""
+    rng = random.Random(seed)
+    words = ['hello', 'anyone', 'playing', 'tonight', 'check', 'this', 'out', 'lol', 'gg', 'the', 'ranked',
+             'https://example.com/clip', 'okay!', 'what', 'about', 'Café', 'tomorrow?']
+    parts, size = [], 0
+    while size < length:
+        part = rng.choice(words)
+        parts.append(part)
+        size += len(part) + 1
+    return ' '.join(parts)[:length]
+
+def regex_baseline(words: list, domains: list):
+    """What the filter would cost without the automaton: one compiled regex per term, tried in turn"""
+    patterns = [re.compile(rf'\b{re.escape(word)}\b', re.IGNORECASE) for word in words]
+    patterns += [re.compile(rf'(?<![\w-]){re.escape(domain)}\b', re.IGNORECASE) for domain in domains]
+    return lambda text: [pattern for pattern in patterns if pattern.search(text)]
+
+async def bench_automod(iterations: int) -> dict:
+    """Filter cost as message length and the number of blocked terms grow"""
+    results = {}
+    words, domains = stub_terms(1000)
+    matcher = KeywordMatcher(words, domains)
+    
+    # Linear in the message: doubling the length should roughly double the time, whatever the term count
+    for length in (100, 500, 2000):
+        text = stub_message(length)
+        results[f"automod.search.length[{length}_chars,1250_terms]"] = await measure(
+            lambda i: _run(matcher.search, text), iterations, ops_per_call=100
+        )
+    
+    # Near-flat in the number of terms, which is where per-term regexes fall over
+    text = stub_message(500)
+    for count in (10, 100, 1000):
+        few_words, few_domains = stub_terms(count)
+        automaton = KeywordMatcher(few_words, few_domains)
+        results[f"automod.search.terms[500_chars,{count + count // 4}_terms]"] = await measure(
+            lambda i: _run(automaton.search, text), iterations, ops_per_call=100
+        )
+        baseline = regex_baseline(few_words, few_domains)
+        results[f"automod.regex_baseline[500_chars,{count + count // 4}_terms]"] = await measure(
+            lambda i: _run(baseline, text), max(5, iterations // 10), ops_per_call=100
+        )
+    
+    # Compiling happens only when a server's list changes
+    results["automod.compile[1250_terms]"] = await measure(
+        lambda i: _build(words, domains), max(5, iterations // 10)
+    )
+    return results
+
+async def _run(search, text: str):
+    for _ in range(100):
+        search(text)
+
+async def _build(words: list, domains: list):
+    KeywordMatcher(words, domains)
@@ -0,0 +1,120 @@
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+from database import Database
+from benchmarks.common import measure
+
+GUILD_ID = "100000000000000000"
+CHANNEL_COUNT = 50
+
+async def bench_is_whitelisted(db: Database, role_counts: list, iterations: int) -> dict:
+    """Benchmark is_whitelisted as the number of member roles grows"""
+    results = {}
+    
+    # Seed a realistically sized whitelist for the guild
+    for i in range(200):
+        await db.add_to_whitelist('role', str(900000 + i), GUILD_ID, ['snipe', 'drag'], "1")
+    await db.add_to_whitelist('user', "42", GUILD_ID, ['*'], "1")
+    
+    for role_count in role_counts:
+        role_ids = [str(500000 + i) for i in range(role_count)]
+        
+        # Worst case: only the last role is whitelisted
+        hit_roles = role_ids[:-1] + ["900199"] if role_ids else []
+        
+        async def hit(_, roles=hit_roles):
+            await db.is_whitelisted("7", roles, GUILD_ID)
+        
+        async def miss(_, roles=role_ids):
+            await db.is_whitelisted("7", roles, GUILD_ID)
+        
+        results[f"db.is_whitelisted[roles={role_count},last_role_hit]"] = await measure(hit, iterations)
+        results[f"db.is_whitelisted[roles={role_count},miss]"] = await measure(miss, iterations)
+    
+    async def user_hit(_):
+        await db.is_whitelisted("42", [], GUILD_ID)
+    
+    results["db.is_whitelisted[user_hit]"] = await measure(user_hit, iterations)
+    return results
+
+async def bench_add_to_whitelist(db: Database, count: int) -> dict:
+    """Benchmark adding many whitelist entries back to back"""
+    async def add(i):
+        await db.add_to_whitelist('user', str(1000000 + i), GUILD_ID, ['snipe'], "1")
+    
+    return {f"db.add_to_whitelist[bulk={count}]": await measure(add, count, warmup=0)}
+
+async def bench_writes(db: Database, iterations: int, concurrency: int) -> dict:
+    """Benchmark the deleted message and command log write paths"""
+    results = {}
+    
+    async def store(i):
+        await db.store_deleted_message(
+            str(i), str(i % CHANNEL_COUNT), GUILD_ID, "7", f"benchmark message {i}", []
+        )
+    
+    async def log(i):
+        await db.log_command(GUILD_ID, str(i % CHANNEL_COUNT), "7", "snipe", "", True, None)
+    
+    results["db.store_deleted_message[sequential]"] = await measure(store, iterations)
+    results["db.log_command[sequential]"] = await measure(log, iterations)
+    
+    async def store_concurrent(i):
+        await asyncio.gather(*(store(i * concurrency + n) for n in range(concurrency)))
+    
+    async def log_concurrent(i):
+        await asyncio.gather(*(log(i * concurrency + n) for n in range(concurrency)))
+    
+    batches = max(1, iterations // concurrency)
+    results[f"db.store_deleted_message[concurrency={concurrency}]"] = await measure(
+        store_concurrent, batches, warmup=1, ops_per_call=concurrency
+    )
+    results[f"db.log_command[concurrency={concurrency}]"] = await measure(
+        log_concurrent, batches, warmup=1, ops_per_call=concurrency
+    )
+    return results
+
+def populate_deleted_messages(db_path: str, start: int, end: int):
+    """Bulk insert deleted_messages rows [start, end) directly, bypassing the bot code path"""
+    base_time = datetime(2024, 1, 1)
+    
+    def rows():
+        for i in range(start, end):
+            deleted_at = (base_time + timedelta(seconds=i)).strftime('%Y-%m-%d %H:%M:%S')
+            yield (
+                str(i), str(i % CHANNEL_COUNT), GUILD_ID, str(i % 997),
+                f"seeded message {i}", deleted_at, '[]'
+            )
+    
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.executemany('''
+            INSERT INTO deleted_messages (message_id, channel_id, guild_id, author_id, content, deleted_at, attachments)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows())
+        conn.commit()
+    finally:
+        conn.close()
+
+async def bench_get_last_deleted_message(db: Database, row_counts: list, iterations: int) -> dict:
+    """Benchmark snipe lookups as deleted_messages grows"""
+    results = {}
+    
+    conn = sqlite3.connect(db.db_path)
+    populated = conn.execute('SELECT COUNT(*) FROM deleted_messages').fetchone()[0]
+    conn.close()
+    
+    for row_count in sorted(row_counts):
+        if row_count > populated:
+            print(f"  seeding deleted_messages to {row_count:,} rows...")
+            populate_deleted_messages(db.db_path, populated, row_count)
+            populated = row_count
+        
+        async def lookup(i):
+            await db.get_last_deleted_message(str(i % CHANNEL_COUNT))
+        
+        # Large tables are slow to scan; keep total runtime bounded
+        runs = iterations if row_count <= 100000 else max(5, iterations // 20)
+        results[f"db.get_last_deleted_message[rows={row_count}]"] = await measure(lookup, runs, warmup=2)
+    
+    return results
@@ -0,0 +1,44 @@
+from database import Database
+from utils.permissions import PermissionManager
+from benchmarks.common import measure, stub_member, stub_context
+
+GUILD_ID = 200000000000000000
+
+async def bench_check_whitelist(db: Database, role_counts: list, iterations: int) -> dict:
+    """Benchmark PermissionManager.check_whitelist with stub Context objects"""
+    results = {}
+    manager = PermissionManager(db)
+    owner = stub_member(1)
+    
+    await db.add_to_whitelist('role', "800000", str(GUILD_ID), ['snipe', 'drag', 'view_logs'], "1")
+    await db.add_to_whitelist('user', "43", str(GUILD_ID), ['*'], "1")
+    
+    admin_ctx = stub_context(stub_member(2, administrator=True), GUILD_ID, owner)
+    
+    async def admin(_):
+        await manager.check_whitelist(admin_ctx, ['snipe'])
+    
+    results["perms.check_whitelist[administrator]"] = await measure(admin, iterations)
+    
+    user_ctx = stub_context(stub_member(43), GUILD_ID, owner)
+    
+    async def user(_):
+        await manager.check_whitelist(user_ctx, ['snipe'])
+    
+    results["perms.check_whitelist[user_wildcard]"] = await measure(user, iterations)
+    
+    for role_count in role_counts:
+        roles = [700000 + i for i in range(role_count)]
+        granted_ctx = stub_context(stub_member(3, roles[:-1] + [800000] if roles else []), GUILD_ID, owner)
+        denied_ctx = stub_context(stub_member(4, roles), GUILD_ID, owner)
+        
+        async def granted(_, ctx=granted_ctx):
+            await manager.check_whitelist(ctx, ['snipe', 'drag'])
+        
+        async def denied(_, ctx=denied_ctx):
+            await manager.check_whitelist(ctx, ['snipe'])
+        
+        results[f"perms.check_whitelist[roles={role_count},granted]"] = await measure(granted, iterations)
+        results[f"perms.check_whitelist[roles={role_count},denied]"] = await measure(denied, iterations)
+    
+    return results
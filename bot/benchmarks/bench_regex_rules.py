@@ -0,0 +1,32 @@
+import asyncio
+from utils.regex_rules import RegexRuleEngine
+from benchmarks.common import measure
+from benchmarks.bench_automod import stub_message
+
+GUILD_ID = 200000000000000000
+BATCH = 500
+RULES = tuple(enumerate([
+    r'free\s+nitro', r'discord\.gift/\w+', r'steam\s*community\.\w+', r'(?:claim|get)\s+your\s+prize',
+    r'\b\d{16}\b', r'@everyone\s+https?://', r'(.)\1{15,}', r'nudes?\b', r'[Ѐ-ӿ]{3,}\w*\.com',
+    r'bit\.ly/\w+'
+], start=1))
+
+async def bench_regex_rules(iterations: int) -> dict:
+    """Messages/sec through the worker-process regex engine, batched and one message per batch"""
+    results = {}
+    messages = [stub_message(80 + i % 400, seed=i) for i in range(BATCH)]
+    
+    for batch_size in (50, 1):
+        engine = RegexRuleEngine(workers=2, batch_size=batch_size, batch_delay=0.005)
+        
+        async def check(i):
+            await asyncio.gather(*(engine.check(GUILD_ID, RULES, message) for message in messages))
+        
+        try:
+            # A few extra warmup rounds absorb worker start-up
+            results[f"regex_rules.check[10_rules,batch_{batch_size}]"] = await measure(
+                check, max(5, iterations // 10), warmup=3, ops_per_call=BATCH
+            )
+        finally:
+            await engine.stop()
+    return results
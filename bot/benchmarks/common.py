@@ -0,0 +1,128 @@
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+def percentile(samples: list, pct: float) -> float:
+    """Return the pct-th percentile of a list of samples"""
+    if not samples:
+        return 0.0
+    
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(samples: list, ops_per_sample: int = 1) -> dict:
+    """Summarize a list of per-sample durations (seconds) into a result dict"""
+    total = sum(samples)
+    return {
+        "iterations": len(samples),
+        "ops_per_sec": round((len(samples) * ops_per_sample) / total, 2) if total else 0.0,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p95_ms": round(percentile(samples, 95) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "max_ms": round(max(samples) * 1000, 4) if samples else 0.0
+    }
+
+async def measure(func, iterations: int, warmup: int = 5, ops_per_call: int = 1) -> dict:
+    """Time an async callable; func receives the iteration index"""
+    for i in range(warmup):
+        await func(i)
+    
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await func(warmup + i)
+        samples.append(time.perf_counter() - start)
+    
+    return summarize(samples, ops_per_call)
+
+def git_revision() -> str:
+    """Get the current git revision, if available"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return "unknown"
+
+def run_metadata() -> dict:
+    """Describe the environment a benchmark run was made in"""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+def write_results(path: str, results: dict, extra_meta: dict = None):
+    """Write benchmark results as JSON"""
+    meta = run_metadata()
+    if extra_meta:
+        meta.update(extra_meta)
+    
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, sort_keys=True)
+
+def compare_results(baseline_path: str, results: dict, threshold: float = 0.10) -> list:
+    """Compare results against a baseline file and return the regressions found"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get("results", {})
+    
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        
+        old = baseline[name].get("mean_ms")
+        new = results[name].get("mean_ms")
+        if not old or new is None:
+            continue
+        
+        change = (new - old) / old
+        flag = ""
+        if change > threshold:
+            regressions.append({"name": name, "baseline_ms": old, "current_ms": new, "change": round(change, 4)})
+            flag = "  ⚠️"
+        print(f"{name:<55} {old:>10.4f}ms {new:>10.4f}ms {change:>+8.1%}{flag}")
+    
+    return regressions
+
+def stub_member(member_id: int, role_ids: list = None, administrator: bool = False):
+    """Build a minimal stand-in for discord.Member"""
+    return SimpleNamespace(
+        id=member_id,
+        roles=[SimpleNamespace(id=role_id) for role_id in (role_ids or [])],
+        guild_permissions=SimpleNamespace(administrator=administrator)
+    )
+
+def stub_context(author, guild_id: int = 1, owner=None):
+    """Build a minimal stand-in for commands.Context"""
+    guild = SimpleNamespace(id=guild_id, owner=owner)
+    return SimpleNamespace(author=author, guild=guild)
+
+def print_results(results: dict):
+    """Print a results table to the console"""
+    print(f"\n{'benchmark':<55} {'ops/sec':>12} {'mean':>10} {'p95':>10} {'p99':>10}")
+    for name in sorted(results):
+        result = results[name]
+        print(
+            f"{name:<55} {result['ops_per_sec']:>12,.1f} "
+            f"{result['mean_ms']:>8.3f}ms {result['p95_ms']:>8.3f}ms {result['p99_ms']:>8.3f}ms"
+        )
+    sys.stdout.flush()
@@ -0,0 +1,130 @@
+"""Stand-in HTTP and gateway layers for running SecurityBot offline.
+
+The real cogs, database and file logger are used unchanged; only the
+transport underneath discord.py is replaced so events can be fed straight
+into the connection state's gateway parsers.
+"""
+import asyncio
+import time
+import traceback
+from collections import defaultdict
+import discord
+from discord.http import HTTPClient
+from bot import SecurityBot
+from benchmarks.payloads import BOT_USER_ID, APPLICATION_ID, snowflake, user_payload, message_payload
+
+class StubHTTPClient(HTTPClient):
+    """HTTP client that answers every route locally and records the traffic"""
+    
+    def __init__(self, loop, latency: float = 0.0):
+        super().__init__(loop)
+        self.latency = latency
+        self.requests = defaultdict(int)
+        self.request_bytes = 0
+        self._ids = 0
+    
+    def _next_id(self) -> int:
+        self._ids += 1
+        return snowflake(self._ids)
+    
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        self.requests[f"{route.method} {route.path}"] += 1
+        payload = kwargs.get('json') or {}
+        self.request_bytes += len(discord.utils._to_json(payload)) if payload else 0
+        
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        if route.method == 'POST' and route.path == '/channels/{channel_id}/messages':
+            if form:
+                payload = discord.utils._from_json(next(
+                    (part['value'] for part in form if part.get('name') == 'payload_json'), '{}'
+                ))
+            return message_payload(
+                self._next_id(), route.channel_id, user_payload(BOT_USER_ID, "SecurityBot", bot=True),
+                payload.get('content') or "", embeds=payload.get('embeds')
+            )
+        if route.method == 'PUT' and route.path.endswith('/commands'):
+            return []
+        if route.method == 'GET' and route.path == '/users/@me':
+            return user_payload(BOT_USER_ID, "SecurityBot", bot=True)
+        return {}
+    
+    async def close(self):
+        pass
+
+class StubGateway:
+    """Minimal stand-in for DiscordWebSocket"""
+    open = True
+    latency = 0.0
+    
+    async def change_presence(self, **kwargs):
+        pass
+    
+    async def close(self, code: int = 1000):
+        self.open = False
+
+class HarnessBot(SecurityBot):
+    """SecurityBot wired to the stub transport, timing every event handler"""
+    
+    def __init__(self, http_latency: float = 0.0):
+        super().__init__()
+        self.handler_timings = defaultdict(list)
+        self.handler_errors = defaultdict(int)
+        self.handler_error_samples = {}
+        self.pending_handlers = set()
+        self._http_latency = http_latency
+    
+    async def start_offline(self):
+        """Run the normal startup path against the stub transport"""
+        await self._async_setup_hook()
+        
+        if self.config.DISCORD_API_BASE:
+            # Real HTTP client talking to a local REST stand-in (benchmarks.mock_discord)
+            user_data = await self.http.static_login('mock-token')
+        else:
+            self.http = StubHTTPClient(self.loop, self._http_latency)
+            self._connection.http = self.http
+            self.tree._http = self.http
+            # The stub answers every route with an empty body, which can't stand in for webhooks
+            self.log_router.webhooks_enabled = False
+            user_data = user_payload(BOT_USER_ID, "SecurityBot", bot=True)
+        
+        self._connection._chunk_guilds = False
+        self._connection.guild_ready_timeout = 0.05
+        self._connection.user = discord.ClientUser(state=self._connection, data=user_data)
+        self._connection.application_id = APPLICATION_ID
+        self.ws = StubGateway()
+        
+        await self.setup_hook()
+    
+    def feed(self, event_type: str, data: dict):
+        """Feed one gateway dispatch into the connection state"""
+        self._connection.parsers[event_type](data)
+    
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            await coro(*args, **kwargs)
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            self.handler_errors[event_name] += 1
+            self.handler_error_samples.setdefault(event_name, traceback.format_exc())
+            try:
+                await self.on_error(event_name, *args, **kwargs)
+            except asyncio.CancelledError:
+                pass
+        finally:
+            self.handler_timings[event_name].append(time.perf_counter() - start)
+    
+    def _schedule_event(self, coro, event_name, *args, **kwargs):
+        task = super()._schedule_event(coro, event_name, *args, **kwargs)
+        self.pending_handlers.add(task)
+        task.add_done_callback(self.pending_handlers.discard)
+        return task
+    
+    async def drain(self):
+        """Wait until every scheduled handler has finished"""
+        while self.pending_handlers:
+            await asyncio.gather(*list(self.pending_handlers), return_exceptions=True)
@@ -0,0 +1,350 @@
+"""Local stand-in for the Discord REST API with configurable rate limits.
+
+Implements the endpoints the bot uses and enforces per-route and global
+rate-limit buckets, answering with Discord's rate-limit headers and 429
+bodies so discord.py's own limiter reacts exactly as it would in production.
+
+Run standalone from the bot directory and point the bot at it:
+
+    python -m benchmarks.mock_discord --port 8090 --bucket "POST /channels/{channel_id}/messages=5/5"
+    DISCORD_API_BASE=http://127.0.0.1:8090/api/v10
+
+Only REST is emulated; there is no gateway, so drive the bot with the
+offline harness (benchmarks.replay --mock-rest, benchmarks.rate_limits).
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import time
+from collections import defaultdict
+from aiohttp import web
+from benchmarks.payloads import (
+    BOT_USER_ID, APPLICATION_ID, snowflake, user_payload, member_payload, message_payload,
+    channel_payload, role_payload
+)
+
+API_PREFIX = '/api/v10'
+
+# Route -> (limit, per seconds). Routes sharing a name in SHARED_BUCKETS share one bucket.
+DEFAULT_BUCKETS = {
+    'POST /channels/{channel_id}/messages': (5, 5.0),
+    'PATCH /channels/{channel_id}/messages/{message_id}': (5, 5.0),
+    'PATCH /channels/{channel_id}': (10, 10.0),
+    'PUT /channels/{channel_id}/permissions/{overwrite_id}': (10, 10.0),
+    'PATCH /guilds/{guild_id}/members/{user_id}': (10, 10.0),
+    'PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}': (10, 10.0),
+    'POST /guilds/{guild_id}/channels': (5, 10.0),
+    'POST /guilds/{guild_id}/roles': (10, 10.0),
+    'POST /channels/{channel_id}/webhooks': (15, 60.0),
+    'POST /webhooks/{webhook_id}/{webhook_token}': (5, 2.0),
+}
+SHARED_BUCKETS = {
+    'DELETE /channels/{channel_id}/permissions/{overwrite_id}': 'PUT /channels/{channel_id}/permissions/{overwrite_id}',
+    'DELETE /guilds/{guild_id}/members/{user_id}/roles/{role_id}': 'PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}',
+}
+DEFAULT_LIMIT = (50, 1.0)
+GLOBAL_LIMIT = (50, 1.0)
+
+def json_response(data, status: int = 200, headers: dict = None) -> web.Response:
+    """JSON response with the bare content type discord.py expects (no charset)"""
+    response = web.Response(body=json.dumps(data).encode('utf-8'), status=status, headers=headers)
+    response.headers['Content-Type'] = 'application/json'
+    return response
+
+class Bucket:
+    """Fixed-window rate limit bucket, as Discord reports them"""
+    
+    def __init__(self, limit: int, per: float, bucket_hash: str):
+        self.limit = limit
+        self.per = per
+        self.hash = bucket_hash
+        self.remaining = limit
+        self.reset_at = 0.0
+    
+    def acquire(self, now: float) -> float:
+        """Take a token; return 0 on success or the seconds to wait"""
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+        
+        if self.remaining <= 0:
+            return self.reset_at - now
+        
+        self.remaining -= 1
+        return 0.0
+    
+    def headers(self, now: float) -> dict:
+        reset_after = max(0.0, self.reset_at - now)
+        return {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': f"{time.time() + reset_after:.3f}",
+            'X-RateLimit-Reset-After': f"{reset_after:.3f}",
+            'X-RateLimit-Bucket': self.hash
+        }
+
+class MockDiscordServer:
+    def __init__(self, buckets: dict = None, global_limit: tuple = GLOBAL_LIMIT, latency: float = 0.0):
+        self.bucket_limits = dict(DEFAULT_BUCKETS)
+        self.bucket_limits.update(buckets or {})
+        self.global_limit = global_limit
+        self.latency = latency
+        self.buckets = {}
+        self.global_bucket = Bucket(global_limit[0], global_limit[1], 'global')
+        self.started = time.monotonic()
+        self.ids = 0
+        self.stats = {
+            "requests": defaultdict(int),
+            "rate_limited": defaultdict(int),
+            "global_rate_limited": 0,
+            "timeline": defaultdict(lambda: {"ok": 0, "429": 0})
+        }
+        # channel_id -> webhook payloads created through the API
+        self.webhooks = defaultdict(list)
+        self.runner = None
+        self.app = self.build_app()
+    
+    def next_id(self) -> int:
+        self.ids += 1
+        return snowflake(self.ids)
+    
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.rate_limit_middleware])
+        routes = [
+            ('GET', '/users/@me', self.get_me),
+            ('GET', '/oauth2/applications/@me', self.get_application),
+            ('PUT', '/applications/{application_id}/commands', self.put_commands),
+            ('POST', '/channels/{channel_id}/messages', self.create_message),
+            ('PATCH', '/channels/{channel_id}/messages/{message_id}', self.edit_message),
+            ('PATCH', '/channels/{channel_id}', self.edit_channel),
+            ('PUT', '/channels/{channel_id}/permissions/{overwrite_id}', self.no_content),
+            ('DELETE', '/channels/{channel_id}/permissions/{overwrite_id}', self.no_content),
+            ('PATCH', '/guilds/{guild_id}/members/{user_id}', self.edit_member),
+            ('PUT', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}', self.no_content),
+            ('DELETE', '/guilds/{guild_id}/members/{user_id}/roles/{role_id}', self.no_content),
+            ('POST', '/guilds/{guild_id}/channels', self.create_channel),
+            ('POST', '/guilds/{guild_id}/roles', self.create_role),
+            ('GET', '/channels/{channel_id}/webhooks', self.get_channel_webhooks),
+            ('POST', '/channels/{channel_id}/webhooks', self.create_webhook),
+            ('POST', '/webhooks/{webhook_id}/{webhook_token}', self.execute_webhook),
+        ]
+        for method, path, handler in routes:
+            app.router.add_route(method, API_PREFIX + path, handler)
+        app.router.add_get('/_mock/stats', self.get_stats)
+        return app
+    
+    def bucket_for(self, route_key: str, major: str) -> Bucket:
+        shared_key = SHARED_BUCKETS.get(route_key, route_key)
+        key = f"{shared_key}:{major}"
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            limit, per = self.bucket_limits.get(shared_key, DEFAULT_LIMIT)
+            bucket_hash = hashlib.sha1(shared_key.encode()).hexdigest()[:16]
+            bucket = self.buckets[key] = Bucket(limit, per, bucket_hash)
+        return bucket
+    
+    def too_many_requests(self, retry_after: float, is_global: bool, bucket: Bucket = None, now: float = 0.0):
+        headers = {
+            'Retry-After': f"{retry_after:.3f}",
+            'X-RateLimit-Scope': 'global' if is_global else 'user',
+            'Via': '1.1 google'
+        }
+        if is_global:
+            headers['X-RateLimit-Global'] = 'true'
+        elif bucket is not None:
+            headers.update(bucket.headers(now))
+        
+        body = {"message": "You are being rate limited.", "retry_after": round(retry_after, 3), "global": is_global}
+        return json_response(body, status=429, headers=headers)
+    
+    @web.middleware
+    async def rate_limit_middleware(self, request: web.Request, handler):
+        resource = request.match_info.route.resource
+        if resource is None or not resource.canonical.startswith(API_PREFIX):
+            return await handler(request)
+        
+        route_key = f"{request.method} {resource.canonical[len(API_PREFIX):]}"
+        major = next((request.match_info[name] for name in ('channel_id', 'guild_id', 'webhook_id')
+                      if name in request.match_info), '')
+        now = time.monotonic()
+        second = int(now - self.started)
+        self.stats["requests"][route_key] += 1
+        
+        # Webhook execution is authenticated by the token, not the bot, so it skips the bot's global limit
+        retry_after = 0.0 if 'webhook_token' in request.match_info else self.global_bucket.acquire(now)
+        if retry_after:
+            self.stats["global_rate_limited"] += 1
+            self.stats["timeline"][second]["429"] += 1
+            return self.too_many_requests(retry_after, True)
+        
+        bucket = self.bucket_for(route_key, major)
+        retry_after = bucket.acquire(now)
+        if retry_after:
+            self.stats["rate_limited"][route_key] += 1
+            self.stats["timeline"][second]["429"] += 1
+            return self.too_many_requests(retry_after, False, bucket, now)
+        
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        response = await handler(request)
+        response.headers.update(bucket.headers(now))
+        self.stats["timeline"][second]["ok"] += 1
+        return response
+    
+    async def json_body(self, request: web.Request) -> dict:
+        if request.content_type == 'application/json':
+            return await request.json()
+        if request.content_type.startswith('multipart/'):
+            reader = await request.multipart()
+            async for part in reader:
+                if part.name == 'payload_json':
+                    return json.loads(await part.text())
+        return {}
+    
+    async def get_me(self, request):
+        return json_response(user_payload(BOT_USER_ID, "SecurityBot", bot=True))
+    
+    async def get_application(self, request):
+        return json_response({
+            "id": str(APPLICATION_ID), "name": "SecurityBot", "icon": None, "description": "",
+            "bot_public": True, "bot_require_code_grant": False, "verify_key": "", "flags": 0,
+            "owner": user_payload(1, "owner")
+        })
+    
+    async def put_commands(self, request):
+        return json_response([])
+    
+    async def create_message(self, request):
+        payload = await self.json_body(request)
+        return json_response(message_payload(
+            self.next_id(), int(request.match_info['channel_id']), user_payload(BOT_USER_ID, "SecurityBot", bot=True),
+            payload.get('content') or "", embeds=payload.get('embeds')
+        ))
+    
+    async def edit_message(self, request):
+        payload = await self.json_body(request)
+        return json_response(message_payload(
+            int(request.match_info['message_id']), int(request.match_info['channel_id']),
+            user_payload(BOT_USER_ID, "SecurityBot", bot=True), payload.get('content') or "", embeds=payload.get('embeds')
+        ))
+    
+    async def edit_channel(self, request):
+        payload = await self.json_body(request)
+        data = channel_payload(int(request.match_info['channel_id']), 0, payload.get('name', 'channel'))
+        data.update(payload)
+        return json_response(data)
+    
+    async def edit_member(self, request):
+        payload = await self.json_body(request)
+        return json_response(member_payload(int(request.match_info['user_id']), payload.get('roles')))
+    
+    async def create_channel(self, request):
+        payload = await self.json_body(request)
+        data = channel_payload(
+            self.next_id(), int(request.match_info['guild_id']), payload.get('name', 'channel'), payload.get('type', 0),
+            overwrites=payload.get('permission_overwrites')
+        )
+        if payload.get('parent_id'):
+            data['parent_id'] = payload['parent_id']
+        if payload.get('topic'):
+            data['topic'] = payload['topic']
+        return json_response(data)
+    
+    async def create_role(self, request):
+        payload = await self.json_body(request)
+        return json_response(role_payload(self.next_id(), payload.get('name', 'new role'), color=payload.get('color', 0)))
+    
+    async def get_channel_webhooks(self, request):
+        return json_response(self.webhooks[request.match_info['channel_id']])
+    
+    async def create_webhook(self, request):
+        payload = await self.json_body(request)
+        webhook_id = self.next_id()
+        data = {
+            "id": str(webhook_id), "type": 1, "channel_id": request.match_info['channel_id'], "guild_id": None,
+            "name": payload.get('name', 'webhook'), "avatar": None, "token": f"token-{webhook_id}",
+            "application_id": str(APPLICATION_ID), "user": user_payload(BOT_USER_ID, "SecurityBot", bot=True)
+        }
+        self.webhooks[request.match_info['channel_id']].append(data)
+        return json_response(data)
+    
+    async def execute_webhook(self, request):
+        known = any(
+            hook["id"] == request.match_info['webhook_id'] and hook["token"] == request.match_info['webhook_token']
+            for hooks in self.webhooks.values() for hook in hooks
+        )
+        if not known:
+            return json_response({"message": "Unknown Webhook", "code": 10015}, status=404)
+        
+        payload = await self.json_body(request)
+        if request.query.get('wait') != 'true':
+            return web.Response(status=204)
+        return json_response(message_payload(
+            self.next_id(), 0, user_payload(int(request.match_info['webhook_id']), payload.get('username') or "webhook"),
+            payload.get('content') or "", embeds=payload.get('embeds')
+        ))
+    
+    async def no_content(self, request):
+        return web.Response(status=204)
+    
+    async def get_stats(self, request):
+        return json_response(self.snapshot())
+    
+    def snapshot(self) -> dict:
+        """Current request and 429 counters"""
+        return {
+            "requests": dict(self.stats["requests"]),
+            "rate_limited": dict(self.stats["rate_limited"]),
+            "global_rate_limited": self.stats["global_rate_limited"],
+            "timeline": {str(second): counts for second, counts in sorted(self.stats["timeline"].items())}
+        }
+    
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving; returns the API base URL to configure the bot with"""
+        self.runner = web.AppRunner(self.app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}{API_PREFIX}"
+    
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+def parse_bucket(spec: str) -> tuple:
+    """Parse 'METHOD /path=LIMIT/PER' into (route, (limit, per))"""
+    route, _, limits = spec.rpartition('=')
+    limit, _, per = limits.partition('/')
+    return route.strip(), (int(limit), float(per or 1))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run a local mock Discord REST server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--bucket', action='append', default=[],
+                        help='Override a route bucket, e.g. "PATCH /guilds/{guild_id}/members/{user_id}=10/10"')
+    parser.add_argument('--global-limit', default=f"{GLOBAL_LIMIT[0]}/{GLOBAL_LIMIT[1]:g}", help="Global limit as LIMIT/PER")
+    parser.add_argument('--latency', type=float, default=0, help="Added response latency in ms")
+    return parser.parse_args()
+
+async def serve(args):
+    limit, _, per = args.global_limit.partition('/')
+    server = MockDiscordServer(
+        dict(parse_bucket(spec) for spec in args.bucket), (int(limit), float(per or 1)), args.latency / 1000
+    )
+    base = await server.start(args.host, args.port)
+    print(f"🧪 Mock Discord REST API listening on {base}")
+    print(f"   Set DISCORD_API_BASE={base}; stats at http://{args.host}:{args.port}/_mock/stats")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,121 @@
+"""Gateway and REST payload builders shared by the offline harnesses"""
+import time
+from datetime import datetime, timezone
+import discord
+
+BOT_USER_ID = 1000
+APPLICATION_ID = 1000
+EVERYONE_PERMISSIONS = str(discord.Permissions.general().value | discord.Permissions.text().value)
+
+def snowflake(counter: int) -> int:
+    """Build a realistic-looking snowflake from a counter"""
+    return ((int(time.time() * 1000) - discord.utils.DISCORD_EPOCH) << 22) + counter
+
+def user_payload(user_id: int, name: str = None, bot: bool = False) -> dict:
+    return {
+        "id": str(user_id),
+        "username": name or f"user{user_id}",
+        "discriminator": "0",
+        "global_name": None,
+        "avatar": None,
+        "bot": bot
+    }
+
+def member_payload(user_id: int, role_ids: list = None) -> dict:
+    return {
+        "user": user_payload(user_id),
+        "roles": [str(role_id) for role_id in (role_ids or [])],
+        "joined_at": datetime.now(timezone.utc).isoformat(),
+        "deaf": False,
+        "mute": False,
+        "flags": 0
+    }
+
+def message_payload(message_id: int, channel_id: int, author: dict, content: str = "",
+                    guild_id: int = None, member: dict = None, embeds: list = None) -> dict:
+    data = {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "author": author,
+        "content": content,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": embeds or [],
+        "pinned": False,
+        "type": 0
+    }
+    if guild_id is not None:
+        data["guild_id"] = str(guild_id)
+    if member is not None:
+        data["member"] = member
+    return data
+
+def guild_payload(guild_id: int, owner_id: int, member_ids: list, text_channel_ids: list,
+                  voice_channel_ids: list, role_ids: list) -> dict:
+    """Build a GUILD_CREATE payload for a synthetic guild"""
+    roles = [{
+        "id": str(guild_id), "name": "@everyone", "permissions": EVERYONE_PERMISSIONS,
+        "position": 0, "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0
+    }]
+    for position, role_id in enumerate(role_ids, start=1):
+        roles.append({
+            "id": str(role_id), "name": f"role-{position}", "permissions": "0",
+            "position": position, "color": 0, "hoist": False, "managed": False, "mentionable": False, "flags": 0
+        })
+    
+    channels = []
+    for position, channel_id in enumerate(text_channel_ids):
+        channels.append({"id": str(channel_id), "type": 0, "name": f"text-{position}",
+                         "position": position, "permission_overwrites": [], "nsfw": False})
+    for position, channel_id in enumerate(voice_channel_ids):
+        channels.append({"id": str(channel_id), "type": 2, "name": f"voice-{position}",
+                         "position": position, "permission_overwrites": [], "bitrate": 64000, "user_limit": 0})
+    
+    members = [member_payload(member_id, role_ids[:1]) for member_id in member_ids]
+    members.append(member_payload(BOT_USER_ID))
+    members[-1]["user"]["bot"] = True
+    
+    return {
+        "id": str(guild_id),
+        "name": f"guild-{guild_id}",
+        "owner_id": str(owner_id),
+        "roles": roles,
+        "channels": channels,
+        "members": members,
+        "member_count": len(members),
+        "voice_states": [],
+        "presences": [],
+        "emojis": [],
+        "stickers": [],
+        "features": [],
+        "threads": [],
+        "large": False,
+        "unavailable": False
+    }
+
+def channel_payload(channel_id: int, guild_id: int, name: str, type_: int = 0, position: int = 0,
+                    overwrites: list = None) -> dict:
+    data = {
+        "id": str(channel_id),
+        "guild_id": str(guild_id),
+        "type": type_,
+        "name": name,
+        "position": position,
+        "permission_overwrites": overwrites or [],
+        "nsfw": False
+    }
+    # Voice and stage channels always carry these
+    if type_ in (2, 13):
+        data.update(bitrate=64000, user_limit=0)
+    return data
+
+def role_payload(role_id: int, name: str, position: int = 1, permissions: str = "0", color: int = 0) -> dict:
+    return {
+        "id": str(role_id), "name": name, "permissions": permissions, "position": position,
+        "color": color, "hoist": False, "managed": False, "mentionable": False, "flags": 0
+    }
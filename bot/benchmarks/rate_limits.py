@@ -0,0 +1,201 @@
+"""Outbound REST throughput under Discord rate limits.
+
+Starts the local mock REST server, points SecurityBot at it and fires bursts
+of the bot's outbound calls (log_to_channel, drag, role changes, channel
+creation) to show how requests queue behind 429s and recover. The
+drag-executor scenario sends the same moves through RateLimitedExecutor.
+messages sends log embeds as the bot; webhook-logs sends the same embeds
+through the log router's channel webhook.
+The lock scenario runs `channel lock all` and `channel unlock all` over
+--count text channels and reports time-to-lock.
+
+Run from the bot directory:
+
+    python -m benchmarks.rate_limits --count 50
+    python -m benchmarks.rate_limits --scenario lock --count 100
+    python -m benchmarks.rate_limits --scenario drag --count 200 --bucket "PATCH /guilds/{guild_id}/members/{user_id}=10/10"
+"""
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+import discord
+from config import Config
+from benchmarks.common import summarize, write_results
+from benchmarks.harness import HarnessBot
+from benchmarks.mock_discord import MockDiscordServer, parse_bucket
+from benchmarks.payloads import snowflake, user_payload, guild_payload
+from utils.rate_limit import RateLimitedExecutor
+
+SCENARIOS = ['messages', 'webhook-logs', 'drag', 'drag-executor', 'roles', 'channels', 'lock']
+
+async def run_scenario(name: str, bot: HarnessBot, server: MockDiscordServer, count: int) -> dict:
+    """Fire count concurrent calls for one scenario and summarize how they drained"""
+    guild = bot.guilds[0]
+    members = [member for member in guild.members if not member.bot][:count]
+    logging_cog = bot.get_cog('LoggingCog')
+    # Same moves as 'drag', paced the way bulk drag commands pace them
+    executor = RateLimitedExecutor(Config.BULK_MOVE_CONCURRENCY, Config.BULK_MOVE_RATE, Config.BULK_MOVE_PER)
+    
+    # Log embeds go out as the bot for 'messages' and through the channel webhook for 'webhook-logs'
+    bot.log_router.webhooks_enabled = name == 'webhook-logs'
+    
+    def call(i):
+        if name in ('messages', 'webhook-logs'):
+            return logging_cog.log_to_channel(discord.Embed(title=f"benchmark event {i}"), guild)
+        if name == 'drag':
+            return members[i % len(members)].move_to(guild.voice_channels[0])
+        if name == 'drag-executor':
+            return executor.submit(members[i % len(members)].move_to, guild.voice_channels[0])
+        if name == 'roles':
+            return members[i % len(members)].add_roles(guild.roles[1])
+        return guild.create_text_channel(f"bench-{i}")
+    
+    before = server.snapshot()
+    started = time.perf_counter()
+    completions = []
+    
+    async def timed(i):
+        await call(i)
+        completions.append(time.perf_counter() - started)
+    
+    results = await asyncio.gather(*(timed(i) for i in range(count)), return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    after = server.snapshot()
+    
+    throttled = sum(after["rate_limited"].values()) - sum(before["rate_limited"].values())
+    throttled += after["global_rate_limited"] - before["global_rate_limited"]
+    
+    timeline = {}
+    for offset in completions:
+        second = int(offset)
+        timeline[second] = timeline.get(second, 0) + 1
+    
+    latency = summarize(completions) if completions else {}
+    return {
+        "count": count,
+        "completed": len(completions),
+        "errors": [repr(result) for result in results if isinstance(result, Exception)][:10],
+        "elapsed_sec": round(elapsed, 3),
+        "ops_per_sec": round(len(completions) / elapsed, 2) if elapsed else 0.0,
+        "completion_p50_ms": latency.get("p50_ms"),
+        "completion_p95_ms": latency.get("p95_ms"),
+        "completion_max_ms": latency.get("max_ms"),
+        "responses_429": throttled,
+        "completions_per_second": timeline
+    }
+
+async def run_lock_scenario(bot: HarnessBot, server: MockDiscordServer, count: int) -> dict:
+    """Lock then unlock count text channels through ModerationCog and time both passes"""
+    guild = bot.guilds[0]
+    channels = guild.text_channels[:count]
+    moderation_cog = bot.get_cog('ModerationCog')
+    
+    report = {"channels": len(channels)}
+    for action, apply in (("lock", moderation_cog.lock_channels), ("unlock", moderation_cog.unlock_channels)):
+        before = server.snapshot()
+        result = await apply(guild, channels, guild.me)
+        after = server.snapshot()
+        
+        throttled = sum(after["rate_limited"].values()) - sum(before["rate_limited"].values())
+        throttled += after["global_rate_limited"] - before["global_rate_limited"]
+        report[action] = {
+            "changed": result["changed"],
+            "failed": len(result["failures"]),
+            "errors": [repr(error) for _, error in result["failures"]][:10],
+            "elapsed_sec": round(result["elapsed"], 3),
+            "responses_429": throttled
+        }
+    
+    # Shaped like the other scenarios so the summary table can print it
+    return {
+        **report,
+        "count": len(channels),
+        "completed": report["lock"]["changed"],
+        "errors": report["lock"]["errors"] + report["unlock"]["errors"],
+        "elapsed_sec": report["lock"]["elapsed_sec"],
+        "time_to_lock_sec": report["lock"]["elapsed_sec"],
+        "time_to_unlock_sec": report["unlock"]["elapsed_sec"],
+        "ops_per_sec": round(report["lock"]["changed"] / report["lock"]["elapsed_sec"], 2)
+        if report["lock"]["elapsed_sec"] else 0.0,
+        "completion_p50_ms": None,
+        "completion_max_ms": round(report["lock"]["elapsed_sec"] * 1000),
+        "responses_429": report["lock"]["responses_429"]
+    }
+
+async def run(args) -> dict:
+    with tempfile.TemporaryDirectory(prefix='bot-ratelimit-') as data_dir:
+        Config.DATABASE_PATH = os.path.join(data_dir, 'bot.db')
+        Config.LOG_DIR = os.path.join(data_dir, 'logs')
+        
+        limit, _, per = args.global_limit.partition('/')
+        server = MockDiscordServer(
+            dict(parse_bucket(spec) for spec in args.bucket), (int(limit), float(per or 1)), args.latency / 1000
+        )
+        Config.DISCORD_API_BASE = await server.start()
+        
+        bot = HarnessBot()
+        await bot.start_offline()
+        logging.getLogger('security_bot').setLevel(logging.CRITICAL)
+        
+        guild_id = snowflake(1)
+        member_ids = [snowflake(100 + i) for i in range(max(args.count, 10))]
+        # One text channel per call so the lock scenario has --count channels to lock
+        text_ids = [snowflake(10000 + i) for i in range(max(args.count, 1))]
+        bot.feed('READY', {"v": 10, "user": user_payload(1000, "SecurityBot", bot=True), "guilds": [],
+                           "session_id": "rate-limits", "resume_gateway_url": "", "application": {"id": "1000", "flags": 0}})
+        guild = guild_payload(guild_id, member_ids[0], member_ids, text_ids, [snowflake(20)], [snowflake(30)])
+        # Let the bot do everything it would be allowed to in a real server (manage webhooks, overwrites...)
+        guild["roles"][0]["permissions"] = str(discord.Permissions.all().value)
+        bot.feed('GUILD_CREATE', guild)
+        await bot.wait_until_ready()
+        await bot.drain()
+        Config.LOG_CHANNEL_ID = str(text_ids[0])
+        
+        report = {}
+        for name in args.scenario or SCENARIOS:
+            print(f"▶ {name} x{args.count}")
+            if name == 'lock':
+                report[name] = await run_lock_scenario(bot, server, args.count)
+            else:
+                report[name] = await run_scenario(name, bot, server, args.count)
+            # Let buckets reset so scenarios don't bleed into each other
+            await asyncio.sleep(args.cooldown)
+        
+        await bot.close()
+        await server.stop()
+        return report
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure outbound REST behaviour against a rate-limited mock Discord")
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help="Scenario to run (default: all)")
+    parser.add_argument('--count', type=int, default=30, help="Concurrent calls per scenario")
+    parser.add_argument('--bucket', action='append', default=[], help='Override a route bucket, e.g. "POST /channels/{channel_id}/messages=5/5"')
+    parser.add_argument('--global-limit', default="50/1", help="Global limit as LIMIT/PER")
+    parser.add_argument('--latency', type=float, default=0, help="Mock server latency in ms")
+    parser.add_argument('--cooldown', type=float, default=0, help="Pause between scenarios in seconds")
+    parser.add_argument('--output', help="Where to write the JSON report")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    report = asyncio.run(run(args))
+    
+    print(f"\n{'scenario':<14} {'calls':>6} {'elapsed':>9} {'ops/sec':>9} {'429s':>6} {'p50':>10} {'max':>10}")
+    for name, result in report.items():
+        print(f"{name:<14} {result['completed']:>6} {result['elapsed_sec']:>8.2f}s {result['ops_per_sec']:>9.2f} "
+              f"{result['responses_429']:>6} {result['completion_p50_ms'] or 0:>8.0f}ms {result['completion_max_ms'] or 0:>8.0f}ms")
+        if result["errors"]:
+            print(f"   ⚠️ {len(result['errors'])} error(s), e.g. {result['errors'][0]}")
+    
+    output = args.output or os.path.join(
+        'data', 'benchmarks', f"ratelimits-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    write_results(output, report, {"args": vars(args)})
+    print(f"\n📄 Report written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""Offline gateway event replay for end-to-end load testing.
+
+Builds SecurityBot with a stand-in HTTP and gateway layer and replays a
+recorded or synthetic stream of gateway dispatches through the real cogs.
+
+Run from the bot directory:
+
+    python -m benchmarks.replay --events 20000 --rate 500
+    python -m benchmarks.replay --record data/benchmarks/stream.jsonl --events 5000
+    python -m benchmarks.replay --input data/benchmarks/stream.jsonl --rate 0
+    python -m benchmarks.replay --events 20000 --writer-process
+
+A stream file holds one gateway dispatch per line: {"t": "MESSAGE_CREATE", "d": {...}}.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import deque
+from datetime import datetime
+from config import Config
+from benchmarks.common import summarize, write_results
+from benchmarks.harness import HarnessBot
+from benchmarks.mock_discord import MockDiscordServer
+from benchmarks.payloads import snowflake, user_payload, member_payload, message_payload, guild_payload
+
+DEFAULT_MIX = "create=80,command=8,delete=9,bulk=2,join=1"
+COMMANDS = ["snipe", "whitelist list", "checkperms", "logs commands", "logs deleted"]
+
+def parse_mix(spec: str) -> dict:
+    """Parse an event mix like 'create=80,delete=10' into weights"""
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        mix[name.strip()] = float(weight)
+    return mix
+
+class SyntheticStream:
+    """Generates a plausible stream of gateway dispatches"""
+    
+    def __init__(self, guilds: int, members: int, channels: int, mix: dict, seed: int = 0):
+        self.random = random.Random(seed)
+        self.mix = mix
+        self.members_per_guild = members
+        self.channels_per_guild = channels
+        self.counter = 0
+        self.guilds = []
+        self.recent_messages = deque(maxlen=900)  # stays inside discord.py's message cache
+        self.initial_guilds = guilds
+    
+    def _id(self) -> int:
+        self.counter += 1
+        return snowflake(self.counter)
+    
+    def _new_guild(self) -> dict:
+        guild_id = self._id()
+        member_ids = [self._id() for _ in range(self.members_per_guild)]
+        text_ids = [self._id() for _ in range(self.channels_per_guild)]
+        voice_ids = [self._id() for _ in range(max(1, self.channels_per_guild // 4))]
+        role_ids = [self._id() for _ in range(5)]
+        guild = {"id": guild_id, "owner": member_ids[0], "members": member_ids, "channels": text_ids}
+        self.guilds.append(guild)
+        return {"t": "GUILD_CREATE", "d": guild_payload(guild_id, member_ids[0], member_ids, text_ids, voice_ids, role_ids)}
+    
+    def setup_events(self) -> list:
+        return [self._new_guild() for _ in range(self.initial_guilds)]
+    
+    def _message(self, guild: dict, author_id: int, content: str) -> dict:
+        message_id = self._id()
+        channel_id = self.random.choice(guild["channels"])
+        data = message_payload(
+            message_id, channel_id, user_payload(author_id), content,
+            guild_id=guild["id"], member=member_payload(author_id)
+        )
+        del data["member"]["user"]
+        self.recent_messages.append((message_id, channel_id, guild["id"]))
+        return {"t": "MESSAGE_CREATE", "d": data}
+    
+    def next_event(self) -> dict:
+        kind = self.random.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        guild = self.random.choice(self.guilds)
+        
+        if kind == "delete" and self.recent_messages:
+            message_id, channel_id, guild_id = self.recent_messages.pop()
+            return {"t": "MESSAGE_DELETE", "d": {"id": str(message_id), "channel_id": str(channel_id), "guild_id": str(guild_id)}}
+        
+        if kind == "bulk" and len(self.recent_messages) > 10:
+            batch = [self.recent_messages.pop() for _ in range(self.random.randint(2, 10))]
+            _, channel_id, guild_id = batch[0]
+            return {"t": "MESSAGE_DELETE_BULK", "d": {
+                "ids": [str(message_id) for message_id, _, _ in batch],
+                "channel_id": str(channel_id), "guild_id": str(guild_id)
+            }}
+        
+        if kind == "join":
+            return self._new_guild()
+        
+        if kind == "command":
+            # Half the invocations come from the owner, the rest fail the whitelist check
+            author = guild["owner"] if self.random.random() < 0.5 else self.random.choice(guild["members"])
+            return self._message(guild, author, Config.BOT_PREFIX + self.random.choice(COMMANDS))
+        
+        author = self.random.choice(guild["members"])
+        return self._message(guild, author, f"synthetic message {self.counter} " + "x" * self.random.randint(0, 200))
+
+def read_stream(path: str):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def rss_mb() -> float:
+    """Current resident set size in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def process_io() -> dict:
+    """Bytes read and written by this process, where the OS reports it"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return {"read_bytes": int(fields['rchar']), "write_bytes": int(fields['wchar'])}
+    except (OSError, KeyError, ValueError):
+        return {"read_bytes": 0, "write_bytes": 0}
+
+def tree_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def db_size(path: str) -> int:
+    return sum(os.path.getsize(path + suffix) for suffix in ('', '-wal', '-journal') if os.path.exists(path + suffix))
+
+async def sample_memory(samples: list, started: float, interval: float):
+    while True:
+        samples.append({"t": round(time.perf_counter() - started, 3), "rss_mb": round(rss_mb(), 2),
+                        "allocated_blocks": sys.getallocatedblocks()})
+        await asyncio.sleep(interval)
+
+async def replay(args) -> dict:
+    """Build the bot, replay the stream and collect the report"""
+    with tempfile.TemporaryDirectory(prefix='bot-replay-') as data_dir:
+        Config.DATABASE_PATH = os.path.join(data_dir, 'bot.db')
+        Config.LOG_DIR = os.path.join(data_dir, 'logs')
+        
+        mock_server = None
+        if args.mock_rest:
+            mock_server = MockDiscordServer(latency=args.http_latency / 1000)
+            Config.DISCORD_API_BASE = await mock_server.start()
+        Config.LOG_WRITER_PROCESS = args.writer_process
+        
+        bot = HarnessBot(http_latency=args.http_latency / 1000)
+        await bot.start_offline()
+        if not args.verbose:
+            logging.getLogger('security_bot').setLevel(logging.CRITICAL)
+        
+        if args.input:
+            # Leading GUILD_CREATEs describe the starting state rather than load
+            stream = read_stream(args.input)
+            setup = []
+            for event in stream:
+                if event["t"] != "GUILD_CREATE":
+                    stream = itertools.chain([event], stream)
+                    break
+                setup.append(event)
+        else:
+            generator = SyntheticStream(args.guilds, args.members, args.channels, parse_mix(args.mix), args.seed)
+            setup = generator.setup_events()
+            stream = (generator.next_event() for _ in range(args.events))
+        
+        recorder = open(args.record, 'w', encoding='utf-8') if args.record else None
+        
+        # Bring the bot to READY with the initial guilds
+        bot.feed('READY', {"v": 10, "user": user_payload(1000, "SecurityBot", bot=True), "guilds": [],
+                           "session_id": "replay", "resume_gateway_url": "", "application": {"id": "1000", "flags": 0}})
+        for event in setup:
+            if recorder:
+                recorder.write(json.dumps(event) + "\n")
+            bot.feed(event["t"], event["d"])
+        await bot.wait_until_ready()
+        await bot.drain()
+        bot.handler_timings.clear()
+        
+        if args.log_channel and bot.guilds:
+            # Route every log embed through one channel, as a single-tenant deployment would
+            Config.LOG_CHANNEL_ID = str(bot.guilds[0].text_channels[0].id)
+        
+        db_before = db_size(Config.DATABASE_PATH)
+        logs_before = tree_size(Config.LOG_DIR)
+        io_before = process_io()
+        memory = []
+        cpu_before = time.process_time()
+        started = time.perf_counter()
+        sampler = asyncio.create_task(sample_memory(memory, started, args.sample_interval))
+        
+        interval = 1 / args.rate if args.rate else 0
+        fed = 0
+        event_counts = {}
+        for event in stream:
+            if recorder:
+                recorder.write(json.dumps(event) + "\n")
+            bot.feed(event["t"], event["d"])
+            fed += 1
+            event_counts[event["t"]] = event_counts.get(event["t"], 0) + 1
+            
+            if interval:
+                delay = started + fed * interval - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif fed % 100 == 0:
+                await asyncio.sleep(0)
+        
+        fed_at = time.perf_counter()
+        await bot.drain()
+        elapsed = time.perf_counter() - started
+        cpu_sec = time.process_time() - cpu_before
+        if bot.log_writer:
+            # Writes still in flight belong to this run's I/O
+            await bot.log_writer.flush()
+        sampler.cancel()
+        memory.append({"t": round(elapsed, 3), "rss_mb": round(rss_mb(), 2), "allocated_blocks": sys.getallocatedblocks()})
+        
+        io_after = process_io()
+        report = {
+            "events": fed,
+            "event_counts": event_counts,
+            "elapsed_sec": round(elapsed, 3),
+            "feed_sec": round(fed_at - started, 3),
+            "events_per_sec": round(fed / elapsed, 2) if elapsed else 0.0,
+            "target_rate": args.rate,
+            "gateway_cpu_sec": round(cpu_sec, 3),
+            "gateway_cpu_ms_per_event": round(cpu_sec / fed * 1000, 4) if fed else 0.0,
+            "handlers": {name: summarize(samples) for name, samples in sorted(bot.handler_timings.items())},
+            "handler_errors": dict(bot.handler_errors),
+            "handler_error_samples": bot.handler_error_samples,
+            "io": {
+                "db_bytes_grown": db_size(Config.DATABASE_PATH) - db_before,
+                "log_bytes_written": tree_size(Config.LOG_DIR) - logs_before,
+                "process_read_bytes": io_after["read_bytes"] - io_before["read_bytes"],
+                "process_write_bytes": io_after["write_bytes"] - io_before["write_bytes"]
+            },
+            "http": mock_server.snapshot() if mock_server else {
+                "requests": dict(bot.http.requests), "request_body_bytes": bot.http.request_bytes
+            },
+            "memory": {"peak_rss_mb": max(sample["rss_mb"] for sample in memory), "samples": memory},
+            "log_writer": bot.log_writer.stats() if bot.log_writer else None
+        }
+        
+        if recorder:
+            recorder.close()
+        await bot.close()
+        if mock_server:
+            await mock_server.stop()
+        return report
+
+def print_report(report: dict):
+    print(f"\n📨 {report['events']:,} events in {report['elapsed_sec']}s "
+          f"→ {report['events_per_sec']:,.1f} events/sec sustained")
+    print(f"⚙️ gateway process CPU {report['gateway_cpu_sec']}s ({report['gateway_cpu_ms_per_event']:.3f}ms/event)")
+    print(f"\n{'handler':<30} {'calls':>8} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}")
+    for name, stats in report["handlers"].items():
+        print(f"{name:<30} {stats['iterations']:>8} {stats['p50_ms']:>8.2f}ms "
+              f"{stats['p95_ms']:>8.2f}ms {stats['p99_ms']:>8.2f}ms {stats['max_ms']:>8.2f}ms")
+    
+    io = report["io"]
+    print(f"\n💾 DB grew {io['db_bytes_grown'] / 1024:,.1f} KiB, logs grew {io['log_bytes_written'] / 1024:,.1f} KiB, "
+          f"process wrote {io['process_write_bytes'] / 1024:,.1f} KiB")
+    http = report["http"]
+    throttled = sum(http.get("rate_limited", {}).values()) + http.get("global_rate_limited", 0)
+    print(f"🌐 {sum(http['requests'].values()):,} HTTP requests" + (f", {throttled:,} answered with 429" if throttled else ""))
+    print(f"🧠 peak RSS {report['memory']['peak_rss_mb']:.1f} MB")
+    writer = report["log_writer"]
+    if writer:
+        print(f"✍️ log writer wrote {writer['written']:,}/{writer['submitted']:,} records, "
+              f"{writer['backpressure_waits']} backpressure waits, {writer['dropped']} dropped, {writer['failed']} failed, "
+              f"{writer['restarts']} restarts")
+    if report["handler_errors"]:
+        print(f"⚠️ handler errors: {report['handler_errors']}")
+        for name, sample in report["handler_error_samples"].items():
+            print(f"\n--- first {name} error ---\n{sample}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replay gateway events through SecurityBot offline")
+    parser.add_argument('--input', help="Recorded stream (JSONL of gateway dispatches) to replay")
+    parser.add_argument('--record', help="Write the replayed stream to this JSONL file")
+    parser.add_argument('--events', type=int, default=5000, help="Synthetic events to generate")
+    parser.add_argument('--rate', type=float, default=0, help="Events per second to feed (0 = as fast as possible)")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Synthetic event mix (default: {DEFAULT_MIX})")
+    parser.add_argument('--guilds', type=int, default=3)
+    parser.add_argument('--members', type=int, default=200, help="Members per synthetic guild")
+    parser.add_argument('--channels', type=int, default=20, help="Text channels per synthetic guild")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--http-latency', type=float, default=0, help="Simulated REST latency in ms")
+    parser.add_argument('--mock-rest', action='store_true',
+                        help="Send REST traffic through the local rate-limited mock server instead of the stub")
+    parser.add_argument('--log-channel', action='store_true', help="Enable log_to_channel delivery to a guild channel")
+    parser.add_argument('--writer-process', action='store_true', help="Persist logs through the separate writer process")
+    parser.add_argument('--sample-interval', type=float, default=0.5, help="Memory sampling interval in seconds")
+    parser.add_argument('--output', help="Where to write the JSON report")
+    parser.add_argument('--verbose', action='store_true', help="Keep the bot's console logging enabled")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    report = asyncio.run(replay(args))
+    print_report(report)
+    
+    output = args.output or os.path.join(
+        'data', 'benchmarks', f"replay-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    write_results(output, report, {"args": vars(args)})
+    print(f"\n📄 Report written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Offline microbenchmarks for the database, permission, anti-spam and filter layers.
+
+Run from the bot directory:
+
+    python -m benchmarks.run --quick
+    python -m benchmarks.run --output data/benchmarks/baseline.json
+    python -m benchmarks.run --compare data/benchmarks/baseline.json
+
+Every group runs against its own temporary SQLite file, so no bot token,
+network access or existing data/bot.db is needed.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime
+from database import Database
+from benchmarks.common import write_results, compare_results, print_results
+from benchmarks.bench_database import (
+    bench_is_whitelisted, bench_add_to_whitelist, bench_writes, bench_get_last_deleted_message
+)
+from benchmarks.bench_permissions import bench_check_whitelist
+from benchmarks.bench_antispam import bench_antispam
+from benchmarks.bench_automod import bench_automod
+from benchmarks.bench_regex_rules import bench_regex_rules
+
+ROLE_COUNTS = [0, 5, 25, 100]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run database, permission, anti-spam and filter microbenchmarks")
+    parser.add_argument('--output', help="Where to write the JSON results")
+    parser.add_argument('--compare', help="Baseline JSON file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="Relative slowdown of mean latency treated as a regression (default: 0.10)")
+    parser.add_argument('--iterations', type=int, default=200, help="Iterations per benchmark")
+    parser.add_argument('--max-rows', type=int, default=10 ** 7,
+                        help="Largest deleted_messages table size to benchmark (default: 10^7)")
+    parser.add_argument('--quick', action='store_true', help="Small iteration counts and tables up to 10^5 rows")
+    return parser.parse_args()
+
+async def fresh_database(tmp_dir: str, name: str) -> Database:
+    """Create and initialize a throwaway database"""
+    db = Database(os.path.join(tmp_dir, f'{name}.db'))
+    await db.initialize()
+    return db
+
+async def run_all(args) -> dict:
+    """Run every benchmark group and collect the results"""
+    iterations = 50 if args.quick else args.iterations
+    max_rows = min(args.max_rows, 10 ** 5) if args.quick else args.max_rows
+    row_counts = [10 ** exp for exp in range(3, 8) if 10 ** exp <= max_rows]
+    
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='bot-bench-') as tmp_dir:
+        print("▶ is_whitelisted")
+        results.update(await bench_is_whitelisted(await fresh_database(tmp_dir, 'whitelist'), ROLE_COUNTS, iterations))
+        
+        print("▶ add_to_whitelist")
+        results.update(await bench_add_to_whitelist(await fresh_database(tmp_dir, 'bulk'), iterations * 5))
+        
+        print("▶ store_deleted_message / log_command")
+        results.update(await bench_writes(await fresh_database(tmp_dir, 'writes'), iterations * 2, 25))
+        
+        print("▶ get_last_deleted_message")
+        results.update(await bench_get_last_deleted_message(await fresh_database(tmp_dir, 'snipe'), row_counts, iterations))
+        
+        print("▶ check_whitelist")
+        results.update(await bench_check_whitelist(await fresh_database(tmp_dir, 'perms'), ROLE_COUNTS, iterations))
+        
+        print("▶ antispam")
+        results.update(await bench_antispam(iterations))
+        
+        print("▶ automod")
+        results.update(await bench_automod(iterations))
+        
+        print("▶ regex rules")
+        results.update(await bench_regex_rules(iterations))
+    
+    return results
+
+def main():
+    args = parse_args()
+    results = asyncio.run(run_all(args))
+    print_results(results)
+    
+    output = args.output or os.path.join(
+        'data', 'benchmarks', f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    write_results(output, results, {"quick": args.quick, "iterations": args.iterations})
+    print(f"\n📄 Results written to {output}")
+    
+    if args.compare:
+        regressions = compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {args.threshold:.0%}")
+            sys.exit(1)
+        print("\n✅ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,13 @@ import sys
 from config import Config
 from database import Database
 from utils.permissions import PermissionManager
+from utils.watchdog import LoopWatchdog
+from utils.log_writer import LogWriterProcess
+from utils.role_jobs import RoleJobManager
+from utils.voice_index import VoiceIndex
+from utils.guild_config import GuildConfigService
+from utils.log_router import LogRouter
+from utils.event_bus import EventBus
 
 class SecurityBot(commands.Bot):
     def __init__(self):
@@ -16,9 +23,13 @@ class SecurityBot(commands.Bot):
         intents.guilds = True
         intents.voice_states = True
         
+        # Point REST traffic at a stand-in server when configured
+        if Config.DISCORD_API_BASE:
+            discord.http.Route.BASE = Config.DISCORD_API_BASE.rstrip('/')
+        
         # Initialize bot
         super().__init__(
-            command_prefix=Config.BOT_PREFIX,
+            command_prefix=self.get_command_prefix,
             intents=intents,
             case_insensitive=Config.CASE_INSENSITIVE,
             strip_after_prefix=Config.STRIP_AFTER_PREFIX,
@@ -31,9 +42,36 @@ class SecurityBot(commands.Bot):
         # Initialize database
         self.db = Database(Config.DATABASE_PATH)
         
+        # Per-guild settings, served from memory
+        self.guild_config = GuildConfigService(self.db, Config)
+        
+        # Log embeds go out through per-channel webhooks
+        self.log_router = LogRouter(self, Config.LOG_WEBHOOKS_ENABLED, Config.LOG_HTTP_POOL_SIZE)
+        
         # Initialize permission manager
         self.permission_manager = PermissionManager(self.db)
         
+        # Event loop lag watchdog
+        self.watchdog = LoopWatchdog(
+            Config.LOG_DIR,
+            interval=Config.LOOP_WATCHDOG_INTERVAL_MS / 1000,
+            threshold=Config.LOOP_LAG_THRESHOLD_MS / 1000
+        )
+        
+        # Who is in which voice channel, maintained by the voice cog
+        self.voice_index = VoiceIndex()
+        
+        # Live log events for API stream subscribers
+        self.events = EventBus(Config.EVENT_HISTORY_SIZE, Config.EVENT_SUBSCRIBER_QUEUE_SIZE)
+        
+        # Background bulk role jobs
+        self.role_jobs = RoleJobManager(self)
+        
+        # Optional out-of-process log persistence
+        self.log_writer = None
+        if Config.LOG_WRITER_PROCESS:
+            self.log_writer = LogWriterProcess(Config.DATABASE_PATH, Config.LOG_DIR, Config.LOG_WRITER_QUEUE_SIZE)
+        
         # Track startup
         self.startup_time = None
     
@@ -45,12 +83,30 @@ class SecurityBot(commands.Bot):
         await self.db.initialize()
         print("✅ Database initialized")
         
+        await self.guild_config.load()
+        print(f"✅ Loaded settings for {len(self.guild_config.cache)} guilds")
+        
+        await self.log_router.start()
+        
+        if self.log_writer:
+            self.log_writer.start()
+            print("✅ Log writer process started")
+        
         # Load cogs
         cogs_to_load = [
             'cogs.logging_cog',
             'cogs.whitelist',
-            'cogs.moderation'
+            'cogs.moderation',
+            'cogs.voice',
+            'cogs.config_cog',
+            'cogs.export',
+            'cogs.backup',
+            'cogs.antispam',
+            'cogs.antinuke',
+            'cogs.automod'
         ]
+        if Config.API_ENABLED:
+            cogs_to_load.append('cogs.api')
         
         for cog in cogs_to_load:
             try:
@@ -59,6 +115,11 @@ class SecurityBot(commands.Bot):
             except Exception as e:
                 print(f"❌ Failed to load {cog}: {e}")
         
+        # Start watching for event loop stalls
+        if Config.LOOP_WATCHDOG_ENABLED:
+            self.watchdog.start()
+            print("✅ Event loop watchdog started")
+        
         # Sync slash commands
         try:
             synced = await self.tree.sync()
@@ -66,6 +127,19 @@ class SecurityBot(commands.Bot):
         except Exception as e:
             print(f"❌ Failed to sync slash commands: {e}")
     
+    def get_command_prefix(self, bot, message: discord.Message) -> str:
+        """Per-guild prefix from the in-memory config, so no database hit per message"""
+        return self.guild_config.get_prefix(message.guild)
+    
+    async def close(self):
+        """Stop background services before disconnecting"""
+        self.watchdog.stop()
+        await self.role_jobs.stop()
+        if self.log_writer:
+            await self.log_writer.stop()
+        await self.log_router.close()
+        await super().close()
+    
     async def on_ready(self):
         """Called when bot is ready"""
         self.startup_time = discord.utils.utcnow()
@@ -181,6 +255,7 @@ class SecurityBot(commands.Bot):
     @commands.hybrid_command(name="help", description="Show help information")
     async def help_command(self, ctx: commands.Context, *, command: str = None):
         """Custom help command"""
+        prefix = self.guild_config.get_prefix(ctx.guild)
         if command:
             # Show help for specific command
             cmd = self.get_command(command)
@@ -195,7 +270,7 @@ class SecurityBot(commands.Bot):
             )
             
             if cmd.usage:
-                embed.add_field(name="Usage", value=f"`{Config.BOT_PREFIX}{cmd.usage}`", inline=False)
+                embed.add_field(name="Usage", value=f"`{prefix}{cmd.usage}`", inline=False)
             
             if cmd.aliases:
                 embed.add_field(name="Aliases", value=", ".join(cmd.aliases), inline=False)
@@ -214,11 +289,15 @@ class SecurityBot(commands.Bot):
         embed.add_field(
             name="🛡️ Moderation",
             value=(
-                f"`{Config.BOT_PREFIX}snipe` - Retrieve deleted messages\n"
-                f"`{Config.BOT_PREFIX}drag @user #channel` - Move user between voice channels\n"
-                f"`{Config.BOT_PREFIX}nsfw [#channel]` - Mark channel as NSFW\n"
-                f"`{Config.BOT_PREFIX}role add/remove @user @role` - Manage user roles\n"
-                f"`{Config.BOT_PREFIX}channel create text/voice <name>` - Create channels"
+                f"`{prefix}snipe` - Retrieve deleted messages\n"
+                f"`{prefix}drag @user #channel` - Move user between voice channels\n"
+                f"`{prefix}drag all #from #to` / `drag role @role #to` - Bulk move\n"
+                f"`{prefix}nsfw [#channel]` - Mark channel as NSFW\n"
+                f"`{prefix}role add/remove @user @role` - Manage user roles\n"
+                f"`{prefix}role bulk add/remove @role [has:@role] [joined_after:YYYY-MM-DD]` - Bulk role jobs\n"
+                f"`{prefix}channel create text/voice <name>` - Create channels\n"
+                f"`{prefix}channel apply <template>` - Create channels from a saved template\n"
+                f"`{prefix}channel lock/unlock [channel|category|all]` - Lock channels during a raid"
             ),
             inline=False
         )
@@ -227,10 +306,25 @@ class SecurityBot(commands.Bot):
         embed.add_field(
             name="📝 Whitelist",
             value=(
-                f"`{Config.BOT_PREFIX}whitelist add user/role` - Add to whitelist\n"
-                f"`{Config.BOT_PREFIX}whitelist remove user/role` - Remove from whitelist\n"
-                f"`{Config.BOT_PREFIX}whitelist list` - View whitelist\n"
-                f"`{Config.BOT_PREFIX}checkperms [@user]` - Check permissions"
+                f"`{prefix}whitelist add user/role` - Add to whitelist\n"
+                f"`{prefix}whitelist remove user/role` - Remove from whitelist\n"
+                f"`{prefix}whitelist list` - View whitelist\n"
+                f"`{prefix}checkperms [@user]` - Check permissions"
+            ),
+            inline=False
+        )
+        
+        # Configuration commands
+        embed.add_field(
+            name="⚙️ Configuration",
+            value=(
+                f"`{prefix}config list` - Show this server's settings\n"
+                f"`{prefix}config set <key> <value>` - Change a setting (prefix, log_channel, log_channel:deleted...)\n"
+                f"`{prefix}config reset <key>` - Back to the default\n"
+                f"`{prefix}antispam` - Anti-spam limits and activity (`config set antispam on`)\n"
+                f"`{prefix}antinuke` - Anti-nuke limits and recent quarantines (`config set antinuke on`)\n"
+                f"`{prefix}automod` - Blocked words and link domains (`config set automod on`)\n"
+                f"`{prefix}backup now|list|restore` - Database backups (bot owner)"
             ),
             inline=False
         )
@@ -239,8 +333,14 @@ class SecurityBot(commands.Bot):
         embed.add_field(
             name="📊 Logging",
             value=(
-                f"`{Config.BOT_PREFIX}logs [type] [limit]` - View logs\n"
-                f"`{Config.BOT_PREFIX}clearlog <type> CONFIRM` - Clear logs"
+                f"`{prefix}logs [type] [YYYY-MM-DD]` - Browse logs\n"
+                f"`{prefix}clearlog <type> CONFIRM` - Clear logs\n"
+                f"`{prefix}analytics [days]` - Command usage and deletions\n"
+                f"`{prefix}export start <commands|deleted> [from] [to] [ndjson|csv]` - Export logs to a file\n"
+                f"`{prefix}looplag` - Event loop lag statistics\n"
+                f"`{prefix}voice [#channel]` - Who is in voice and for how long\n"
+                f"`{prefix}voicelog [@user] [#channel]` - Voice join/leave/move history\n"
+                f"`{prefix}modlog <@user>` / `{prefix}modlog by <@mod>` - Moderation action history"
             ),
             inline=False
         )
@@ -249,19 +349,20 @@ class SecurityBot(commands.Bot):
         embed.add_field(
             name="ℹ️ Bot Info",
             value=(
-                f"`{Config.BOT_PREFIX}info` - Bot information\n"
-                f"`{Config.BOT_PREFIX}ping` - Check bot latency"
+                f"`{prefix}info` - Bot information\n"
+                f"`{prefix}ping` - Check bot latency"
             ),
             inline=False
         )
         
-        embed.set_footer(text=f"Use {Config.BOT_PREFIX}help <command> for detailed help on a specific command")
+        embed.set_footer(text=f"Use {prefix}help <command> for detailed help on a specific command")
         
         await ctx.send(embed=embed)
     
     @commands.hybrid_command(name="info", description="Show bot information")
     async def info(self, ctx: commands.Context):
         """Show bot information"""
+        prefix = self.guild_config.get_prefix(ctx.guild)
         embed = discord.Embed(
             title="🤖 Security Bot Information",
             color=discord.Color.blue(),
@@ -280,7 +381,7 @@ class SecurityBot(commands.Bot):
             embed.add_field(name="Uptime", value=f"<t:{int(self.startup_time.timestamp())}:R>", inline=True)
         
         embed.add_field(name="Latency", value=f"{round(self.latency * 1000)}ms", inline=True)
-        embed.add_field(name="Prefix", value=Config.BOT_PREFIX, inline=True)
+        embed.add_field(name="Prefix", value=prefix, inline=True)
         
         embed.set_thumbnail(url=self.user.display_avatar.url)
         embed.set_footer(text="Security Bot | Keeping your server safe")
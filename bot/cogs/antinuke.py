@@ -0,0 +1,181 @@
+import time
+import discord
+from discord.ext import commands
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from utils.antinuke import NUKE_ACTIONS, ActorRateTracker, AuditLogFeed
+from utils.guild_config import is_on
+from utils.permissions import whitelist_required, Permissions
+
+class AntiNukeCog(commands.Cog):
+    """Quarantines members who mass-delete channels or roles, mass-ban or kick, or spawn webhooks"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        config = bot.config
+        self.tracker = ActorRateTracker(config.ANTINUKE_WINDOW, config.ANTINUKE_BUCKETS)
+        self.feed = AuditLogFeed(self.handle_entries, config.ANTINUKE_LOOKUP_DELAY, config.ANTINUKE_MAX_PAGES)
+        # guild_id -> (settings version, limits or None while anti-nuke is off)
+        self.thresholds: Dict[int, Tuple[int, Optional[dict]]] = {}
+        # (guild_id, actor_id) -> when they were quarantined, so one burst quarantines once
+        self.quarantined: Dict[Tuple[int, int], float] = {}
+        self.recent = deque(maxlen=10)
+    
+    async def cog_unload(self):
+        await self.feed.stop()
+    
+    def guild_thresholds(self, guild_id: int) -> Optional[dict]:
+        """A guild's per-action limits, re-read only after its settings change"""
+        service = self.bot.guild_config
+        cached = self.thresholds.get(guild_id)
+        if cached is not None and cached[0] == service.version:
+            return cached[1]
+        
+        thresholds = None
+        if is_on(service.get(guild_id, 'antinuke')):
+            thresholds = {action: int(service.get(guild_id, f'antinuke:{action}')) for action in NUKE_ACTIONS.values()}
+        self.thresholds[guild_id] = (service.version, thresholds)
+        return thresholds
+    
+    def watch(self, guild: discord.Guild):
+        """Have the audit log read for whoever caused a destructive event"""
+        if self.guild_thresholds(guild.id) is None:
+            return
+        if guild.me and guild.me.guild_permissions.view_audit_log:
+            self.feed.notify(guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.watch(channel.guild)
+    
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.watch(role.guild)
+    
+    @commands.Cog.listener()
+    async def on_member_ban(self, guild: discord.Guild, user: discord.User):
+        self.watch(guild)
+    
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        # Kicks have no event of their own; the audit log tells them apart from leaves
+        self.watch(member.guild)
+    
+    @commands.Cog.listener()
+    async def on_webhooks_update(self, channel: discord.abc.GuildChannel):
+        self.watch(channel.guild)
+    
+    async def handle_entries(self, guild: discord.Guild, entries: List[discord.AuditLogEntry]):
+        """Count new audit-log entries per actor and quarantine anyone over a limit"""
+        thresholds = self.guild_thresholds(guild.id)
+        if thresholds is None:
+            return
+        
+        tripped = {}
+        for entry in entries:
+            action = NUKE_ACTIONS.get(entry.action)
+            if action is None or entry.user_id is None:
+                continue
+            # The owner can't be stripped and the bot's own actions are trusted
+            if entry.user_id in (guild.owner_id, self.bot.user.id):
+                continue
+            
+            count = self.tracker.add(guild.id, entry.user_id, action, entry.created_at)
+            if count > thresholds[action]:
+                trips = tripped.setdefault(entry.user_id, {})
+                # Keep when the limit was first crossed, to report how quickly the bot responded
+                first = trips[action][2] if action in trips else entry.created_at
+                trips[action] = (count, thresholds[action], first)
+        
+        for actor_id, trips in tripped.items():
+            await self.quarantine(guild, actor_id, trips)
+    
+    async def quarantine(self, guild: discord.Guild, actor_id: int, trips: dict):
+        """Strip an actor's roles and log it"""
+        key = (guild.id, actor_id)
+        now = time.monotonic()
+        if now - self.quarantined.get(key, -self.bot.config.ANTINUKE_WINDOW) < self.bot.config.ANTINUKE_WINDOW:
+            return
+        self.quarantined[key] = now
+        first_seen = min(created_at for _, _, created_at in trips.values())
+        
+        member = guild.get_member(actor_id)
+        if member is None:
+            result = "Not in the server"
+        elif not guild.me.guild_permissions.manage_roles:
+            result = "No permission to manage roles"
+        else:
+            # Managed roles (bot integrations) and roles above the bot can't be removed
+            kept = [role for role in member.roles if role.is_default() or role.managed or role >= guild.me.top_role]
+            removed = [role for role in member.roles if role not in kept]
+            try:
+                if removed:
+                    await member.edit(roles=kept, reason="Anti-nuke quarantine")
+                result = f"Removed {len(removed)} role(s)"
+                if len(kept) > 1:
+                    result += f", {len(kept) - 1} could not be removed"
+            except discord.HTTPException as e:
+                result = f"Quarantine failed ({e.status})"
+        self.tracker.reset(guild.id, actor_id)
+        
+        latency = (discord.utils.utcnow() - first_seen).total_seconds()
+        summary = ", ".join(f"{action} {count}/{limit}" for action, (count, limit, _) in trips.items())
+        self.recent.append({"guild_id": guild.id, "actor_id": actor_id, "summary": summary, "result": result,
+                            "latency": latency, "at": datetime.now()})
+        
+        logging_cog = self.bot.get_cog('LoggingCog')
+        if logging_cog:
+            await logging_cog.log_automod_action(
+                guild, "Anti-Nuke Quarantine",
+                f"<@{actor_id}> went over the anti-nuke limits and was quarantined.",
+                {"actor_id": str(actor_id), "trips": summary, "result": result, "latency_seconds": round(latency, 3)},
+                [
+                    {"name": "Actor", "value": f"<@{actor_id}> ({actor_id})", "inline": True},
+                    {"name": "Limits", "value": summary, "inline": True},
+                    {"name": "Result", "value": result, "inline": True},
+                    {"name": "Response Time", "value": f"{latency:.2f}s after the action", "inline": True}
+                ]
+            )
+    
+    @commands.hybrid_command(name="antinuke", description="Show anti-nuke settings and recent quarantines")
+    @whitelist_required([Permissions.VIEW_CONFIG])
+    async def antinuke(self, ctx: commands.Context):
+        """Show this server's anti-nuke limits and recent quarantines"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        thresholds = self.guild_thresholds(ctx.guild.id)
+        config = self.bot.config
+        embed = discord.Embed(
+            title="Anti-Nuke",
+            description=(
+                f"**{'On' if thresholds else 'Off'}** • limits per member per {config.ANTINUKE_WINDOW:.0f}s\n"
+                f"Change with `{ctx.prefix}config set antinuke on` or `{ctx.prefix}config set antinuke:<action> <n>`"
+            ),
+            color=discord.Color.green() if thresholds else discord.Color.greyple(),
+            timestamp=datetime.now()
+        )
+        if thresholds:
+            for action, limit in thresholds.items():
+                embed.add_field(name=action.replace('_', ' ').title(), value=str(limit), inline=True)
+            if not ctx.guild.me.guild_permissions.view_audit_log:
+                embed.add_field(name="⚠️ Missing Permission", value="View Audit Log is needed to see who acted",
+                                inline=False)
+        
+        recent = [item for item in self.recent if item["guild_id"] == ctx.guild.id]
+        if recent:
+            embed.add_field(
+                name="Recent Quarantines",
+                value="\n".join(
+                    f"<t:{int(item['at'].timestamp())}:R> <@{item['actor_id']}> • {item['summary']} • "
+                    f"{item['result']} ({item['latency']:.2f}s)"
+                    for item in recent
+                )[:1024],
+                inline=False
+            )
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(AntiNukeCog(bot))
@@ -0,0 +1,178 @@
+import discord
+from discord.ext import commands
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from utils.antispam import AntiSpamEngine, SpamThresholds, SpamViolation, count_links
+from utils.guild_config import is_on
+from utils.permissions import whitelist_required, Permissions
+
+class AntiSpamCog(commands.Cog):
+    """Sliding-window spam detection on every server message"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        config = bot.config
+        self.engine = AntiSpamEngine(
+            config.ANTISPAM_WINDOW, config.ANTISPAM_BUCKETS, config.ANTISPAM_TRACKED_USERS,
+            config.ANTISPAM_TRACKED_CHANNELS, action_cooldown=config.ANTISPAM_ACTION_COOLDOWN
+        )
+        # guild_id -> (settings version, limits or None while anti-spam is off)
+        self.thresholds: Dict[int, Tuple[int, Optional[SpamThresholds]]] = {}
+        self.violations = 0
+    
+    def guild_thresholds(self, guild_id: int) -> Optional[SpamThresholds]:
+        """A guild's limits, re-read only after its settings change"""
+        service = self.bot.guild_config
+        cached = self.thresholds.get(guild_id)
+        if cached is not None and cached[0] == service.version:
+            return cached[1]
+        
+        thresholds = None
+        if is_on(service.get(guild_id, 'antispam')):
+            thresholds = SpamThresholds(
+                *(int(service.get(guild_id, f'antispam:{name}')) for name in SpamThresholds._fields)
+            )
+        self.thresholds[guild_id] = (service.version, thresholds)
+        return thresholds
+    
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.author.bot:
+            return
+        
+        thresholds = self.guild_thresholds(message.guild.id)
+        if thresholds is None:
+            return
+        
+        content = message.content
+        mentions = len(message.mentions) + len(message.role_mentions) + (1 if message.mention_everyone else 0)
+        violations = self.engine.check(
+            message.guild.id, message.channel.id, message.author.id, content, mentions,
+            count_links(content), thresholds
+        )
+        if violations:
+            await self.handle_violations(message, violations)
+    
+    async def handle_violations(self, message: discord.Message, violations: List[SpamViolation]):
+        """Act on a message that put its author, channel or server over a limit"""
+        self.violations += 1
+        guild = message.guild
+        author = message.author
+        by_scope = {}
+        for violation in violations:
+            by_scope.setdefault(violation.scope, []).append(violation)
+        
+        # Moderators still count toward channel and server floods, but aren't punished themselves
+        user_violations = by_scope.get('user')
+        if user_violations and not author.guild_permissions.manage_messages:
+            await self.punish_member(message, user_violations)
+        
+        if 'channel' in by_scope and self.engine.should_act(('channel', message.channel.id)):
+            await self.slow_channel(message.channel, by_scope['channel'][0])
+        
+        if 'guild' in by_scope and self.engine.should_act(('guild', guild.id)):
+            violation = by_scope['guild'][0]
+            await self.log_action(
+                guild, "Server Message Flood",
+                f"{violation.count} messages in the last {self.bot.config.ANTISPAM_WINDOW:.0f}s "
+                f"(limit {violation.limit}). Check for a raid.",
+                {"scope": "guild", "count": violation.count, "limit": violation.limit}
+            )
+    
+    async def punish_member(self, message: discord.Message, violations: List[SpamViolation]):
+        """Delete the message, and time the author out once per cooldown"""
+        guild = message.guild
+        author = message.author
+        action = "None (no permission)"
+        if message.channel.permissions_for(guild.me).manage_messages:
+            try:
+                await message.delete()
+                action = "Message deleted"
+            except discord.HTTPException as e:
+                action = f"Delete failed ({e.status})"
+        
+        if not self.engine.should_act(('user', guild.id, author.id)):
+            return
+        
+        config = self.bot.config
+        reason = ", ".join(f"{violation.metric} {violation.count}/{violation.limit}" for violation in violations)
+        if guild.me.guild_permissions.moderate_members and author.top_role < guild.me.top_role:
+            try:
+                await author.timeout(timedelta(seconds=config.ANTISPAM_TIMEOUT), reason=f"Anti-spam: {reason}")
+                action += f", timed out for {config.ANTISPAM_TIMEOUT}s"
+            except discord.HTTPException as e:
+                action += f", timeout failed ({e.status})"
+        
+        await self.log_action(
+            guild, "Spam Detected",
+            f"{author.mention} went over the anti-spam limits in {message.channel.mention}.",
+            {
+                "scope": "user", "user_id": str(author.id), "channel_id": str(message.channel.id),
+                "violations": [violation._asdict() for violation in violations], "result": action
+            },
+            [
+                {"name": "Member", "value": f"{author.mention} ({author.id})", "inline": True},
+                {"name": "Limits", "value": reason, "inline": True},
+                {"name": "Action", "value": action, "inline": True}
+            ]
+        )
+    
+    async def slow_channel(self, channel: discord.TextChannel, violation: SpamViolation):
+        """Turn on slowmode in a flooded channel"""
+        slowmode = self.bot.config.ANTISPAM_SLOWMODE
+        action = "None (no permission)"
+        if channel.slowmode_delay >= slowmode:
+            action = f"Slowmode already {channel.slowmode_delay}s"
+        elif channel.permissions_for(channel.guild.me).manage_channels:
+            try:
+                await channel.edit(slowmode_delay=slowmode, reason="Anti-spam: channel flood")
+                action = f"Slowmode set to {slowmode}s"
+            except discord.HTTPException as e:
+                action = f"Slowmode failed ({e.status})"
+        
+        await self.log_action(
+            channel.guild, "Channel Flood",
+            f"{violation.count} messages in {channel.mention} in the last "
+            f"{self.bot.config.ANTISPAM_WINDOW:.0f}s (limit {violation.limit}).",
+            {"scope": "channel", "channel_id": str(channel.id), "count": violation.count,
+             "limit": violation.limit, "result": action},
+            [{"name": "Action", "value": action, "inline": True}]
+        )
+    
+    async def log_action(self, guild: discord.Guild, title: str, description: str, data: dict, fields: list = None):
+        logging_cog = self.bot.get_cog('LoggingCog')
+        if logging_cog:
+            await logging_cog.log_automod_action(guild, title, description, data, fields)
+    
+    @commands.hybrid_command(name="antispam", description="Show anti-spam settings and activity")
+    @whitelist_required([Permissions.VIEW_CONFIG])
+    async def antispam(self, ctx: commands.Context):
+        """Show this server's anti-spam limits and what the engine is tracking"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        thresholds = self.guild_thresholds(ctx.guild.id)
+        config = self.bot.config
+        embed = discord.Embed(
+            title="Anti-Spam",
+            description=(
+                f"**{'On' if thresholds else 'Off'}** • limits per {config.ANTISPAM_WINDOW:.0f}s window\n"
+                f"Change with `{ctx.prefix}config set antispam on` or `{ctx.prefix}config set antispam:<limit> <n>`"
+            ),
+            color=discord.Color.green() if thresholds else discord.Color.greyple(),
+            timestamp=datetime.now()
+        )
+        if thresholds:
+            for name, value in thresholds._asdict().items():
+                embed.add_field(name=name.replace('_', ' ').title(), value=str(value), inline=True)
+        embed.add_field(
+            name="Tracking",
+            value=(f"{len(self.engine.users):,} members • {len(self.engine.channels):,} channels • "
+                   f"{self.violations:,} violations since start"),
+            inline=False
+        )
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(AntiSpamCog(bot))
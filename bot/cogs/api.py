@@ -0,0 +1,344 @@
+import ast
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from aiohttp import web
+import discord
+from discord.ext import commands
+from database import DatabaseReader, rollup_window
+from utils.file_utils import FileLogger
+from utils.guild_config import SETTINGS
+
+def parse_list(value) -> list:
+    """Whitelist permissions and attachments are stored as Python list reprs"""
+    try:
+        parsed = ast.literal_eval(value) if value else []
+    except (ValueError, SyntaxError):
+        return []
+    return parsed if isinstance(parsed, list) else []
+
+class ApiCog(commands.Cog):
+    """Local read-only JSON API for the dashboard"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.config = bot.config
+        self.reader = DatabaseReader(bot.config.DATABASE_PATH)
+        self.file_logger = FileLogger(bot.config.LOG_DIR)
+        self.runner: Optional[web.AppRunner] = None
+        # path + query -> (expires_at, etag, body)
+        self.cache: Dict[str, Tuple[float, str, bytes]] = {}
+        self.stats = {"requests": 0, "cache_hits": 0, "not_modified": 0}
+    
+    async def cog_load(self):
+        await self.reader.open()
+        
+        app = web.Application(middlewares=[self.auth_middleware])
+        app.add_routes([
+            web.get('/api/health', self.health),
+            web.get('/api/guilds', self.guilds),
+            web.get('/api/guilds/{guild_id}/config', self.guild_config),
+            web.get('/api/guilds/{guild_id}/whitelist', self.whitelist),
+            web.get('/api/guilds/{guild_id}/commands', self.command_logs),
+            web.get('/api/guilds/{guild_id}/deleted', self.deleted_messages),
+            web.get('/api/guilds/{guild_id}/analytics', self.analytics),
+            web.get('/api/logs', self.log_index),
+            web.get('/api/logs/{log_type}', self.log_lines),
+            web.get('/api/events', self.event_stream),
+        ])
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, self.config.API_HOST, self.config.API_PORT)
+        await site.start()
+        print(f"🌐 Dashboard API listening on http://{self.config.API_HOST}:{self.config.API_PORT}")
+    
+    async def cog_unload(self):
+        # End open streams first so the server can shut down without waiting on them
+        self.bot.events.close_all()
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+        await self.reader.close()
+    
+    @web.middleware
+    async def auth_middleware(self, request: web.Request, handler):
+        """Require the bearer token when API_TOKEN is set"""
+        token = self.config.API_TOKEN
+        if token:
+            supplied = request.headers.get('Authorization', '')
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+                return self.error(401, "Missing or invalid token")
+        return await handler(request)
+    
+    def error(self, status: int, message: str) -> web.Response:
+        return web.json_response({"error": message}, status=status)
+    
+    async def respond(self, request: web.Request, build, ttl: float = None) -> web.Response:
+        """Serve build()'s JSON from the TTL cache, answering If-None-Match with 304"""
+        self.stats["requests"] += 1
+        ttl = self.config.API_CACHE_TTL if ttl is None else ttl
+        now = time.monotonic()
+        key = str(request.rel_url)
+        
+        cached = self.cache.get(key)
+        if cached and cached[0] > now:
+            self.stats["cache_hits"] += 1
+            _, etag, body = cached
+        else:
+            try:
+                data = await build()
+            except ValueError as e:
+                return self.error(400, str(e))
+            if data is None:
+                return self.error(404, "Not found")
+            
+            body = json.dumps(data, separators=(',', ':'), default=str).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            self.store(key, now + ttl, etag, body)
+        
+        headers = {"ETag": etag, "Cache-Control": f"private, max-age={int(ttl)}"}
+        if etag in (tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')):
+            self.stats["not_modified"] += 1
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json', headers=headers)
+    
+    def store(self, key: str, expires_at: float, etag: str, body: bytes):
+        """Cache a response, dropping expired entries and then the oldest when full"""
+        if len(self.cache) >= self.config.API_CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            for stale in [k for k, (expires, *_rest) in self.cache.items() if expires <= now]:
+                del self.cache[stale]
+            while len(self.cache) >= self.config.API_CACHE_MAX_ENTRIES:
+                del self.cache[next(iter(self.cache))]
+        self.cache[key] = (expires_at, etag, body)
+    
+    def get_guild(self, request: web.Request) -> Optional[discord.Guild]:
+        guild_id = request.match_info['guild_id']
+        return self.bot.get_guild(int(guild_id)) if guild_id.isdigit() else None
+    
+    def page_size(self, request: web.Request) -> int:
+        """?limit=, clamped to the configured maximum"""
+        raw = request.query.get('limit')
+        if raw is None:
+            return self.config.API_PAGE_SIZE
+        if not raw.isdigit() or int(raw) < 1:
+            raise ValueError("limit must be a positive integer")
+        return min(int(raw), self.config.API_MAX_PAGE_SIZE)
+    
+    def cursor(self, request: web.Request) -> Optional[int]:
+        """?cursor= as returned in next_cursor"""
+        raw = request.query.get('cursor')
+        if raw is None:
+            return None
+        if not raw.isdigit():
+            raise ValueError("cursor must be a value from next_cursor")
+        return int(raw)
+    
+    async def keyset_page(self, request: web.Request, fetch, serialize) -> Optional[dict]:
+        """One page of a table walked by id; fetch(cursor, limit) returns rows in walk order"""
+        limit = self.page_size(request)
+        cursor = self.cursor(request)
+        # One extra row tells us whether there is a next page
+        rows = await fetch(cursor, limit + 1)
+        next_cursor = str(rows[limit - 1]["id"]) if len(rows) > limit else None
+        return {"items": [serialize(row) for row in rows[:limit]], "next_cursor": next_cursor}
+    
+    async def health(self, request: web.Request) -> web.Response:
+        async def build():
+            return {
+                "status": "ok",
+                "user": str(self.bot.user) if self.bot.user else None,
+                "guilds": len(self.bot.guilds),
+                "latency_ms": round(self.bot.latency * 1000) if self.bot.is_ready() else None,
+                "uptime_seconds": int((discord.utils.utcnow() - self.bot.startup_time).total_seconds())
+                if getattr(self.bot, 'startup_time', None) else None
+            }
+        return await self.respond(request, build, ttl=0)
+    
+    async def guilds(self, request: web.Request) -> web.Response:
+        async def build():
+            guilds = sorted(self.bot.guilds, key=lambda guild: guild.id)
+            limit = self.page_size(request)
+            cursor = self.cursor(request) or 0
+            page = [guild for guild in guilds if guild.id > cursor][:limit + 1]
+            next_cursor = str(page[limit - 1].id) if len(page) > limit else None
+            return {
+                "items": [
+                    {
+                        "id": str(guild.id),
+                        "name": guild.name,
+                        "icon_url": guild.icon.url if guild.icon else None,
+                        "member_count": guild.member_count,
+                        "voice_connected": len(self.bot.voice_index.connected(guild.id))
+                    }
+                    for guild in page[:limit]
+                ],
+                "next_cursor": next_cursor
+            }
+        return await self.respond(request, build)
+    
+    async def guild_config(self, request: web.Request) -> web.Response:
+        async def build():
+            guild = self.get_guild(request)
+            if guild is None:
+                return None
+            # Only known settings; webhook credentials in the same table must never leave the bot
+            service = self.bot.guild_config
+            return {
+                "guild_id": str(guild.id),
+                "settings": {
+                    key: {
+                        "value": service.get(guild.id, key),
+                        "default": service.default(key),
+                        "overridden": service.is_overridden(guild.id, key),
+                        "description": description
+                    }
+                    for key, (description, *_rest) in SETTINGS.items()
+                }
+            }
+        return await self.respond(request, build)
+    
+    async def whitelist(self, request: web.Request) -> web.Response:
+        guild = self.get_guild(request)
+        if guild is None:
+            return self.error(404, "Not found")
+        
+        async def build():
+            return await self.keyset_page(
+                request,
+                lambda cursor, limit: self.reader.get_whitelist_page(str(guild.id), cursor or 0, limit),
+                lambda row: {
+                    "id": row["id"],
+                    "type": row["type"],
+                    "discord_id": row["discord_id"],
+                    "permissions": parse_list(row["permissions"]),
+                    "added_by": row["added_by"],
+                    "added_at": row["added_at"]
+                }
+            )
+        return await self.respond(request, build)
+    
+    async def command_logs(self, request: web.Request) -> web.Response:
+        guild = self.get_guild(request)
+        if guild is None:
+            return self.error(404, "Not found")
+        
+        async def build():
+            return await self.keyset_page(
+                request,
+                lambda cursor, limit: self.reader.get_command_logs_page(str(guild.id), cursor, limit),
+                lambda row: {**row, "success": bool(row["success"])}
+            )
+        return await self.respond(request, build)
+    
+    async def deleted_messages(self, request: web.Request) -> web.Response:
+        guild = self.get_guild(request)
+        if guild is None:
+            return self.error(404, "Not found")
+        
+        async def build():
+            return await self.keyset_page(
+                request,
+                lambda cursor, limit: self.reader.get_deleted_messages_page(str(guild.id), cursor, limit),
+                lambda row: {**row, "attachments": parse_list(row["attachments"])}
+            )
+        return await self.respond(request, build)
+    
+    async def analytics(self, request: web.Request) -> web.Response:
+        guild = self.get_guild(request)
+        if guild is None:
+            return self.error(404, "Not found")
+        
+        async def build():
+            raw = request.query.get('days', '7')
+            if not raw.isdigit() or not 1 <= int(raw) <= 365:
+                raise ValueError("days must be between 1 and 365")
+            granularity, since = rollup_window(int(raw))
+            data = await self.reader.get_analytics(str(guild.id), since, granularity, self.page_size(request))
+            return {"days": int(raw), "granularity": granularity, "since": since, **data}
+        return await self.respond(request, build)
+    
+    async def log_index(self, request: web.Request) -> web.Response:
+        async def build():
+            date = request.query.get('date')
+            if date is not None:
+                self.parse_date(date)
+            return {
+                "dates": self.file_logger.get_available_dates(),
+                "types": self.file_logger.get_log_types(date)
+            }
+        return await self.respond(request, build)
+    
+    async def log_lines(self, request: web.Request) -> web.Response:
+        async def build():
+            log_type = request.match_info['log_type']
+            date_str = request.query.get('date') or datetime.now().strftime('%Y-%m-%d')
+            date = self.parse_date(date_str)
+            # Only directories that exist, so log_type can't walk out of the log folder
+            if log_type not in self.file_logger.get_log_types(date_str):
+                return None
+            
+            # The cursor is the byte offset the previous page started at; pages walk back from the end
+            page = await self.file_logger.read_lines_at(
+                log_type, date, self.cursor(request), self.page_size(request)
+            )
+            if page is None:
+                return None
+            return {
+                "date": date_str,
+                "items": page["lines"],
+                "next_cursor": str(page["start"]) if page["start"] > 0 else None,
+                "size": page["size"]
+            }
+        return await self.respond(request, build)
+    
+    async def event_stream(self, request: web.Request) -> web.StreamResponse:
+        """Server-Sent Events stream of live log events, resumable with Last-Event-ID"""
+        guild_id = request.query.get('guild_id')
+        if guild_id is not None and not guild_id.isdigit():
+            return self.error(400, "guild_id must be a server ID")
+        event_types = [name for name in request.query.get('types', '').split(',') if name]
+        last_event_id = request.headers.get('Last-Event-ID') or request.query.get('last_event_id')
+        
+        response = web.StreamResponse(headers={
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        })
+        await response.prepare(request)
+        await response.write(b"retry: 3000\n\n")
+        
+        subscription = self.bot.events.subscribe(guild_id, event_types, last_event_id)
+        try:
+            while True:
+                try:
+                    event = await subscription.get(self.config.EVENT_STREAM_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    await response.write(b": keep-alive\n\n")
+                    continue
+                
+                if event is None:
+                    # Dropped for falling behind (or shutting down); the client reconnects with its last id
+                    await response.write(f"event: end\ndata: {subscription.close_reason}\n\n".encode())
+                    break
+                data = json.dumps(event, separators=(',', ':'), default=str)
+                await response.write(f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n".encode())
+        except ConnectionResetError:
+            pass
+        finally:
+            subscription.close()
+        return response
+    
+    @staticmethod
+    def parse_date(value: str) -> datetime:
+        try:
+            return datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            raise ValueError("date must be YYYY-MM-DD")
+
+async def setup(bot):
+    await bot.add_cog(ApiCog(bot))
@@ -0,0 +1,426 @@
+import discord
+from discord.ext import commands
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from utils.guild_config import is_on
+from utils.keyword_filter import HOST_CHARS, FilterMatch, KeywordFilterCache, KeywordMatcher, normalize
+from utils.regex_rules import RegexRuleEngine, RuleStats, compile_rule
+from utils.permissions import whitelist_required, Permissions
+from utils.embed_utils import EmbedBuilder
+
+# Command argument -> list setting it edits
+FILTER_LISTS = {'word': 'automod:words', 'domain': 'automod:domains'}
+
+def clean_domain(value: str) -> str:
+    """Reduce a pasted link or host to the bare domain; raises ValueError if it isn't one"""
+    value = value.strip().lower()
+    for scheme in ('https://', 'http://'):
+        if value.startswith(scheme):
+            value = value[len(scheme):]
+    value = value.split('/', 1)[0].split('?', 1)[0].split('#', 1)[0].strip('.')
+    if value.startswith('www.'):
+        value = value[4:]
+    if '.' not in value or not set(value) <= HOST_CHARS:
+        raise ValueError("Give a domain like `example.com`")
+    return value
+
+class AutoModCog(commands.Cog):
+    """Deletes messages containing a server's blocked words, phrases, link domains or regex matches"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        config = bot.config
+        self.filters = KeywordFilterCache()
+        self.regex = RegexRuleEngine(
+            config.AUTOMOD_REGEX_WORKERS, config.AUTOMOD_REGEX_BATCH_SIZE, config.AUTOMOD_REGEX_BATCH_DELAY,
+            config.AUTOMOD_REGEX_TIMEOUT, config.AUTOMOD_REGEX_STRIKES, on_disable=self.disable_rule
+        )
+        # guild_id -> (settings version, whether the filter is on)
+        self.enabled: Dict[int, Tuple[int, bool]] = {}
+        # guild_id -> (stored rules value, enabled (rule_id, pattern) pairs)
+        self.rule_sets: Dict[int, Tuple[Optional[str], tuple]] = {}
+        self.deleted = 0
+    
+    async def cog_unload(self):
+        await self.regex.stop()
+    
+    def is_enabled(self, guild_id: int) -> bool:
+        service = self.bot.guild_config
+        cached = self.enabled.get(guild_id)
+        if cached is None or cached[0] != service.version:
+            cached = self.enabled[guild_id] = (service.version, is_on(service.get(guild_id, 'automod')))
+        return cached[1]
+    
+    def guild_matcher(self, guild_id: int) -> Optional[KeywordMatcher]:
+        """A guild's compiled word/domain filter, or None if it has none; recompiled only when its lists change"""
+        service = self.bot.guild_config
+        raw_words = service.get_raw(guild_id, 'automod:words')
+        raw_domains = service.get_raw(guild_id, 'automod:domains')
+        if raw_words is None and raw_domains is None:
+            return None
+        return self.filters.get(
+            guild_id, raw_words, raw_domains,
+            service.get_list(guild_id, 'automod:words'), service.get_list(guild_id, 'automod:domains')
+        )
+    
+    def guild_rules(self, guild_id: int) -> tuple:
+        """A guild's enabled regex rules as (rule_id, pattern) pairs, re-read only when its rules change"""
+        raw = self.bot.guild_config.get_raw(guild_id, 'automod:regex')
+        cached = self.rule_sets.get(guild_id)
+        if cached is not None and cached[0] == raw:
+            return cached[1]
+        
+        rules = tuple(
+            (rule['id'], rule['pattern'])
+            for rule in self.bot.guild_config.get_list(guild_id, 'automod:regex') if rule['enabled']
+        )
+        self.rule_sets[guild_id] = (raw, rules)
+        return rules
+    
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.guild is None or message.author.bot or not message.content:
+            return
+        if not self.is_enabled(message.guild.id):
+            return
+        
+        matcher = self.guild_matcher(message.guild.id)
+        matches = matcher.search(message.content) if matcher else []
+        rules = self.guild_rules(message.guild.id)
+        if not matches and not rules:
+            return
+        if message.author.guild_permissions.manage_messages:
+            return
+        # Unblocking a term means typing it; only for members allowed to run the command
+        if message.content.startswith(f"{self.bot.guild_config.get_prefix(message.guild)}automod"):
+            ctx = await self.bot.get_context(message)
+            if await self.bot.permission_manager.check_whitelist(ctx, [Permissions.MANAGE_CONFIG]):
+                return
+        
+        if not matches:
+            # Regex rules run in worker processes, so a pathological pattern can't stall the event loop
+            hit = await self.regex.check(message.guild.id, rules, message.content)
+            if hit is None:
+                return
+            pattern = dict(rules).get(hit.rule_id, "")
+            matches = [FilterMatch(f"#{hit.rule_id}: {pattern}", 'pattern', hit.start, hit.end)]
+        await self.handle_match(message, matches[0])
+    
+    async def handle_match(self, message: discord.Message, match):
+        """Delete a message with a blocked term and log it"""
+        self.deleted += 1
+        guild = message.guild
+        action = "None (no permission)"
+        if message.channel.permissions_for(guild.me).manage_messages:
+            try:
+                await message.delete()
+                action = "Message deleted"
+            except discord.HTTPException as e:
+                action = f"Delete failed ({e.status})"
+        
+        logging_cog = self.bot.get_cog('LoggingCog')
+        if logging_cog:
+            await logging_cog.log_automod_action(
+                guild, "Blocked Content",
+                f"{message.author.mention} posted a blocked {match.kind} in {message.channel.mention}.",
+                {
+                    "user_id": str(message.author.id), "channel_id": str(message.channel.id),
+                    "kind": match.kind, "term": match.term, "content": message.content[:1000], "result": action
+                },
+                [
+                    {"name": "Member", "value": f"{message.author.mention} ({message.author.id})", "inline": True},
+                    {"name": "Matched", "value": f"{match.kind} `{match.term}`", "inline": True},
+                    {"name": "Action", "value": action, "inline": True},
+                    {"name": "Message", "value": message.content[:1024], "inline": False}
+                ]
+            )
+    
+    @commands.hybrid_group(name="automod", description="Manage blocked words and domains")
+    async def automod(self, ctx: commands.Context):
+        """Blocked word and domain commands"""
+        if ctx.invoked_subcommand is None:
+            embed = discord.Embed(
+                title="AutoMod Commands",
+                description="Available filter commands:",
+                color=discord.Color.blue()
+            )
+            embed.add_field(
+                name="Commands",
+                value=(
+                    "`automod add <word|domain> <term>` - Block a word, phrase or link domain\n"
+                    "`automod remove <word|domain> <term>` - Unblock it\n"
+                    "`automod list` - Show blocked terms\n"
+                    "`automod regex add|remove|enable|list` - Custom regex rules and what they cost\n"
+                    "`config set automod on` - Turn the filter on"
+                ),
+                inline=False
+            )
+            embed.add_field(
+                name="Matching",
+                value=(
+                    "Case, accents, look-alike letters and invisible characters are ignored. Words match whole "
+                    "words only; put `*` at either end to also match inside longer words (`spam*`). Domains "
+                    "also match their subdomains."
+                ),
+                inline=False
+            )
+            await ctx.send(embed=embed)
+    
+    def parse_term(self, kind: str, term: str) -> Tuple[str, str]:
+        """The list key and stored form for a term; raises ValueError for bad input"""
+        kind = kind.lower()
+        if kind not in FILTER_LISTS:
+            raise ValueError("Type must be `word` or `domain`")
+        term = ' '.join(term.split()).lower()
+        if kind == 'domain':
+            term = clean_domain(term)
+        elif not term.strip('*'):
+            raise ValueError("Give a word or phrase to block")
+        if len(term) > self.bot.config.AUTOMOD_MAX_TERM_LENGTH:
+            raise ValueError(f"Terms can be at most {self.bot.config.AUTOMOD_MAX_TERM_LENGTH} characters")
+        return FILTER_LISTS[kind], term
+    
+    @automod.command(name="add", description="Block a word, phrase or link domain")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def automod_add(self, ctx: commands.Context, kind: str, *, term: str):
+        """Add a term to this server's filter"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        try:
+            key, term = self.parse_term(kind, term)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        service = self.bot.guild_config
+        items = service.get_list(ctx.guild.id, key)
+        # Compare normalized forms, so look-alike spellings of a blocked term aren't stored twice
+        if normalize(term) in {normalize(item) for item in items}:
+            await ctx.send(f"ℹ️ `{term}` is already blocked.")
+            return
+        total = sum(len(service.get_list(ctx.guild.id, other)) for other in FILTER_LISTS.values())
+        limit = self.bot.config.AUTOMOD_MAX_TERMS
+        if total >= limit:
+            await ctx.send(f"❌ This server already has {total} blocked terms (limit {limit}).")
+            return
+        
+        await service.set_list(ctx.guild, key, items + [term])
+        description = f"Blocked {kind.lower()} `{term}`."
+        if not is_on(service.get(ctx.guild.id, 'automod')):
+            description += f"\nThe filter is off; turn it on with `{ctx.prefix}config set automod on`."
+        await ctx.send(embed=EmbedBuilder.create_success_embed("Term Blocked", description, ctx.author))
+    
+    @automod.command(name="remove", description="Unblock a word, phrase or link domain")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def automod_remove(self, ctx: commands.Context, kind: str, *, term: str):
+        """Remove a term from this server's filter"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        try:
+            key, term = self.parse_term(kind, term)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        service = self.bot.guild_config
+        items = service.get_list(ctx.guild.id, key)
+        remaining = [item for item in items if normalize(item) != normalize(term)]
+        if len(remaining) == len(items):
+            await ctx.send(f"❌ `{term}` isn't blocked.")
+            return
+        
+        await service.set_list(ctx.guild, key, remaining)
+        await ctx.send(f"✅ Unblocked {kind.lower()} `{term}`.")
+    
+    @automod.command(name="list", description="Show blocked words and domains")
+    @whitelist_required([Permissions.VIEW_CONFIG])
+    async def automod_list(self, ctx: commands.Context):
+        """Show this server's blocked terms"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        service = self.bot.guild_config
+        enabled = is_on(service.get(ctx.guild.id, 'automod'))
+        embed = discord.Embed(
+            title="AutoMod Filter",
+            description=f"**{'On' if enabled else 'Off'}** • {self.deleted:,} messages removed since start",
+            color=discord.Color.green() if enabled else discord.Color.greyple(),
+            timestamp=datetime.now()
+        )
+        for kind, key in FILTER_LISTS.items():
+            items = service.get_list(ctx.guild.id, key)
+            value = ", ".join(f"`{item}`" for item in items) or "None"
+            if len(value) > 1024:
+                value = value[:1000].rsplit(", ", 1)[0] + f", … ({len(items)} total)"
+            embed.add_field(name=f"Blocked {kind.title()}s", value=value, inline=False)
+        await ctx.send(embed=embed)
+    
+    async def disable_rule(self, guild_id: int, rule_id: int, stats: RuleStats):
+        """Switch off a rule that keeps timing out, and tell the server"""
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        
+        service = self.bot.guild_config
+        rules = service.get_list(guild_id, 'automod:regex')
+        for rule in rules:
+            if rule['id'] == rule_id:
+                rule['enabled'] = False
+                rule['disabled_reason'] = f"timed out {stats.timeouts} times"
+                break
+        else:
+            return
+        await service.set_list(guild, 'automod:regex', rules)
+        
+        logging_cog = self.bot.get_cog('LoggingCog')
+        if logging_cog:
+            timeout = self.bot.config.AUTOMOD_REGEX_TIMEOUT
+            await logging_cog.log_automod_action(
+                guild, "Regex Rule Disabled",
+                f"Rule #{rule_id} ran longer than {timeout}s on a message {stats.timeouts} times and was "
+                f"switched off. Fix the pattern and re-enable it with `automod regex enable {rule_id}`.",
+                {"rule_id": rule_id, "pattern": rule['pattern'], "timeouts": stats.timeouts,
+                 "evaluations": stats.evals},
+                [{"name": "Pattern", "value": f"`{rule['pattern']}`", "inline": False}]
+            )
+    
+    @automod.group(name="regex", description="Custom regex rules")
+    async def automod_regex(self, ctx: commands.Context):
+        """Custom regex rule commands"""
+        if ctx.invoked_subcommand is None:
+            await ctx.send(
+                f"ℹ️ Use `{ctx.prefix}automod regex add <pattern>`, `remove <id>`, `enable <id>` or `list`."
+            )
+    
+    @automod_regex.command(name="add", description="Delete messages matching a regex")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def automod_regex_add(self, ctx: commands.Context, *, pattern: str):
+        """Add a case-insensitive regex rule"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        config = self.bot.config
+        try:
+            compile_rule(pattern, config.AUTOMOD_REGEX_MAX_LENGTH)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        service = self.bot.guild_config
+        rules = service.get_list(ctx.guild.id, 'automod:regex')
+        limit = config.AUTOMOD_REGEX_MAX_RULES
+        if len(rules) >= limit:
+            await ctx.send(f"❌ This server already has {len(rules)} regex rules (limit {limit}).")
+            return
+        if any(rule['pattern'] == pattern for rule in rules):
+            await ctx.send("ℹ️ That pattern is already a rule.")
+            return
+        
+        rule_id = max((rule['id'] for rule in rules), default=0) + 1
+        rules.append({"id": rule_id, "pattern": pattern, "enabled": True})
+        await service.set_list(ctx.guild, 'automod:regex', rules)
+        description = (
+            f"Rule #{rule_id}: `{pattern}`\nRules that spend over {config.AUTOMOD_REGEX_TIMEOUT}s on one message "
+            f"{config.AUTOMOD_REGEX_STRIKES} times are switched off."
+        )
+        if not is_on(service.get(ctx.guild.id, 'automod')):
+            description += f"\nThe filter is off; turn it on with `{ctx.prefix}config set automod on`."
+        await ctx.send(embed=EmbedBuilder.create_success_embed("Regex Rule Added", description, ctx.author))
+    
+    @automod_regex.command(name="remove", description="Delete a regex rule")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def automod_regex_remove(self, ctx: commands.Context, rule_id: int):
+        """Remove a regex rule by number"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        service = self.bot.guild_config
+        rules = service.get_list(ctx.guild.id, 'automod:regex')
+        remaining = [rule for rule in rules if rule['id'] != rule_id]
+        if len(remaining) == len(rules):
+            await ctx.send(f"❌ There is no regex rule #{rule_id}.")
+            return
+        
+        await service.set_list(ctx.guild, 'automod:regex', remaining)
+        self.regex.forget(ctx.guild.id, rule_id)
+        await ctx.send(f"✅ Removed regex rule #{rule_id}.")
+    
+    @automod_regex.command(name="enable", description="Turn a switched-off regex rule back on")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def automod_regex_enable(self, ctx: commands.Context, rule_id: int):
+        """Re-enable a rule, clearing its timeout count"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        service = self.bot.guild_config
+        rules = service.get_list(ctx.guild.id, 'automod:regex')
+        rule = next((rule for rule in rules if rule['id'] == rule_id), None)
+        if rule is None:
+            await ctx.send(f"❌ There is no regex rule #{rule_id}.")
+            return
+        if rule['enabled']:
+            await ctx.send(f"ℹ️ Regex rule #{rule_id} is already on.")
+            return
+        
+        rule['enabled'] = True
+        rule.pop('disabled_reason', None)
+        await service.set_list(ctx.guild, 'automod:regex', rules)
+        self.regex.forget(ctx.guild.id, rule_id)
+        await ctx.send(f"✅ Regex rule #{rule_id} is on again.")
+    
+    @automod_regex.command(name="list", description="Show regex rules and their CPU cost")
+    @whitelist_required([Permissions.VIEW_CONFIG])
+    async def automod_regex_list(self, ctx: commands.Context):
+        """Show this server's regex rules with evaluations, CPU time and timeouts since start"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        rules = self.bot.guild_config.get_list(ctx.guild.id, 'automod:regex')
+        engine = self.regex
+        embed = discord.Embed(
+            title="Regex Rules",
+            description=(
+                f"{len(rules)}/{self.bot.config.AUTOMOD_REGEX_MAX_RULES} rules • CPU time in the rule workers since "
+                f"start • timeout {self.bot.config.AUTOMOD_REGEX_TIMEOUT}s per message"
+            ),
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        footer = (f"{engine.batches:,} batches • {engine.restarts} worker restarts • "
+                  f"{engine.skipped:,} skipped when busy")
+        shown = 0
+        for rule in rules[:25]:
+            stats = engine.stats.get((ctx.guild.id, rule['id'])) or RuleStats()
+            status = "On" if rule['enabled'] else f"Off ({rule.get('disabled_reason', 'disabled')})"
+            mean = stats.seconds / stats.evals * 1e6 if stats.evals else 0.0
+            pattern = rule['pattern'] if len(rule['pattern']) <= 60 else rule['pattern'][:59] + "…"
+            name = f"#{rule['id']} • {status}"[:256]
+            value = (
+                f"`{pattern}`\n"
+                f"{stats.evals:,} runs • {stats.seconds * 1000:,.1f}ms total • {mean:,.1f}µs avg • "
+                f"{stats.worst * 1000:,.2f}ms worst • {stats.hits:,} hits • {stats.timeouts} timeouts"
+            )[:1024]
+            # Discord rejects embeds over 6000 characters; leave room for the footer and its "more" note
+            if len(embed) + len(name) + len(value) + len(footer) + 40 > 6000:
+                break
+            embed.add_field(name=name, value=value, inline=False)
+            shown += 1
+        if shown < len(rules):
+            footer += f" • {len(rules) - shown} more not shown"
+        if not rules:
+            embed.add_field(name="No Rules", value=f"Add one with `{ctx.prefix}automod regex add <pattern>`",
+                            inline=False)
+        embed.set_footer(text=footer)
+        await ctx.send(embed=embed)
+
+async def setup(bot):
+    await bot.add_cog(AutoModCog(bot))
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import discord
+from discord.ext import commands
+from datetime import datetime
+from utils.backup import BackupManager
+from utils.embed_utils import EmbedBuilder
+
+class BackupCog(commands.Cog):
+    """Scheduled online backups of the bot database, with restore"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        config = bot.config
+        self.manager = BackupManager(
+            config.DATABASE_PATH, config.BACKUP_DIR, config.BACKUP_KEEP,
+            config.BACKUP_STEP_PAGES, config.BACKUP_STEP_SLEEP
+        )
+        self.logger = logging.getLogger('security_bot')
+        self._task = None
+    
+    async def cog_load(self):
+        if self.bot.config.BACKUP_INTERVAL_HOURS > 0:
+            self._task = asyncio.get_running_loop().create_task(self._backup_loop(), name='database-backup')
+    
+    async def cog_unload(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def _backup_loop(self):
+        interval = self.bot.config.BACKUP_INTERVAL_HOURS * 3600
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                result = await self.manager.create()
+                self.logger.info(
+                    f"Database backup {result['name']} written in {result['duration']:.1f}s "
+                    f"(writers stalled at most {result['writer_stall_max_ms']:.0f}ms)"
+                )
+            except Exception as e:
+                self.logger.error(f"Database backup failed: {e}")
+    
+    @commands.hybrid_group(name="backup", description="Back up or restore the bot database")
+    @commands.is_owner()
+    async def backup(self, ctx: commands.Context):
+        """Database backup commands (bot owner only)"""
+        if ctx.invoked_subcommand is None:
+            embed = discord.Embed(
+                title="Backup Commands",
+                description="Available backup commands (bot owner only):",
+                color=discord.Color.blue()
+            )
+            embed.add_field(
+                name="Commands",
+                value=(
+                    "`backup now` - Back up the database\n"
+                    "`backup list` - Show stored backups\n"
+                    "`backup restore <name> CONFIRM` - Replace the database with a backup"
+                ),
+                inline=False
+            )
+            await ctx.send(embed=embed)
+    
+    @backup.command(name="now", description="Back up the database now")
+    @commands.is_owner()
+    async def backup_now(self, ctx: commands.Context):
+        """Take a verified backup and report how it went"""
+        if self.manager.lock.locked():
+            await ctx.send("❌ A backup or restore is already running.")
+            return
+        
+        await ctx.send("💾 Backing up the database…")
+        try:
+            result = await self.manager.create()
+        except Exception as e:
+            await ctx.send(f"❌ Backup failed: {e}")
+            return
+        
+        embed = EmbedBuilder.create_success_embed(
+            "Backup Complete", f"`{result['name']}` passed its integrity check.", ctx.author
+        )
+        embed.add_field(name="Size", value=f"{result['size'] / 1024 / 1024:,.1f} MiB", inline=True)
+        embed.add_field(name="Duration", value=f"{result['duration']:.2f}s", inline=True)
+        embed.add_field(
+            name="Writer Stall",
+            value=f"max {result['writer_stall_max_ms']:.0f}ms • total {result['writer_stall_total_ms']:.0f}ms",
+            inline=True
+        )
+        steps = f"{result['steps']} steps"
+        if result["restarts"]:
+            steps += f", restarted {result['restarts']}x by writes"
+        if result["single_step"]:
+            steps += ", finished in one step"
+        embed.add_field(name="Copy", value=steps, inline=False)
+        if result["removed"]:
+            embed.add_field(name="Rotated Out", value="\n".join(result["removed"])[:1024], inline=False)
+        await ctx.send(embed=embed)
+    
+    @backup.command(name="list", description="Show stored backups")
+    @commands.is_owner()
+    async def backup_list(self, ctx: commands.Context):
+        """List backups, newest first"""
+        backups = self.manager.list_backups()
+        if not backups:
+            await ctx.send("📝 No backups yet.")
+            return
+        
+        lines = [
+            f"`{backup['name']}` • {backup['size'] / 1024 / 1024:,.1f} MiB • <t:{int(backup['created'])}:R>"
+            for backup in backups[:25]
+        ]
+        embed = discord.Embed(
+            title="Database Backups",
+            description="\n".join(lines),
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.set_footer(text=f"Keeping the newest {self.bot.config.BACKUP_KEEP} scheduled backups")
+        await ctx.send(embed=embed)
+    
+    @backup.command(name="restore", description="Replace the database with a backup")
+    @commands.is_owner()
+    async def backup_restore(self, ctx: commands.Context, name: str, confirm: str = None):
+        """Restore a backup (requires confirmation); the current data is backed up first"""
+        if confirm != "CONFIRM":
+            await ctx.send(
+                f"⚠️ This replaces ALL bot data (every server) with `{name}`.\n"
+                f"To confirm, use: `{ctx.prefix}backup restore {name} CONFIRM`"
+            )
+            return
+        if self.manager.lock.locked():
+            await ctx.send("❌ A backup or restore is already running.")
+            return
+        
+        try:
+            result = await self.manager.restore(name)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        except Exception as e:
+            await ctx.send(f"❌ Restore failed: {e}")
+            return
+        
+        # Drop in-memory state that mirrors the database
+        await self.bot.guild_config.load()
+        self.bot.log_router.webhooks.clear()
+        for guild in self.bot.guilds:
+            self.bot.permission_manager.bump_whitelist_version(str(guild.id))
+        
+        embed = EmbedBuilder.create_success_embed(
+            "Restore Complete",
+            f"Restored `{result['name']}` in {result['duration']:.2f}s.\n"
+            f"The previous data was saved as `{result['pre_restore']}`.",
+            ctx.author
+        )
+        await ctx.send(embed=embed)
+        logging_cog = self.bot.get_cog('LoggingCog')
+        if logging_cog:
+            await logging_cog.log_console(f"Database restored from {result['name']} by {ctx.author} ({ctx.author.id})")
+
+async def setup(bot):
+    await bot.add_cog(BackupCog(bot))
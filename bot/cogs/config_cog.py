@@ -0,0 +1,128 @@
+import discord
+from discord.ext import commands
+from datetime import datetime
+from utils.permissions import whitelist_required, Permissions
+from utils.embed_utils import EmbedBuilder
+from utils.guild_config import SETTINGS
+
+class ConfigCog(commands.Cog):
+    """Per-guild settings commands"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.service = bot.guild_config
+    
+    @commands.hybrid_group(name="config", description="View and change this server's bot settings")
+    async def config(self, ctx: commands.Context):
+        """Server settings commands"""
+        if ctx.invoked_subcommand is None:
+            embed = discord.Embed(
+                title="Configuration Commands",
+                description="Available configuration commands:",
+                color=discord.Color.blue()
+            )
+            embed.add_field(
+                name="Commands",
+                value=(
+                    "`config list` - Show every setting\n"
+                    "`config get <key>` - Show one setting\n"
+                    "`config set <key> <value>` - Change a setting\n"
+                    "`config reset <key>` - Go back to the default\n"
+                    "`config reload` - Re-read settings from the database"
+                ),
+                inline=False
+            )
+            await ctx.send(embed=embed)
+    
+    @config.command(name="list", description="Show every setting for this server")
+    @whitelist_required([Permissions.VIEW_CONFIG])
+    async def config_list(self, ctx: commands.Context):
+        """Show every setting and whether it is the default"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        embed = discord.Embed(
+            title="Server Configuration",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        for key, (description, *_rest) in SETTINGS.items():
+            value = self.service.describe(key, self.service.get(ctx.guild.id, key))
+            source = "" if self.service.is_overridden(ctx.guild.id, key) else " (default)"
+            embed.add_field(name=f"`{key}`", value=f"{value}{source}\n{description}", inline=False)
+        await ctx.send(embed=embed)
+    
+    @config.command(name="get", description="Show one setting")
+    @whitelist_required([Permissions.VIEW_CONFIG])
+    async def config_get(self, ctx: commands.Context, key: str):
+        """Show one setting"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        key = key.lower()
+        if key not in SETTINGS:
+            await ctx.send(f"❌ Unknown setting `{key}`. Available: {', '.join(SETTINGS)}")
+            return
+        
+        value = self.service.describe(key, self.service.get(ctx.guild.id, key))
+        source = "" if self.service.is_overridden(ctx.guild.id, key) else " (default)"
+        await ctx.send(f"⚙️ `{key}` = {value}{source}")
+    
+    @config.command(name="set", description="Change a setting")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def config_set(self, ctx: commands.Context, key: str, *, value: str):
+        """Change a setting; takes effect immediately"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        key = key.lower()
+        try:
+            stored = await self.service.set(ctx.guild, key, value)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        embed = EmbedBuilder.create_success_embed(
+            "Setting Updated",
+            f"`{key}` is now {self.service.describe(key, stored)}",
+            ctx.author
+        )
+        await ctx.send(embed=embed)
+    
+    @config.command(name="reset", description="Go back to the default for a setting")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def config_reset(self, ctx: commands.Context, key: str):
+        """Remove this server's value for a setting"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        key = key.lower()
+        try:
+            existed = await self.service.reset(ctx.guild, key)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        default = self.service.describe(key, self.service.default(key))
+        if existed:
+            await ctx.send(f"✅ `{key}` reset to the default ({default}).")
+        else:
+            await ctx.send(f"ℹ️ `{key}` was already using the default ({default}).")
+    
+    @config.command(name="reload", description="Re-read this server's settings from the database")
+    @whitelist_required([Permissions.MANAGE_CONFIG])
+    async def config_reload(self, ctx: commands.Context):
+        """Pick up changes made to the database outside the bot"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        await self.service.reload(ctx.guild.id)
+        await ctx.send(f"✅ Reloaded settings. Prefix is now `{self.service.get_prefix(ctx.guild)}`.")
+
+async def setup(bot):
+    await bot.add_cog(ConfigCog(bot))
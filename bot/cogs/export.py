@@ -0,0 +1,163 @@
+import asyncio
+import os
+import discord
+from discord.ext import commands
+from datetime import datetime
+from typing import Dict, Optional
+from utils.permissions import whitelist_required, Permissions
+from utils.exporter import EXPORT_FORMATS, EXPORT_TABLES, LogExport
+
+class ExportCog(commands.Cog):
+    """Streams command logs and deleted messages to files for compliance requests"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        # guild_id -> the export running (or last run) for that guild
+        self.exports: Dict[int, LogExport] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+    
+    async def cog_unload(self):
+        for export in self.exports.values():
+            export.cancel()
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+    
+    @commands.hybrid_group(name="export", description="Export logs to a file")
+    async def export(self, ctx: commands.Context):
+        """Log export commands"""
+        if ctx.invoked_subcommand is None:
+            embed = discord.Embed(
+                title="Export Commands",
+                description="Available export commands:",
+                color=discord.Color.blue()
+            )
+            embed.add_field(
+                name="Commands",
+                value=(
+                    f"`export start <{'|'.join(EXPORT_TABLES)}> [from YYYY-MM-DD] [to YYYY-MM-DD] "
+                    f"[{'|'.join(EXPORT_FORMATS)}] [gzip]` - Export this server's rows\n"
+                    "`export status` - Show the current export\n"
+                    "`export cancel` - Stop the current export"
+                ),
+                inline=False
+            )
+            await ctx.send(embed=embed)
+    
+    @export.command(name="start", description="Export this server's command logs or deleted messages")
+    @whitelist_required([Permissions.EXPORT_LOGS])
+    async def export_start(self, ctx: commands.Context, export_type: str, start: Optional[str] = None,
+                           end: Optional[str] = None, fmt: str = "ndjson", gzip: bool = True):
+        """Stream rows for a date range (UTC, inclusive) to a file"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        running = self.tasks.get(ctx.guild.id)
+        if running and not running.done():
+            await ctx.send("❌ An export is already running in this server. Use `export cancel` to stop it.")
+            return
+        
+        try:
+            start_date = datetime.strptime(start, '%Y-%m-%d') if start else None
+            end_date = datetime.strptime(end, '%Y-%m-%d') if end else None
+        except ValueError:
+            await ctx.send("❌ Invalid date. Use the format YYYY-MM-DD")
+            return
+        
+        config = self.bot.config
+        try:
+            export = LogExport(
+                config.DATABASE_PATH, config.EXPORT_DIR, str(ctx.guild.id), export_type.lower(), fmt.lower(),
+                start_date, end_date, gzip, config.EXPORT_CHUNK_SIZE
+            )
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        self.exports[ctx.guild.id] = export
+        task = asyncio.create_task(self.run_export(ctx, export), name=f"export-{ctx.guild.id}")
+        self.tasks[ctx.guild.id] = task
+        task.add_done_callback(lambda _: self.tasks.pop(ctx.guild.id, None))
+    
+    async def run_export(self, ctx: commands.Context, export: LogExport):
+        """Run an export, editing one progress message, then deliver the file"""
+        progress = await ctx.send(f"📦 Exporting {export.export_type}: starting…")
+        
+        async def report_progress():
+            # Message edits have their own rate limit, so refresh on a timer rather than per chunk
+            while True:
+                await asyncio.sleep(self.bot.config.EXPORT_PROGRESS_INTERVAL)
+                try:
+                    await progress.edit(content=f"📦 Exporting {export.export_type}: {export.progress_text()}")
+                except discord.HTTPException:
+                    pass
+        
+        reporter = asyncio.create_task(report_progress())
+        try:
+            await export.run()
+        finally:
+            reporter.cancel()
+        
+        if export.status == 'cancelled':
+            await self.edit_or_send(ctx, progress, f"⏹️ Export cancelled after {export.rows:,} rows.")
+            return
+        if export.status == 'failed':
+            await self.edit_or_send(ctx, progress, f"❌ Export failed: {export.error}")
+            return
+        
+        size = os.path.getsize(export.path)
+        summary = (f"✅ Exported {export.rows:,} {export.export_type} rows "
+                   f"({size / 1024 / 1024:,.1f} MiB) in {export.elapsed:.1f}s")
+        await self.edit_or_send(ctx, progress, summary)
+        
+        if size <= ctx.guild.filesize_limit:
+            try:
+                await ctx.send(file=discord.File(export.path))
+                return
+            except discord.HTTPException as e:
+                await ctx.send(f"⚠️ Upload failed ({e.status}); the export is saved on the bot host as `{export.path}`.")
+                return
+        await ctx.send(f"📁 Saved on the bot host as `{export.path}` (too large to upload here).")
+    
+    async def edit_or_send(self, ctx: commands.Context, message: discord.Message, content: str):
+        try:
+            await message.edit(content=content)
+        except discord.HTTPException:
+            await ctx.send(content)
+    
+    @export.command(name="status", description="Show the current export's progress")
+    @whitelist_required([Permissions.EXPORT_LOGS])
+    async def export_status(self, ctx: commands.Context):
+        """Show the running or most recent export in this server"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        export = self.exports.get(ctx.guild.id)
+        if export is None:
+            await ctx.send("📝 No exports have been run in this server since the bot started.")
+            return
+        
+        status_emojis = {'pending': '⏳', 'running': '🔄', 'completed': '✅', 'cancelled': '⏹️', 'failed': '❌'}
+        await ctx.send(
+            f"{status_emojis.get(export.status, '❔')} {export.export_type} export ({export.status}): "
+            f"{export.progress_text()}"
+        )
+    
+    @export.command(name="cancel", description="Stop the current export")
+    @whitelist_required([Permissions.EXPORT_LOGS])
+    async def export_cancel(self, ctx: commands.Context):
+        """Cancel the running export; its partial file is deleted"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        task = self.tasks.get(ctx.guild.id)
+        if task is None or task.done():
+            await ctx.send("ℹ️ No export is running in this server.")
+            return
+        
+        self.exports[ctx.guild.id].cancel()
+        await ctx.send("⏹️ Cancelling the export…")
+
+async def setup(bot):
+    await bot.add_cog(ExportCog(bot))
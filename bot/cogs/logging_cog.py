@@ -1,18 +1,55 @@
 import discord
 from discord.ext import commands
 from datetime import datetime
+import asyncio
 import logging
 import sys
 import os
+from database import rollup_window
+from utils.deletion_attribution import DeletionAttributor
 from utils.file_utils import FileLogger
 from utils.embed_utils import EmbedBuilder
 from utils.permissions import whitelist_required, Permissions
+from utils.paginator import LogPaginator
 
 class LoggingCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.file_logger = FileLogger()
+        self.file_logger = FileLogger(bot.config.LOG_DIR, bot.config.LOG_VIEW_SESSION_TTL)
         self.setup_console_logging()
+        self._prune_task = None
+        config = bot.config
+        self.attributor = DeletionAttributor(
+            bot.db, config.DELETION_ATTRIBUTION_WINDOW, config.DELETION_ATTRIBUTION_GROUP_WINDOW,
+            config.DELETION_ATTRIBUTION_MAX_PAGES
+        )
+    
+    async def cog_load(self):
+        self._prune_task = asyncio.get_running_loop().create_task(self._prune_loop(), name='log-prune')
+    
+    async def cog_unload(self):
+        if self._prune_task is not None:
+            self._prune_task.cancel()
+            await asyncio.gather(self._prune_task, return_exceptions=True)
+            self._prune_task = None
+        await self.attributor.stop()
+    
+    async def _prune_loop(self):
+        """Drop raw log rows past retention; the rollups keep the counts"""
+        config = self.bot.config
+        while True:
+            try:
+                deleted = await self.bot.db.prune_logs(
+                    config.COMMAND_LOG_RETENTION_DAYS,
+                    config.DELETED_MESSAGE_RETENTION_DAYS,
+                    config.HOURLY_ROLLUP_RETENTION_DAYS,
+                    config.LOG_PRUNE_CHUNK_SIZE
+                )
+                if any(deleted.values()):
+                    self.logger.info(f"Pruned old log rows: {deleted}")
+            except Exception as e:
+                self.logger.error(f"Failed to prune logs: {e}")
+            await asyncio.sleep(config.LOG_PRUNE_INTERVAL)
     
     def setup_console_logging(self):
         """Setup console logging with file output"""
@@ -35,15 +72,10 @@ class LoggingCog(commands.Cog):
         if not self.logger.handlers:
             self.logger.addHandler(console_handler)
     
-    async def log_to_channel(self, embed: discord.Embed):
-        """Send log embed to designated log channel"""
-        if not self.bot.config.LOG_CHANNEL_ID:
-            return
-        
+    async def log_to_channel(self, embed: discord.Embed, guild: discord.Guild = None, event_type: str = 'commands'):
+        """Send log embed to the channel the guild routes this event type to"""
         try:
-            channel = self.bot.get_channel(int(self.bot.config.LOG_CHANNEL_ID))
-            if channel:
-                await channel.send(embed=embed)
+            await self.bot.log_router.send(guild, event_type, embed)
         except Exception as e:
             self.logger.error(f"Failed to send log to channel: {e}")
     
@@ -59,8 +91,15 @@ class LoggingCog(commands.Cog):
         else:
             self.logger.info(message)
         
+        self.bot.events.publish('console', None, {"level": level.upper(), "message": message})
+        
         # Log to file
-        await self.file_logger.write_log('console', f"[{level.upper()}] {message}", timestamp)
+        if self.bot.log_writer:
+            await self.bot.log_writer.submit('console', {
+                "level": level.upper(), "message": message, "timestamp": timestamp.isoformat()
+            })
+        else:
+            await self.file_logger.write_log('console', f"[{level.upper()}] {message}", timestamp)
     
     async def log_command(self, ctx: commands.Context, success: bool = True, error: str = None):
         """Log command execution"""
@@ -68,20 +107,8 @@ class LoggingCog(commands.Cog):
         
         # Prepare command info
         command_name = ctx.command.name if ctx.command else "unknown"
-        args = " ".join(ctx.args[2:]) if len(ctx.args) > 2 else ""
-        
-        # Log to database
-        await self.bot.db.log_command(
-            str(ctx.guild.id) if ctx.guild else "DM",
-            str(ctx.channel.id),
-            str(ctx.author.id),
-            command_name,
-            args,
-            success,
-            error
-        )
+        args = " ".join(str(arg) for arg in ctx.args[2:]) if len(ctx.args) > 2 else ""
         
-        # Log to file
         log_data = {
             "guild_id": str(ctx.guild.id) if ctx.guild else "DM",
             "channel_id": str(ctx.channel.id),
@@ -92,30 +119,38 @@ class LoggingCog(commands.Cog):
             "success": success,
             "error": error
         }
-        await self.file_logger.write_json_log('commands', log_data, timestamp)
+        self.bot.events.publish('commands', log_data["guild_id"], dict(log_data))
+        
+        if self.bot.log_writer:
+            # The writer process handles both the database row and the file entry
+            log_data["timestamp"] = timestamp.isoformat()
+            await self.bot.log_writer.submit('command', log_data)
+        else:
+            # Log to database
+            await self.bot.db.log_command(
+                log_data["guild_id"],
+                log_data["channel_id"],
+                log_data["user_id"],
+                command_name,
+                args,
+                success,
+                error
+            )
+            
+            # Log to file
+            await self.file_logger.write_json_log('commands', log_data, timestamp)
         
         # Send embed to log channel
         embed = EmbedBuilder.create_command_log_embed(
             ctx.author, command_name, args, success, error
         )
-        await self.log_to_channel(embed)
+        await self.log_to_channel(embed, ctx.guild)
     
     async def log_deleted_message(self, message: discord.Message):
         """Log deleted message"""
         timestamp = datetime.now()
         
-        # Store in database
         attachments = [att.url for att in message.attachments] if message.attachments else []
-        await self.bot.db.store_deleted_message(
-            str(message.id),
-            str(message.channel.id),
-            str(message.guild.id) if message.guild else "DM",
-            str(message.author.id),
-            message.content,
-            attachments
-        )
-        
-        # Log to file
         log_data = {
             "message_id": str(message.id),
             "channel_id": str(message.channel.id),
@@ -125,49 +160,99 @@ class LoggingCog(commands.Cog):
             "content": message.content,
             "attachments": attachments
         }
-        await self.file_logger.write_json_log('deleted', log_data, timestamp)
+        self.bot.events.publish('deleted', log_data["guild_id"], dict(log_data))
+        
+        if self.bot.log_writer:
+            log_data["timestamp"] = timestamp.isoformat()
+            await self.bot.log_writer.submit('deleted', log_data)
+        else:
+            # Store in database
+            await self.bot.db.store_deleted_message(
+                log_data["message_id"],
+                log_data["channel_id"],
+                log_data["guild_id"],
+                log_data["author_id"],
+                message.content,
+                attachments
+            )
+            
+            # Log to file
+            await self.file_logger.write_json_log('deleted', log_data, timestamp)
+        
+        # Who deleted it is filled in later, from batched audit-log reads
+        if message.guild and self.bot.config.DELETION_ATTRIBUTION_ENABLED:
+            self.attributor.track(message)
         
         # Send embed to log channel
         embed = EmbedBuilder.create_deleted_message_embed(message)
-        await self.log_to_channel(embed)
+        await self.log_to_channel(embed, message.guild, 'deleted')
     
-    @commands.hybrid_command(name="logs", description="View recent logs")
+    async def log_automod_action(self, guild: discord.Guild, title: str, description: str, data: dict,
+                                 fields: list = None):
+        """Log an automatic moderation action to the console, the automod log file and the guild's log channel"""
+        timestamp = datetime.now()
+        log_data = {"guild_id": str(guild.id), "action": title, **data}
+        self.bot.events.publish('automod', log_data["guild_id"], dict(log_data))
+        
+        self.logger.warning(f"Automod in {guild.name}: {title} - {description}")
+        await self.file_logger.write_json_log('automod', log_data, timestamp)
+        
+        embed = EmbedBuilder.create_log_embed(title, description, discord.Color.dark_orange(), fields, timestamp)
+        await self.log_to_channel(embed, guild, 'automod')
+    
+    @commands.hybrid_command(name="logs", description="Browse logs page by page")
     @whitelist_required([Permissions.VIEW_LOGS])
-    async def view_logs(self, ctx: commands.Context, log_type: str = "commands", limit: int = 10):
-        """View recent logs"""
-        if log_type not in ['console', 'commands', 'deleted']:
-            await ctx.send("❌ Invalid log type. Use: console, commands, or deleted")
+    async def view_logs(self, ctx: commands.Context, log_type: str = "commands", date: str = None):
+        """Browse a day's logs, newest first"""
+        if log_type not in ['console', 'commands', 'deleted', 'automod']:
+            await ctx.send("❌ Invalid log type. Use: console, commands, deleted, or automod")
             return
         
-        if limit > 50:
-            limit = 50
+        log_date = None
+        if date:
+            try:
+                log_date = datetime.strptime(date, '%Y-%m-%d')
+            except ValueError:
+                await ctx.send("❌ Invalid date. Use the format YYYY-MM-DD")
+                return
         
         try:
-            logs = await self.file_logger.read_logs(log_type, limit=limit)
-            
-            if not logs:
-                await ctx.send(f"No {log_type} logs found for today.")
-                return
-            
-            # Format logs for display
-            log_content = "```\n" + "".join(logs[-limit:]) + "```"
-            
-            # Split if too long
-            if len(log_content) > 2000:
-                log_content = log_content[:1997] + "```"
-            
-            embed = discord.Embed(
-                title=f"Recent {log_type.title()} Logs",
-                description=log_content,
-                color=discord.Color.blue(),
-                timestamp=datetime.now()
+            viewer = LogPaginator(
+                self.file_logger,
+                log_type,
+                log_date,
+                ctx.author.id,
+                lambda page: self.create_log_page_embed(log_type, page),
+                dates=self.file_logger.get_available_dates(log_type),
+                max_lines=self.bot.config.LOG_PAGE_LINES,
+                timeout=self.bot.config.LOG_VIEW_SESSION_TTL
             )
-            
-            await ctx.send(embed=embed)
+            await viewer.start(ctx)
             
         except Exception as e:
             await ctx.send(f"❌ Error retrieving logs: {str(e)}")
     
+    def create_log_page_embed(self, log_type: str, page: dict) -> discord.Embed:
+        """Render one page of a log file"""
+        if not page["lines"]:
+            description = f"No {log_type} logs found for this day."
+        else:
+            # Keep single oversized entries from blowing the embed limit
+            lines = [line if len(line) <= 500 else line[:497] + "..." for line in page["lines"]]
+            description = "```\n" + "\n".join(lines).replace("```", "`\u200b``") + "\n```"
+        
+        embed = discord.Embed(
+            title=f"{log_type.title()} Logs • {page['date']}",
+            description=description[:4096],
+            color=discord.Color.blue()
+        )
+        
+        if page["size"]:
+            shown = (page["size"] - page["start"]) / page["size"] * 100
+            embed.set_footer(text=f"Page {page['page'] + 1} • newest {shown:.0f}% of {page['size'] / 1024:,.1f} KiB")
+        
+        return embed
+    
     @commands.hybrid_command(name="clearlog", description="Clear log files")
     @whitelist_required([Permissions.CLEAR_LOGS])
     async def clear_logs(self, ctx: commands.Context, log_type: str, confirm: str = None):
@@ -207,6 +292,83 @@ class LoggingCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error clearing logs: {str(e)}")
     
+    @commands.hybrid_command(name="analytics", description="Show command usage and deletions")
+    @whitelist_required([Permissions.VIEW_LOGS])
+    async def analytics(self, ctx: commands.Context, days: int = 7):
+        """Top commands, failure rates and deletions for the last few days"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        if not 1 <= days <= 365:
+            await ctx.send("❌ Days must be between 1 and 365.")
+            return
+        
+        granularity, since = rollup_window(days)
+        guild_id = str(ctx.guild.id)
+        usage = await self.bot.db.get_command_usage(guild_id, since, granularity)
+        timeline = await self.bot.db.get_command_timeline(guild_id, since, granularity)
+        deletions = await self.bot.db.get_deletion_counts(guild_id, since, granularity, 5)
+        
+        total = sum(row[1] for row in timeline)
+        failed = sum(row[2] for row in timeline)
+        embed = discord.Embed(
+            title=f"Analytics • last {days} day{'s' if days != 1 else ''}",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Commands", value=f"{total:,}", inline=True)
+        embed.add_field(name="Failed", value=f"{failed:,} ({failed / total:.0%})" if total else "0", inline=True)
+        if timeline:
+            busiest = max(timeline, key=lambda row: row[1])
+            embed.add_field(name=f"Busiest {granularity}", value=f"{busiest[0]} ({busiest[1]:,})", inline=True)
+        
+        if usage:
+            lines = [
+                f"`{command}` • {count:,} ({failures / count:.0%} failed)" if failures else f"`{command}` • {count:,}"
+                for command, count, failures in usage
+            ]
+            embed.add_field(name="Top Commands", value="\n".join(lines)[:1024], inline=False)
+        
+        if deletions:
+            lines = [f"<#{channel_id}> • {count:,}" for channel_id, count in deletions]
+            embed.add_field(name="Deleted Messages", value="\n".join(lines), inline=False)
+        
+        if not usage and not deletions:
+            embed.description = "No activity recorded in this period."
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="looplag", description="Show event loop lag statistics")
+    @whitelist_required([Permissions.VIEW_LOGS])
+    async def loop_lag(self, ctx: commands.Context):
+        """Show the event loop lag histogram and recent stalls"""
+        stats = self.bot.watchdog.snapshot()
+        
+        embed = discord.Embed(
+            title="Event Loop Lag",
+            color=discord.Color.green() if not stats["stalls"] else discord.Color.orange(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Samples", value=f"{stats['ticks']:,}", inline=True)
+        embed.add_field(name="Mean / Max", value=f"{stats['mean_lag_ms']}ms / {stats['max_lag_ms']}ms", inline=True)
+        embed.add_field(name="Stalls", value=f"{stats['stalls']} (>{stats['threshold_ms']}ms)", inline=True)
+        
+        # Render the histogram as a small bar chart
+        peak = max(stats["histogram"].values()) or 1
+        rows = [
+            f"{label:>9} {'█' * max(1 if count else 0, round(count / peak * 20)):<20} {count}"
+            for label, count in stats["histogram"].items()
+        ]
+        embed.add_field(name="Histogram", value="```\n" + "\n".join(rows) + "```", inline=False)
+        
+        if stats["recent_stalls"]:
+            stalls = [
+                f"`{stall['duration_ms']}ms` {os.path.basename(stall['culprit'])}"
+                for stall in stats["recent_stalls"][-5:]
+            ]
+            embed.add_field(name="Recent Stalls", value="\n".join(stalls)[:1024], inline=False)
+        
+        await ctx.send(embed=embed)
+    
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
         """Handle message deletion events"""
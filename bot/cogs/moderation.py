@@ -1,13 +1,76 @@
 import discord
 from discord.ext import commands
-from datetime import datetime
+import asyncio
+import io
+import json
+import time
+from datetime import datetime, timezone
 from typing import Optional
 from utils.permissions import whitelist_required, admin_or_whitelist, Permissions
 from utils.embed_utils import EmbedBuilder
+from utils.batch_writer import BatchWriter
+from utils.paginator import KeysetPaginator
+from utils.rate_limit import RateLimitedExecutor
+from utils.channel_templates import TEMPLATE_KEY_PREFIX, TemplateApplier, parse_template
+
+class RoleBulkFilters(commands.FlagConverter):
+    """Member filters for bulk role jobs, e.g. has:@Member joined_after:2024-01-01"""
+    has: Optional[discord.Role] = commands.flag(default=None, description="Only members with this role")
+    joined_after: Optional[str] = commands.flag(default=None, description="Only members who joined on/after YYYY-MM-DD")
+    joined_before: Optional[str] = commands.flag(default=None, description="Only members who joined before YYYY-MM-DD")
+    bots: bool = commands.flag(default=False, description="Include bots")
+
+# action -> how it reads in the moderation log
+MOD_ACTION_LABELS = {
+    'drag': "Dragged",
+    'nsfw': "Marked NSFW",
+    'unnsfw': "Unmarked NSFW",
+    'role_add': "Role Added",
+    'role_remove': "Role Removed",
+    'role_create': "Role Created",
+    'role_bulk_add': "Bulk Role Add",
+    'role_bulk_remove': "Bulk Role Remove",
+    'channel_create': "Channel Created",
+}
 
 class ModerationCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.mod_log = BatchWriter(
+            bot.db.add_moderation_actions, 'moderation-action',
+            bot.config.MOD_LOG_BATCH_SIZE, bot.config.MOD_LOG_FLUSH_INTERVAL
+        )
+    
+    async def cog_load(self):
+        self.mod_log.start()
+    
+    async def cog_unload(self):
+        await self.mod_log.stop()
+    
+    def record_action(self, ctx: commands.Context, action: str, targets, **details):
+        """Queue moderation actions (one per target) for the audit table"""
+        if not isinstance(targets, (list, tuple)):
+            targets = [targets]
+        created_at = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        
+        rows = []
+        for target in targets:
+            if isinstance(target, discord.Role):
+                target_type = 'role'
+            elif isinstance(target, discord.abc.GuildChannel):
+                target_type = 'channel'
+            else:
+                target_type = 'user'
+            rows.append({
+                "guild_id": str(ctx.guild.id),
+                "action": action,
+                "moderator_id": str(ctx.author.id),
+                "target_type": target_type,
+                "target_id": str(target.id),
+                "details": json.dumps(details),
+                "created_at": created_at
+            })
+        self.mod_log.record(rows)
     
     @commands.hybrid_command(name="snipe", description="Retrieve the last deleted message in this channel")
     @whitelist_required([Permissions.SNIPE])
@@ -32,7 +95,8 @@ class ModerationCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error retrieving deleted message: {str(e)}")
     
-    @commands.hybrid_command(name="drag", description="Move a user between voice channels")
+    @commands.hybrid_group(name="drag", description="Move users between voice channels", fallback="user",
+                           invoke_without_command=True)
     @whitelist_required([Permissions.DRAG])
     async def drag(self, ctx: commands.Context, user: discord.Member, channel: discord.VoiceChannel):
         """Drag a user to a different voice channel"""
@@ -41,7 +105,9 @@ class ModerationCog(commands.Cog):
             return
         
         # Check if user is in a voice channel
-        if not user.voice or not user.voice.channel:
+        current_id = self.bot.voice_index.channel_of(ctx.guild.id, user.id)
+        old_channel = ctx.guild.get_channel(current_id) if current_id else None
+        if not old_channel:
             await ctx.send(f"❌ {user.mention} is not in a voice channel.")
             return
         
@@ -55,10 +121,9 @@ class ModerationCog(commands.Cog):
             await ctx.send("❌ I don't have permission to connect to that channel.")
             return
         
-        old_channel = user.voice.channel
-        
         try:
             await user.move_to(channel)
+            self.record_action(ctx, 'drag', user, from_channel=old_channel.id, to_channel=channel.id)
             
             embed = EmbedBuilder.create_moderation_embed(
                 "User Dragged",
@@ -80,6 +145,136 @@ class ModerationCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ An error occurred: {str(e)}")
     
+    # Subcommands need their own checks: a group with invoke_without_command skips its checks for them
+    @drag.command(name="all", description="Move everyone in one voice channel to another")
+    @whitelist_required([Permissions.DRAG])
+    async def drag_all(self, ctx: commands.Context, source: discord.VoiceChannel, destination: discord.VoiceChannel):
+        """Drag every member of a voice channel to another voice channel"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        if source == destination:
+            await ctx.send("❌ Source and destination are the same channel.")
+            return
+        
+        members = [
+            member for member in map(ctx.guild.get_member, self.bot.voice_index.members_in(ctx.guild.id, source.id))
+            if member
+        ]
+        if not members:
+            await ctx.send(f"❌ Nobody is connected to {source.mention}.")
+            return
+        
+        await self.bulk_move(ctx, members, destination, f"{source.name} → {destination.name}")
+    
+    @drag.command(name="role", description="Move every member with a role who is in voice to a channel")
+    @whitelist_required([Permissions.DRAG])
+    async def drag_role(self, ctx: commands.Context, role: discord.Role, destination: discord.VoiceChannel):
+        """Drag every connected member with a role to a voice channel"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        # Walk who is in voice rather than every holder of the role
+        members = [
+            member for member_id, channel_id in self.bot.voice_index.connected(ctx.guild.id).items()
+            if channel_id != destination.id
+            and (member := ctx.guild.get_member(member_id)) and member.get_role(role.id)
+        ]
+        if not members:
+            await ctx.send(f"❌ No members with {role.mention} are connected to other voice channels.")
+            return
+        
+        await self.bulk_move(ctx, members, destination, f"@{role.name} → {destination.name}")
+    
+    async def bulk_move(self, ctx: commands.Context, members: list, destination: discord.VoiceChannel, label: str):
+        """Move many members through the rate-limited executor, editing one progress message"""
+        permissions = destination.permissions_for(ctx.guild.me)
+        if not permissions.move_members or not permissions.connect:
+            await ctx.send("❌ I don't have permission to move members into that channel.")
+            return
+        
+        executor = RateLimitedExecutor(
+            self.bot.config.BULK_MOVE_CONCURRENCY, self.bot.config.BULK_MOVE_RATE, self.bot.config.BULK_MOVE_PER
+        )
+        total = len(members)
+        done = {"moved": 0, "failed": 0}
+        started = time.monotonic()
+        
+        def progress_text() -> str:
+            finished = done["moved"] + done["failed"]
+            return (f"🔄 Dragging {label}: {finished}/{total} "
+                    f"(✅ {done['moved']} ❌ {done['failed']}) • {time.monotonic() - started:.0f}s")
+        
+        def on_result(member, error):
+            done["failed" if error else "moved"] += 1
+        
+        async def move(member):
+            await member.move_to(destination, reason=f"Bulk drag by {ctx.author}")
+        
+        progress = await ctx.send(progress_text())
+        
+        async def report_progress():
+            # Message edits have their own rate limit, so refresh on a timer rather than per move
+            while True:
+                await asyncio.sleep(2)
+                try:
+                    await progress.edit(content=progress_text())
+                except discord.HTTPException:
+                    pass
+        
+        reporter = asyncio.create_task(report_progress())
+        try:
+            results = await executor.map(move, members, on_result)
+        finally:
+            reporter.cancel()
+        
+        elapsed = time.monotonic() - started
+        failures = [(member, error) for member, error in results if error]
+        self.record_action(
+            ctx, 'drag', [member for member, error in results if not error],
+            to_channel=destination.id, bulk=label
+        )
+        
+        embed = discord.Embed(
+            title="Bulk Drag Complete",
+            description=f"**{label}**",
+            color=discord.Color.green() if not failures else discord.Color.orange(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Moved", value=str(done["moved"]), inline=True)
+        embed.add_field(name="Failed", value=str(done["failed"]), inline=True)
+        embed.add_field(name="Time", value=f"{elapsed:.1f}s", inline=True)
+        embed.set_footer(text=f"Requested by {ctx.author}", icon_url=ctx.author.display_avatar.url)
+        
+        lines = [f"✅ {member} ({member.id})" for member, error in results if not error]
+        lines += [f"❌ {member} ({member.id}): {self.describe_http_error(error)}" for member, error in failures]
+        
+        failure_text = "\n".join(line for line in lines if line.startswith("❌"))
+        if failures and len(failure_text) <= 1024:
+            embed.add_field(name="Failures", value=failure_text, inline=False)
+        
+        # The full per-member report goes in a file once it no longer fits in the embed
+        files = []
+        if len(lines) > 20 or len(failure_text) > 1024:
+            report = io.BytesIO("\n".join(lines).encode('utf-8'))
+            files.append(discord.File(report, filename="drag-report.txt"))
+        
+        try:
+            await progress.edit(content=None, embed=embed, attachments=files)
+        except discord.HTTPException:
+            await ctx.send(embed=embed, files=files)
+    
+    @staticmethod
+    def describe_http_error(error: Exception) -> str:
+        """Short reason for a failed REST call"""
+        if isinstance(error, discord.Forbidden):
+            return "missing permissions"
+        if isinstance(error, discord.HTTPException):
+            return error.text or f"HTTP {error.status}"
+        return str(error) or type(error).__name__
+    
     @commands.hybrid_command(name="nsfw", description="Mark a text channel as NSFW")
     @whitelist_required([Permissions.NSFW])
     async def nsfw(self, ctx: commands.Context, channel: discord.TextChannel = None):
@@ -102,6 +297,7 @@ class ModerationCog(commands.Cog):
         
         try:
             await target_channel.edit(nsfw=True, reason=f"NSFW enabled by {ctx.author}")
+            self.record_action(ctx, 'nsfw', target_channel)
             
             embed = EmbedBuilder.create_moderation_embed(
                 "Channel Marked NSFW",
@@ -145,6 +341,7 @@ class ModerationCog(commands.Cog):
         
         try:
             await target_channel.edit(nsfw=False, reason=f"NSFW disabled by {ctx.author}")
+            self.record_action(ctx, 'unnsfw', target_channel)
             
             embed = EmbedBuilder.create_moderation_embed(
                 "NSFW Removed",
@@ -182,6 +379,9 @@ class ModerationCog(commands.Cog):
                     "`role add @user @role` - Add role to user\n"
                     "`role remove @user @role` - Remove role from user\n"
                     "`role create <name> [color]` - Create new role\n"
+                    "`role bulk add/remove @role [has:@role] [joined_after:YYYY-MM-DD] [joined_before:YYYY-MM-DD]` - Bulk role job\n"
+                    "`role bulk status [job id]` - Bulk role job progress\n"
+                    "`role bulk cancel <job id>` - Cancel a bulk role job\n"
                     "`role delete @role` - Delete role\n"
                     "`role info @role` - Get role information"
                 ),
@@ -213,6 +413,7 @@ class ModerationCog(commands.Cog):
         
         try:
             await user.add_roles(role, reason=f"Role added by {ctx.author}")
+            self.record_action(ctx, 'role_add', user, role_id=role.id)
             
             embed = EmbedBuilder.create_moderation_embed(
                 "Role Added",
@@ -258,6 +459,7 @@ class ModerationCog(commands.Cog):
         
         try:
             await user.remove_roles(role, reason=f"Role removed by {ctx.author}")
+            self.record_action(ctx, 'role_remove', user, role_id=role.id)
             
             embed = EmbedBuilder.create_moderation_embed(
                 "Role Removed",
@@ -309,6 +511,7 @@ class ModerationCog(commands.Cog):
                 color=role_color,
                 reason=f"Role created by {ctx.author}"
             )
+            self.record_action(ctx, 'role_create', new_role, name=name, color=str(role_color))
             
             embed = EmbedBuilder.create_success_embed(
                 "Role Created",
@@ -327,6 +530,123 @@ class ModerationCog(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ An error occurred: {str(e)}")
     
+    @role.group(name="bulk", description="Bulk role jobs")
+    @whitelist_required([Permissions.MANAGE_ROLES])
+    async def role_bulk(self, ctx: commands.Context):
+        """Bulk role job commands"""
+        if ctx.invoked_subcommand is None:
+            await self.role_bulk_status(ctx)
+    
+    @role_bulk.command(name="add", description="Give a role to every matching member")
+    @whitelist_required([Permissions.MANAGE_ROLES])
+    async def role_bulk_add(self, ctx: commands.Context, role: discord.Role, *, filters: RoleBulkFilters):
+        """Start a background job adding a role to every matching member"""
+        await self.start_role_job(ctx, role, 'add', filters)
+    
+    @role_bulk.command(name="remove", description="Remove a role from every matching member")
+    @whitelist_required([Permissions.MANAGE_ROLES])
+    async def role_bulk_remove(self, ctx: commands.Context, role: discord.Role, *, filters: RoleBulkFilters):
+        """Start a background job removing a role from every matching member"""
+        await self.start_role_job(ctx, role, 'remove', filters)
+    
+    async def start_role_job(self, ctx: commands.Context, role: discord.Role, action: str, filters: RoleBulkFilters):
+        """Validate a bulk role request and hand it to the job engine"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        if not ctx.guild.me.guild_permissions.manage_roles:
+            await ctx.send("❌ I don't have permission to manage roles.")
+            return
+        
+        if role >= ctx.guild.me.top_role or role.managed or role.is_default():
+            await ctx.send("❌ I can't assign or remove that role.")
+            return
+        
+        job_filters = {"include_bots": filters.bots}
+        if filters.has:
+            job_filters["has_role"] = str(filters.has.id)
+        
+        try:
+            if filters.joined_after:
+                job_filters["joined_after"] = self.bot.role_jobs.parse_date(filters.joined_after)
+            if filters.joined_before:
+                job_filters["joined_before"] = self.bot.role_jobs.parse_date(filters.joined_before)
+        except ValueError:
+            await ctx.send("❌ Invalid date. Use the format YYYY-MM-DD")
+            return
+        
+        try:
+            job_id = await self.bot.role_jobs.create_job(
+                ctx.guild, role, action, job_filters, ctx.author.id, ctx.channel
+            )
+            self.record_action(ctx, f'role_bulk_{action}', role, job_id=job_id)
+            await ctx.send(f"✅ Started role job #{job_id}. Progress will be posted in this channel.")
+            
+        except Exception as e:
+            await ctx.send(f"❌ Failed to start role job: {str(e)}")
+    
+    @role_bulk.command(name="status", description="Show bulk role job progress")
+    @whitelist_required([Permissions.MANAGE_ROLES])
+    async def role_bulk_status(self, ctx: commands.Context, job_id: int = None):
+        """Show one bulk role job, or the most recent jobs in this server"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        if job_id is not None:
+            job = await self.bot.db.get_role_job(job_id)
+            if not job or job["guild_id"] != str(ctx.guild.id):
+                await ctx.send(f"❌ Role job #{job_id} not found.")
+                return
+            
+            await ctx.send(embed=self.bot.role_jobs.create_job_embed(job))
+            return
+        
+        jobs = await self.bot.db.get_role_jobs(str(ctx.guild.id))
+        if not jobs:
+            await ctx.send("📝 No bulk role jobs have been run in this server.")
+            return
+        
+        status_emojis = {'pending': '⏳', 'running': '🔄', 'completed': '✅', 'cancelled': '⏹️', 'failed': '❌'}
+        lines = [
+            f"{status_emojis.get(job['status'], '❔')} **#{job['id']}** {job['action']} <@&{job['role_id']}> • "
+            f"{job['processed']:,}/{job['total']:,}"
+            for job in jobs
+        ]
+        
+        embed = discord.Embed(
+            title="Bulk Role Jobs",
+            description="\n".join(lines),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text=f"Use {ctx.prefix}role bulk status <job id> for details")
+        await ctx.send(embed=embed)
+    
+    @role_bulk.command(name="cancel", description="Cancel a bulk role job")
+    @whitelist_required([Permissions.MANAGE_ROLES])
+    async def role_bulk_cancel(self, ctx: commands.Context, job_id: int):
+        """Cancel a pending or running bulk role job"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        job = await self.bot.db.get_role_job(job_id)
+        if not job or job["guild_id"] != str(ctx.guild.id):
+            await ctx.send(f"❌ Role job #{job_id} not found.")
+            return
+        
+        if await self.bot.role_jobs.cancel(job_id):
+            job = await self.bot.db.get_role_job(job_id)
+            await ctx.send(f"⏹️ Role job #{job_id} cancelled after {job['processed']:,} members.")
+        else:
+            await ctx.send(f"❌ Role job #{job_id} has already {job['status']}.")
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """Pick up bulk role jobs interrupted by a restart"""
+        await self.bot.role_jobs.resume()
+    
     @commands.hybrid_group(name="channel", description="Channel management commands")
     @whitelist_required([Permissions.MANAGE_CHANNELS])
     async def channel(self, ctx: commands.Context):
@@ -343,8 +663,10 @@ class ModerationCog(commands.Cog):
                     "`channel create text <name>` - Create text channel\n"
                     "`channel create voice <name>` - Create voice channel\n"
                     "`channel delete <channel>` - Delete channel\n"
-                    "`channel lock <channel>` - Lock channel\n"
-                    "`channel unlock <channel>` - Unlock channel"
+                    "`channel apply <template>` - Create the categories and channels in a template\n"
+                    "`channel template save/show/list/delete` - Manage channel templates\n"
+                    "`channel lock [channel|category|all]` - Stop @everyone from talking\n"
+                    "`channel unlock [channel|category|all]` - Restore the permissions saved at lock"
                 ),
                 inline=False
             )
@@ -371,6 +693,7 @@ class ModerationCog(commands.Cog):
                 name=name,
                 reason=f"Text channel created by {ctx.author}"
             )
+            self.record_action(ctx, 'channel_create', new_channel, kind='text', name=new_channel.name)
             
             embed = EmbedBuilder.create_success_embed(
                 "Text Channel Created",
@@ -403,6 +726,7 @@ class ModerationCog(commands.Cog):
                 name=name,
                 reason=f"Voice channel created by {ctx.author}"
             )
+            self.record_action(ctx, 'channel_create', new_channel, kind='voice', name=new_channel.name)
             
             embed = EmbedBuilder.create_success_embed(
                 "Voice Channel Created",
@@ -418,6 +742,466 @@ class ModerationCog(commands.Cog):
             await ctx.send(f"❌ Failed to create channel: {str(e)}")
         except Exception as e:
             await ctx.send(f"❌ An error occurred: {str(e)}")
+    
+    @channel.command(name="apply", description="Create the missing categories and channels from a template")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def channel_apply(self, ctx: commands.Context, *, template: str):
+        """Create whatever a saved template describes that the server doesn't have yet"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        if not ctx.guild.me.guild_permissions.manage_channels:
+            await ctx.send("❌ I don't have permission to manage channels.")
+            return
+        
+        definition = await self.bot.db.get_config(str(ctx.guild.id), TEMPLATE_KEY_PREFIX + template.lower())
+        if definition is None:
+            await ctx.send(f"❌ No channel template named `{template}`. See `channel template list`.")
+            return
+        
+        executor = RateLimitedExecutor(
+            self.bot.config.CHANNEL_TEMPLATE_CONCURRENCY,
+            self.bot.config.CHANNEL_TEMPLATE_RATE,
+            self.bot.config.CHANNEL_TEMPLATE_PER
+        )
+        try:
+            applier = TemplateApplier(
+                ctx.guild, parse_template(definition), executor, f"Template {template} applied by {ctx.author}"
+            )
+            applier.validate()
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        total = applier.count_missing()
+        if not total:
+            await ctx.send(f"✅ Everything in template `{template}` already exists.")
+            return
+        
+        done = {"count": 0}
+        started = time.monotonic()
+        
+        def progress_text() -> str:
+            return f"🏗️ Applying template `{template}`: {done['count']}/{total} • {time.monotonic() - started:.0f}s"
+        
+        def on_result(item, error):
+            done["count"] += 1
+        
+        progress = await ctx.send(progress_text())
+        
+        async def report_progress():
+            while True:
+                await asyncio.sleep(2)
+                try:
+                    await progress.edit(content=progress_text())
+                except discord.HTTPException:
+                    pass
+        
+        reporter = asyncio.create_task(report_progress())
+        try:
+            result = await applier.apply(on_result)
+        finally:
+            reporter.cancel()
+        
+        failures = result["failures"]
+        embed = discord.Embed(
+            title="Channel Template Applied",
+            description=f"**{template}**",
+            color=discord.Color.green() if not failures else discord.Color.orange(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Created", value=str(len(result["created"])), inline=True)
+        embed.add_field(name="Already Existed", value=str(result["existing"]), inline=True)
+        embed.add_field(name="Failed", value=str(len(failures) + result["skipped"]), inline=True)
+        embed.add_field(name="Time", value=f"{time.monotonic() - started:.1f}s", inline=True)
+        
+        if result["created"]:
+            created_text = "\n".join(result["created"])
+            if len(created_text) > 1024:
+                created_text = created_text[:1000].rsplit("\n", 1)[0] + "\n…"
+            embed.add_field(name="New", value=created_text, inline=False)
+        if failures:
+            failure_text = "\n".join(f"❌ {label}: {self.describe_http_error(error)}" for label, error in failures)
+            if result["skipped"]:
+                failure_text += f"\n⏭️ {result['skipped']} channel(s) skipped because their category failed"
+            if len(failure_text) > 1024:
+                failure_text = failure_text[:1000].rsplit("\n", 1)[0] + "\n…"
+            embed.add_field(name="Failures", value=failure_text, inline=False)
+        embed.set_footer(text=f"Requested by {ctx.author}", icon_url=ctx.author.display_avatar.url)
+        
+        try:
+            await progress.edit(content=None, embed=embed)
+        except discord.HTTPException:
+            await ctx.send(embed=embed)
+    
+    @channel.group(name="template", description="Manage channel templates")
+    async def channel_template(self, ctx: commands.Context):
+        """Channel template commands"""
+        pass
+    
+    @channel_template.command(name="save", description="Save a channel template from JSON text or a .json file")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def template_save(self, ctx: commands.Context, name: str, file: Optional[discord.Attachment] = None,
+                            *, definition: Optional[str] = None):
+        """Save or replace a channel template"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        if file is not None:
+            if file.size > 64 * 1024:
+                await ctx.send("❌ Template files are limited to 64 KB.")
+                return
+            definition = (await file.read()).decode('utf-8', errors='replace')
+        if not definition:
+            await ctx.send("❌ Provide the template as JSON text or attach a .json file.")
+            return
+        
+        # Allow the JSON to be pasted inside a code block
+        definition = definition.strip().removeprefix("```json").strip("`").strip()
+        try:
+            template = parse_template(definition)
+        except ValueError as e:
+            await ctx.send(f"❌ {e}")
+            return
+        
+        await self.bot.db.set_config(str(ctx.guild.id), TEMPLATE_KEY_PREFIX + name.lower(), definition)
+        
+        channels = len(template["channels"]) + sum(len(spec["channels"]) for spec in template["categories"])
+        embed = EmbedBuilder.create_success_embed(
+            "Channel Template Saved",
+            f"Template **{name.lower()}** has {len(template['categories'])} categories and {channels} channels.\n"
+            f"Run `channel apply {name.lower()}` to create them.",
+            ctx.author
+        )
+        await ctx.send(embed=embed)
+    
+    @channel_template.command(name="list", description="List saved channel templates")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def template_list(self, ctx: commands.Context):
+        """List saved channel templates"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        templates = await self.bot.db.get_configs_with_prefix(str(ctx.guild.id), TEMPLATE_KEY_PREFIX)
+        if not templates:
+            await ctx.send("❌ No channel templates saved. Use `channel template save <name> <json>`.")
+            return
+        
+        embed = discord.Embed(title="Channel Templates", color=discord.Color.blue(), timestamp=datetime.now())
+        lines = []
+        for key, definition in templates.items():
+            try:
+                template = parse_template(definition)
+                channels = len(template["channels"]) + sum(len(spec["channels"]) for spec in template["categories"])
+                lines.append(f"**{key[len(TEMPLATE_KEY_PREFIX):]}** - {len(template['categories'])} categories, {channels} channels")
+            except ValueError:
+                lines.append(f"**{key[len(TEMPLATE_KEY_PREFIX):]}** - ⚠️ invalid definition")
+        embed.description = "\n".join(lines)[:4096]
+        await ctx.send(embed=embed)
+    
+    @channel_template.command(name="show", description="Show a channel template's JSON")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def template_show(self, ctx: commands.Context, name: str):
+        """Show a channel template's definition"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        definition = await self.bot.db.get_config(str(ctx.guild.id), TEMPLATE_KEY_PREFIX + name.lower())
+        if definition is None:
+            await ctx.send(f"❌ No channel template named `{name}`.")
+            return
+        
+        try:
+            definition = json.dumps(json.loads(definition), indent=2)
+        except json.JSONDecodeError:
+            pass
+        
+        if len(definition) > 1900:
+            await ctx.send(file=discord.File(io.BytesIO(definition.encode('utf-8')), filename=f"{name.lower()}.json"))
+        else:
+            await ctx.send(f"```json\n{definition}\n```")
+    
+    @channel_template.command(name="delete", description="Delete a channel template")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def template_delete(self, ctx: commands.Context, name: str):
+        """Delete a channel template"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        if await self.bot.db.delete_config(str(ctx.guild.id), TEMPLATE_KEY_PREFIX + name.lower()):
+            await ctx.send(f"✅ Deleted channel template `{name.lower()}`.")
+        else:
+            await ctx.send(f"❌ No channel template named `{name}`.")
+    
+    @channel.command(name="lock", description="Lock a text channel, every text channel in a category, or all of them")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def channel_lock(self, ctx: commands.Context, *, target: Optional[str] = None):
+        """Deny @everyone from sending in the target channels, saving their overwrites first"""
+        channels = await self.resolve_lock_target(ctx, target)
+        if channels is None:
+            return
+        
+        progress = await ctx.send(f"🔒 Locking {len(channels)} channel(s)...")
+        result = await self.lock_channels(ctx.guild, channels, ctx.author)
+        await self.send_lock_result(ctx, progress, "Lock", result)
+    
+    @channel.command(name="unlock", description="Restore the permissions saved when channels were locked")
+    @whitelist_required([Permissions.MANAGE_CHANNELS])
+    async def channel_unlock(self, ctx: commands.Context, *, target: Optional[str] = None):
+        """Put back the @everyone overwrites saved by channel lock"""
+        if target and target.lower() == 'all' and ctx.guild:
+            # Channels locked by the bot, including ones that are no longer text channels
+            snapshots = await self.bot.db.get_lock_snapshots(str(ctx.guild.id))
+            channels = [ctx.guild.get_channel(int(channel_id)) for channel_id in snapshots]
+            missing = [channel_id for channel_id, channel in zip(snapshots, channels) if channel is None]
+            if missing:
+                await self.bot.db.delete_lock_snapshots(str(ctx.guild.id), missing)
+            channels = [channel for channel in channels if channel is not None]
+            if not channels:
+                await ctx.send("❌ No channels are locked.")
+                return
+        else:
+            channels = await self.resolve_lock_target(ctx, target)
+            if channels is None:
+                return
+        
+        progress = await ctx.send(f"🔓 Unlocking {len(channels)} channel(s)...")
+        result = await self.unlock_channels(ctx.guild, channels, ctx.author)
+        await self.send_lock_result(ctx, progress, "Unlock", result)
+    
+    async def resolve_lock_target(self, ctx: commands.Context, target: Optional[str]):
+        """Turn a channel, category or 'all' into a list of text channels; None after reporting an error"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return None
+        
+        if not ctx.guild.me.guild_permissions.manage_roles:
+            await ctx.send("❌ I don't have permission to manage channel permissions.")
+            return None
+        
+        if target is None:
+            if not isinstance(ctx.channel, discord.TextChannel):
+                await ctx.send("❌ Specify a text channel, a category or `all`.")
+                return None
+            return [ctx.channel]
+        
+        if target.lower() == 'all':
+            channels = list(ctx.guild.text_channels)
+        else:
+            try:
+                category = await commands.CategoryChannelConverter().convert(ctx, target)
+                channels = list(category.text_channels)
+            except commands.BadArgument:
+                try:
+                    channels = [await commands.TextChannelConverter().convert(ctx, target)]
+                except commands.BadArgument:
+                    await ctx.send(f"❌ No text channel or category matches `{target}`.")
+                    return None
+        
+        if not channels:
+            await ctx.send("❌ There are no text channels to change there.")
+            return None
+        return channels
+    
+    async def lock_channels(self, guild: discord.Guild, channels: list, actor: discord.abc.User) -> dict:
+        """Snapshot and lock channels concurrently; channels already locked keep their original snapshot"""
+        everyone = guild.default_role
+        snapshots = await self.bot.db.get_lock_snapshots(str(guild.id))
+        pending = [channel for channel in channels if str(channel.id) not in snapshots]
+        
+        # Save before touching anything, so an interrupted lock can still be undone
+        rows = []
+        for channel in pending:
+            overwrite = None
+            if everyone in channel.overwrites:
+                allow, deny = channel.overwrites[everyone].pair()
+                overwrite = json.dumps({"allow": allow.value, "deny": deny.value})
+            rows.append((str(guild.id), str(channel.id), overwrite, str(actor.id)))
+        await self.bot.db.save_lock_snapshots(rows)
+        
+        async def lock(channel):
+            overwrite = channel.overwrites_for(everyone)
+            overwrite.update(
+                send_messages=False,
+                send_messages_in_threads=False,
+                create_public_threads=False,
+                create_private_threads=False,
+                add_reactions=False
+            )
+            await channel.set_permissions(everyone, overwrite=overwrite, reason=f"Channel lock by {actor}")
+        
+        started = time.monotonic()
+        results = await self.lock_executor().map(lock, pending)
+        elapsed = time.monotonic() - started
+        
+        failures = [(channel, error) for channel, error in results if error]
+        if failures:
+            await self.bot.db.delete_lock_snapshots(str(guild.id), [str(channel.id) for channel, _ in failures])
+        
+        return {
+            "changed": len(results) - len(failures),
+            "skipped": len(channels) - len(pending),
+            "failures": failures,
+            "elapsed": elapsed
+        }
+    
+    async def unlock_channels(self, guild: discord.Guild, channels: list, actor: discord.abc.User) -> dict:
+        """Restore the saved @everyone overwrite of each locked channel exactly"""
+        everyone = guild.default_role
+        snapshots = await self.bot.db.get_lock_snapshots(str(guild.id))
+        pending = [channel for channel in channels if str(channel.id) in snapshots]
+        
+        async def unlock(channel):
+            saved = snapshots[str(channel.id)]
+            overwrite = None
+            if saved is not None:
+                saved = json.loads(saved)
+                overwrite = discord.PermissionOverwrite.from_pair(
+                    discord.Permissions(saved["allow"]), discord.Permissions(saved["deny"])
+                )
+            # overwrite=None removes the @everyone overwrite the lock had to create
+            await channel.set_permissions(everyone, overwrite=overwrite, reason=f"Channel unlock by {actor}")
+        
+        started = time.monotonic()
+        results = await self.lock_executor().map(unlock, pending)
+        elapsed = time.monotonic() - started
+        
+        failures = [(channel, error) for channel, error in results if error]
+        await self.bot.db.delete_lock_snapshots(
+            str(guild.id), [str(channel.id) for channel, error in results if not error]
+        )
+        
+        return {
+            "changed": len(results) - len(failures),
+            "skipped": len(channels) - len(pending),
+            "failures": failures,
+            "elapsed": elapsed
+        }
+    
+    def lock_executor(self) -> RateLimitedExecutor:
+        """Overwrite edits are limited per channel, so the executor only guards the global limit"""
+        return RateLimitedExecutor(
+            self.bot.config.CHANNEL_LOCK_CONCURRENCY, self.bot.config.CHANNEL_LOCK_RATE, self.bot.config.CHANNEL_LOCK_PER
+        )
+    
+    async def send_lock_result(self, ctx: commands.Context, progress: discord.Message, action: str, result: dict):
+        """Summarise a lock or unlock run"""
+        failures = result["failures"]
+        embed = discord.Embed(
+            title=f"Channel {action} Complete",
+            color=discord.Color.green() if not failures else discord.Color.orange(),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name=f"{action}ed", value=str(result["changed"]), inline=True)
+        embed.add_field(
+            name="Already Locked" if action == "Lock" else "Not Locked", value=str(result["skipped"]), inline=True
+        )
+        embed.add_field(name="Failed", value=str(len(failures)), inline=True)
+        embed.add_field(name="Time", value=f"{result['elapsed']:.2f}s", inline=True)
+        
+        if failures:
+            failure_text = "\n".join(
+                f"❌ {channel.mention}: {self.describe_http_error(error)}" for channel, error in failures
+            )
+            if len(failure_text) > 1024:
+                failure_text = failure_text[:1000].rsplit("\n", 1)[0] + "\n…"
+            embed.add_field(name="Failures", value=failure_text, inline=False)
+        embed.set_footer(text=f"Requested by {ctx.author}", icon_url=ctx.author.display_avatar.url)
+        
+        try:
+            await progress.edit(content=None, embed=embed)
+        except discord.HTTPException:
+            await ctx.send(embed=embed)
+    
+    @commands.hybrid_group(name="modlog", description="Show moderation actions taken on a user",
+                           fallback="user", invoke_without_command=True)
+    @whitelist_required([Permissions.VIEW_LOGS])
+    async def modlog(self, ctx: commands.Context, user: discord.User):
+        """Show moderation actions taken on a user, newest first"""
+        await self.send_modlog(ctx, user, None)
+    
+    # Subcommands need their own checks: a group with invoke_without_command skips its checks for them
+    @modlog.command(name="by", description="Show moderation actions taken by a moderator")
+    @whitelist_required([Permissions.VIEW_LOGS])
+    async def modlog_by(self, ctx: commands.Context, moderator: discord.User):
+        """Show moderation actions taken by a moderator, newest first"""
+        await self.send_modlog(ctx, None, moderator)
+    
+    async def send_modlog(self, ctx: commands.Context, target: Optional[discord.User],
+                          moderator: Optional[discord.User]):
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        # Include actions that are still waiting in the write buffer
+        await self.mod_log.flush()
+        
+        paginator = KeysetPaginator(
+            lambda before: self.render_modlog_page(ctx.guild, target, moderator, before),
+            ctx.author.id
+        )
+        await paginator.start(ctx)
+    
+    async def render_modlog_page(self, guild: discord.Guild, target: Optional[discord.User],
+                                 moderator: Optional[discord.User], before: Optional[tuple]):
+        """Render the page of actions older than the (created_at, id) cursor"""
+        page_size = self.bot.config.MOD_LOG_PAGE_SIZE
+        rows = await self.bot.db.get_moderation_actions_page(
+            str(guild.id),
+            str(target.id) if target else None,
+            str(moderator.id) if moderator else None,
+            before,
+            page_size + 1
+        )
+        next_before = None
+        if len(rows) > page_size:
+            last = rows[page_size - 1]
+            next_before = (last["created_at"], last["id"])
+        rows = rows[:page_size]
+        
+        if target:
+            title = f"Moderation Log for {target}"
+        else:
+            title = f"Moderation Log by {moderator}"
+        embed = discord.Embed(title=title, color=discord.Color.blue(), timestamp=datetime.now())
+        
+        lines = []
+        for row in rows:
+            created = int(datetime.fromisoformat(row["created_at"]).replace(tzinfo=timezone.utc).timestamp())
+            mention = {'role': "<@&{}>", 'channel': "<#{}>"}.get(row["target_type"], "<@{}>").format(row["target_id"])
+            line = f"<t:{created}:f> **{MOD_ACTION_LABELS.get(row['action'], row['action'])}** {mention}"
+            summary = self.describe_action_details(json.loads(row["details"] or '{}'))
+            if summary:
+                line += f" ({summary})"
+            if target:
+                line += f" by <@{row['moderator_id']}>"
+            lines.append(line)
+        embed.description = "\n".join(lines) if lines else "No moderation actions recorded."
+        embed.set_footer(text="Moderation Log")
+        return embed, next_before
+    
+    @staticmethod
+    def describe_action_details(details: dict) -> str:
+        """Short summary of an action's stored details"""
+        parts = []
+        if "from_channel" in details:
+            parts.append(f"<#{details['from_channel']}> → <#{details['to_channel']}>")
+        elif "to_channel" in details:
+            parts.append(f"to <#{details['to_channel']}>")
+        if "role_id" in details:
+            parts.append(f"<@&{details['role_id']}>")
+        if "kind" in details:
+            parts.append(f"{details['kind']} #{details['name']}")
+        elif "name" in details:
+            parts.append(details["name"])
+        if "job_id" in details:
+            parts.append(f"job #{details['job_id']}")
+        return ", ".join(parts)
 
 async def setup(bot):
     await bot.add_cog(ModerationCog(bot))
@@ -0,0 +1,166 @@
+import discord
+from discord.ext import commands
+from datetime import datetime, timezone
+from typing import Optional
+from utils.permissions import whitelist_required, Permissions
+from utils.paginator import KeysetPaginator
+from utils.voice_index import VoiceSessionRecorder, format_duration
+
+class VoiceCog(commands.Cog):
+    """Keeps the voice index current and records voice sessions"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.index = bot.voice_index
+        self.recorder = VoiceSessionRecorder(
+            bot.db, bot.config.VOICE_LOG_BATCH_SIZE, bot.config.VOICE_LOG_FLUSH_INTERVAL
+        )
+    
+    async def cog_load(self):
+        self.recorder.start()
+        # Reloading the cog mid-session picks up whoever is already connected
+        for guild in self.bot.guilds:
+            self.recorder.record(self.index.rebuild(guild))
+    
+    async def cog_unload(self):
+        """Close open sessions so their time up to now is kept"""
+        self.recorder.record(self.index.close_all())
+        await self.recorder.stop()
+    
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for guild in self.bot.guilds:
+            self.recorder.record(self.index.rebuild(guild))
+    
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        self.recorder.record(self.index.rebuild(guild))
+    
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.recorder.record(self.index.rebuild(guild))
+    
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.recorder.record(self.index.close_all(guild.id))
+    
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState,
+                                    after: discord.VoiceState):
+        finished = self.index.update(member, before, after)
+        if finished:
+            self.recorder.record(finished)
+    
+    @commands.hybrid_command(name="voice", description="Show who is in voice and for how long")
+    @whitelist_required([Permissions.DRAG])
+    async def voice(self, ctx: commands.Context, channel: Optional[discord.VoiceChannel] = None):
+        """Show voice channel occupancy"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        now = datetime.now(timezone.utc)
+        occupancy = self.index.occupancy(ctx.guild.id)
+        
+        if channel:
+            occupants = occupancy.get(channel.id, {})
+            lines = [
+                f"<@{member_id}> • {format_duration((now - joined_at).total_seconds())}"
+                for member_id, joined_at in sorted(occupants.items(), key=lambda item: item[1])
+            ]
+            text = "\n".join(lines)
+            if len(text) > 4000:
+                text = text[:3990].rsplit("\n", 1)[0] + "\n…"
+            embed = discord.Embed(
+                title=f"🔊 {channel.name}",
+                description=f"{len(occupants)} connected\n\n{text}".strip(),
+                color=discord.Color.blue(),
+                timestamp=datetime.now()
+            )
+            await ctx.send(embed=embed)
+            return
+        
+        if not occupancy:
+            await ctx.send("🔇 Nobody is in voice right now.")
+            return
+        
+        embed = discord.Embed(
+            title="Voice Occupancy",
+            description=f"{sum(len(occupants) for occupants in occupancy.values())} connected "
+                        f"across {len(occupancy)} channel(s)",
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        busiest = sorted(occupancy.items(), key=lambda item: len(item[1]), reverse=True)
+        for channel_id, occupants in busiest[:25]:
+            voice_channel = ctx.guild.get_channel(channel_id)
+            name = voice_channel.name if voice_channel else f"Unknown ({channel_id})"
+            longest = (now - min(occupants.values())).total_seconds()
+            embed.add_field(
+                name=f"🔊 {name}",
+                value=f"{len(occupants)} member(s) • longest {format_duration(longest)}",
+                inline=True
+            )
+        if len(busiest) > 25:
+            embed.set_footer(text=f"{len(busiest) - 25} more channel(s) not shown")
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="voicelog", description="Show recent voice sessions")
+    @whitelist_required([Permissions.VIEW_LOGS])
+    async def voicelog(self, ctx: commands.Context, member: Optional[discord.Member] = None,
+                       channel: Optional[discord.VoiceChannel] = None):
+        """Show voice sessions, newest first"""
+        if not ctx.guild:
+            await ctx.send("❌ This command can only be used in a server.")
+            return
+        
+        # Include sessions that are still waiting in the write buffer
+        await self.recorder.flush()
+        
+        paginator = KeysetPaginator(
+            lambda before_id: self.render_voicelog_page(ctx.guild, member, channel, before_id),
+            ctx.author.id
+        )
+        await paginator.start(ctx)
+    
+    async def render_voicelog_page(self, guild: discord.Guild, member: Optional[discord.Member],
+                                   channel: Optional[discord.VoiceChannel], before_id: Optional[int]):
+        """Render the page of sessions older than before_id"""
+        page_size = self.bot.config.VOICE_LOG_PAGE_SIZE
+        rows = await self.bot.db.get_voice_sessions_page(
+            str(guild.id),
+            str(member.id) if member else None,
+            str(channel.id) if channel else None,
+            before_id,
+            page_size + 1
+        )
+        next_before_id = rows[page_size - 1]["id"] if len(rows) > page_size else None
+        rows = rows[:page_size]
+        
+        scope = [f"for {member.display_name}"] if member else []
+        if channel:
+            scope.append(f"in {channel.name}")
+        embed = discord.Embed(
+            title=" ".join(["Voice Log"] + scope),
+            color=discord.Color.blue(),
+            timestamp=datetime.now()
+        )
+        
+        lines = []
+        for row in rows:
+            joined = int(datetime.fromisoformat(row["joined_at"]).timestamp())
+            outcome = {
+                'left': "left",
+                'moved': f"moved to <#{row['moved_to']}>",
+                'shutdown': "tracking stopped"
+            }.get(row["end_reason"], row["end_reason"])
+            lines.append(
+                f"<t:{joined}:f> <@{row['user_id']}> in <#{row['channel_id']}> • "
+                f"{format_duration(row['duration_seconds'])}, {outcome}"
+            )
+        embed.description = "\n".join(lines) if lines else "No voice sessions recorded yet."
+        embed.set_footer(text="Voice Log")
+        return embed, next_before_id
+
+async def setup(bot):
+    await bot.add_cog(VoiceCog(bot))
@@ -3,10 +3,71 @@ from discord.ext import commands
 from typing import Union
 from utils.permissions import whitelist_required, admin_or_whitelist, owner_only, Permissions
 from utils.embed_utils import EmbedBuilder
+from utils.paginator import KeysetPaginator
 
 class WhitelistCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # guild_id -> rendered whitelist pages, valid for one whitelist version
+        self.page_cache = {}
+    
+    def get_page_cache(self, guild_id: str) -> dict:
+        """Get the page cache for a guild, starting over if the whitelist changed"""
+        version = self.bot.permission_manager.get_whitelist_version(guild_id)
+        cache = self.page_cache.get(guild_id)
+        
+        if cache is None or cache["version"] != version:
+            cache = {"version": version, "total": None, "pages": {}, "page_numbers": {0: 1}}
+            self.page_cache[guild_id] = cache
+        
+        return cache
+    
+    async def render_whitelist_page(self, guild: discord.Guild, after_id: int):
+        """Render the whitelist page that starts after entry after_id"""
+        guild_id = str(guild.id)
+        cache = self.get_page_cache(guild_id)
+        if after_id in cache["pages"]:
+            return cache["pages"][after_id]
+        
+        page_size = self.bot.config.WHITELIST_PAGE_SIZE
+        if cache["total"] is None:
+            cache["total"] = await self.bot.permission_manager.count_whitelist_entries(guild_id)
+        
+        # One extra row tells us whether there is a next page
+        rows = await self.bot.permission_manager.get_whitelist_page(guild_id, after_id, page_size + 1)
+        next_after_id = rows[page_size - 1][0] if len(rows) > page_size else None
+        rows = rows[:page_size]
+        
+        lines = []
+        for entry_id, entry_type, discord_id, permissions in rows:
+            perm_str = ", ".join(eval(permissions)) if permissions != '[]' else "No specific permissions"
+            
+            if entry_type == 'user':
+                user = guild.get_member(int(discord_id))
+                user_name = user.display_name if user else f"Unknown User ({discord_id})"
+                lines.append(f"👤 **{user_name}**: {perm_str}")
+            elif entry_type == 'role':
+                role = guild.get_role(int(discord_id))
+                role_name = role.name if role else f"Unknown Role ({discord_id})"
+                lines.append(f"🏷️ **{role_name}**: {perm_str}")
+        
+        embed = discord.Embed(
+            title="Server Whitelist",
+            description="\n".join(lines) or "No more entries.",
+            color=discord.Color.blue()
+        )
+        
+        total_pages = max(1, -(-cache["total"] // page_size))
+        page_number = cache["page_numbers"].get(after_id)
+        if page_number is not None:
+            embed.set_footer(text=f"Page {page_number}/{total_pages} • {cache['total']} entries")
+            if next_after_id is not None:
+                cache["page_numbers"][next_after_id] = page_number + 1
+        else:
+            embed.set_footer(text=f"{cache['total']} entries")
+        
+        cache["pages"][after_id] = (embed, next_after_id)
+        return embed, next_after_id
     
     @commands.hybrid_group(name="whitelist", description="Manage whitelist settings")
     @admin_or_whitelist()
@@ -183,40 +244,18 @@ class WhitelistCog(commands.Cog):
             return
         
         try:
-            entries = await self.bot.permission_manager.get_whitelist_entries(str(ctx.guild.id))
+            total = await self.bot.permission_manager.count_whitelist_entries(str(ctx.guild.id))
             
-            if not entries:
+            if not total:
                 await ctx.send("📝 The whitelist is currently empty.")
                 return
             
-            embed = discord.Embed(
-                title="Server Whitelist",
-                color=discord.Color.blue(),
-                timestamp=ctx.message.created_at
+            paginator = KeysetPaginator(
+                lambda after_id: self.render_whitelist_page(ctx.guild, after_id),
+                ctx.author.id,
+                first_cursor=0
             )
-            
-            users = []
-            roles = []
-            
-            for entry_type, discord_id, permissions in entries:
-                perm_str = ", ".join(eval(permissions)) if permissions != '[]' else "No specific permissions"
-                
-                if entry_type == 'user':
-                    user = ctx.guild.get_member(int(discord_id))
-                    user_name = user.display_name if user else f"Unknown User ({discord_id})"
-                    users.append(f"**{user_name}**: {perm_str}")
-                elif entry_type == 'role':
-                    role = ctx.guild.get_role(int(discord_id))
-                    role_name = role.name if role else f"Unknown Role ({discord_id})"
-                    roles.append(f"**{role_name}**: {perm_str}")
-            
-            if users:
-                embed.add_field(name="Whitelisted Users", value="\n".join(users), inline=False)
-            
-            if roles:
-                embed.add_field(name="Whitelisted Roles", value="\n".join(roles), inline=False)
-            
-            await ctx.send(embed=embed)
+            await paginator.start(ctx)
             
         except Exception as e:
             await ctx.send(f"❌ Error retrieving whitelist: {str(e)}")
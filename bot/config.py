@@ -9,14 +9,146 @@ class Config:
     DISCORD_TOKEN = os.getenv('DISCORD_TOKEN')
     BOT_PREFIX = '!'
     
+    # REST API base URL override (e.g. a local mock server for rate-limit testing)
+    DISCORD_API_BASE = os.getenv('DISCORD_API_BASE')
+    
     # Channel IDs
     LOG_CHANNEL_ID = os.getenv('LOG_CHANNEL_ID')
     
+    # Log delivery: per-channel webhooks over one pooled HTTP session
+    LOG_WEBHOOKS_ENABLED = os.getenv('LOG_WEBHOOKS_ENABLED', 'true').lower() == 'true'
+    LOG_WEBHOOK_NAME = 'Security Bot Logs'
+    LOG_HTTP_POOL_SIZE = 20
+    
     # Database
     DATABASE_PATH = './data/bot.db'
     
     # Logging
     LOG_DIR = './data/logs'
+    LOG_PAGE_LINES = 15
+    LOG_VIEW_SESSION_TTL = 600  # seconds a log viewer's file cursor survives without use
+    
+    # Raw log retention in days; 0 (the default) keeps rows forever. Exports and snipe read the raw rows, so
+    # only set these if that history may go. Analytics read the rollups (daily rollups are kept forever)
+    COMMAND_LOG_RETENTION_DAYS = int(os.getenv('COMMAND_LOG_RETENTION_DAYS', 0))
+    DELETED_MESSAGE_RETENTION_DAYS = int(os.getenv('DELETED_MESSAGE_RETENTION_DAYS', 0))
+    HOURLY_ROLLUP_RETENTION_DAYS = 14
+    LOG_PRUNE_INTERVAL = 3600  # seconds between retention passes
+    LOG_PRUNE_CHUNK_SIZE = 5000  # raw rows deleted per transaction
+    
+    # Who deleted a message, from the audit log (needs View Audit Log); one read per guild per window
+    DELETION_ATTRIBUTION_ENABLED = os.getenv('DELETION_ATTRIBUTION_ENABLED', 'true').lower() == 'true'
+    DELETION_ATTRIBUTION_WINDOW = 2.0  # seconds between audit-log reads for a guild
+    DELETION_ATTRIBUTION_GROUP_WINDOW = 300  # seconds Discord keeps adding repeat deletions to one entry
+    DELETION_ATTRIBUTION_MAX_PAGES = 3  # audit-log pages (100 entries each) per read
+    
+    # Log exports (streamed to EXPORT_DIR; uploaded to Discord when under the server's upload limit)
+    EXPORT_DIR = './data/exports'
+    EXPORT_CHUNK_SIZE = 1000  # rows fetched and written per step
+    EXPORT_PROGRESS_INTERVAL = 5  # seconds between progress message edits
+    
+    # Online database backups (SQLite backup API, copied in page steps so writers keep going)
+    BACKUP_DIR = './data/backups'
+    BACKUP_INTERVAL_HOURS = float(os.getenv('BACKUP_INTERVAL_HOURS', 24))  # 0 disables scheduled backups
+    BACKUP_KEEP = int(os.getenv('BACKUP_KEEP', 7))
+    BACKUP_STEP_PAGES = 1024  # pages copied per step
+    BACKUP_STEP_SLEEP = 0.01  # seconds the source is left unlocked between steps
+    
+    # Persist logs from a separate writer process instead of the gateway process
+    LOG_WRITER_PROCESS = os.getenv('LOG_WRITER_PROCESS', 'false').lower() == 'true'
+    LOG_WRITER_QUEUE_SIZE = int(os.getenv('LOG_WRITER_QUEUE_SIZE', 10000))
+    
+    # Event loop watchdog
+    LOOP_WATCHDOG_ENABLED = os.getenv('LOOP_WATCHDOG_ENABLED', 'true').lower() == 'true'
+    LOOP_LAG_THRESHOLD_MS = int(os.getenv('LOOP_LAG_THRESHOLD_MS', 250))
+    LOOP_WATCHDOG_INTERVAL_MS = 100
+    
+    # Bulk voice moves (member edits share one route bucket per guild)
+    BULK_MOVE_CONCURRENCY = 5
+    BULK_MOVE_RATE = 10  # moves per BULK_MOVE_PER seconds
+    BULK_MOVE_PER = 10.0
+    
+    # Bulk role jobs (role add/remove share one route bucket per guild)
+    ROLE_JOB_CONCURRENCY = 5
+    ROLE_JOB_RATE = 10  # role changes per ROLE_JOB_PER seconds
+    ROLE_JOB_PER = 10.0
+    ROLE_JOB_BATCH = 50  # members per checkpoint
+    ROLE_JOB_PROGRESS_INTERVAL = 5  # seconds between progress message edits
+    
+    # Channel lock/unlock (overwrite edits are bucketed per channel, so only the global limit binds)
+    CHANNEL_LOCK_CONCURRENCY = 10
+    CHANNEL_LOCK_RATE = 20  # overwrite edits per CHANNEL_LOCK_PER seconds (also the burst size)
+    CHANNEL_LOCK_PER = 0.5
+    
+    # Channel templates (channel creation has one of the tightest per-guild buckets)
+    CHANNEL_TEMPLATE_CONCURRENCY = 5
+    CHANNEL_TEMPLATE_RATE = 5  # channel creations per CHANNEL_TEMPLATE_PER seconds
+    CHANNEL_TEMPLATE_PER = 10.0
+    
+    # Voice session log
+    VOICE_LOG_BATCH_SIZE = 100  # sessions per write
+    VOICE_LOG_FLUSH_INTERVAL = 5.0  # seconds between writes of a partial batch
+    VOICE_LOG_PAGE_SIZE = 10
+    
+    # Moderation action log
+    MOD_LOG_BATCH_SIZE = 50  # actions per write
+    MOD_LOG_FLUSH_INTERVAL = 2.0  # seconds between writes of a partial batch
+    MOD_LOG_PAGE_SIZE = 10
+    
+    # Anti-spam (per-guild switch and limits live in the config table; these are the defaults)
+    ANTISPAM_ENABLED = os.getenv('ANTISPAM_ENABLED', 'false').lower() == 'true'
+    ANTISPAM_WINDOW = 10.0  # seconds the limits below apply to
+    ANTISPAM_BUCKETS = 10  # time buckets per window; more is smoother, each counter costs one slot per bucket
+    ANTISPAM_MAX_MESSAGES = 8
+    ANTISPAM_MAX_MENTIONS = 10
+    ANTISPAM_MAX_LINKS = 5
+    ANTISPAM_MAX_DUPLICATES = 3
+    ANTISPAM_MAX_CHANNEL_MESSAGES = 40
+    ANTISPAM_MAX_GUILD_MESSAGES = 150
+    ANTISPAM_TRACKED_USERS = 50000  # least recently active members beyond this are forgotten
+    ANTISPAM_TRACKED_CHANNELS = 10000
+    ANTISPAM_TIMEOUT = 300  # seconds a spamming member is timed out for
+    ANTISPAM_SLOWMODE = 10  # seconds of slowmode put on a flooded channel
+    ANTISPAM_ACTION_COOLDOWN = 30.0  # seconds before the same member/channel/server is acted on again
+    
+    # Anti-nuke (per-guild switch and limits live in the config table; these are the defaults)
+    ANTINUKE_ENABLED = os.getenv('ANTINUKE_ENABLED', 'false').lower() == 'true'
+    ANTINUKE_WINDOW = 60.0  # seconds the per-member limits below apply to
+    ANTINUKE_BUCKETS = 12
+    ANTINUKE_MAX_CHANNEL_DELETES = 3
+    ANTINUKE_MAX_ROLE_DELETES = 3
+    ANTINUKE_MAX_BANS = 5
+    ANTINUKE_MAX_KICKS = 5
+    ANTINUKE_MAX_WEBHOOK_CREATES = 5
+    ANTINUKE_LOOKUP_DELAY = 0.25  # seconds events wait so a burst shares one audit-log read
+    ANTINUKE_MAX_PAGES = 3  # audit-log pages (100 entries each) per read
+    
+    # Blocked words/domains filter; enable per server with `config set automod on`
+    AUTOMOD_ENABLED = os.getenv('AUTOMOD_ENABLED', 'false').lower() == 'true'
+    AUTOMOD_MAX_TERMS = 1000  # blocked words plus domains per server
+    AUTOMOD_MAX_TERM_LENGTH = 100
+    AUTOMOD_REGEX_MAX_RULES = 25  # custom regex rules per server
+    AUTOMOD_REGEX_MAX_LENGTH = 200
+    AUTOMOD_REGEX_WORKERS = 2  # processes that run regex rules, off the event loop
+    AUTOMOD_REGEX_BATCH_SIZE = 50  # messages sent to a worker at once
+    AUTOMOD_REGEX_BATCH_DELAY = 0.05  # seconds a message waits for its batch to fill
+    AUTOMOD_REGEX_TIMEOUT = 0.25  # seconds one rule may spend on one message before its worker is killed
+    AUTOMOD_REGEX_STRIKES = 3  # timeouts before a rule is switched off
+    
+    # Local read-only JSON API for the dashboard (binds to localhost; set API_TOKEN to require a bearer token)
+    API_ENABLED = os.getenv('API_ENABLED', 'false').lower() == 'true'
+    API_HOST = os.getenv('API_HOST', '127.0.0.1')
+    API_PORT = int(os.getenv('API_PORT', 8081))
+    API_TOKEN = os.getenv('API_TOKEN')
+    API_CACHE_TTL = 2.0  # seconds a response is served from memory
+    API_CACHE_MAX_ENTRIES = 512
+    API_PAGE_SIZE = 25
+    API_MAX_PAGE_SIZE = 100
+    
+    # Live log stream (/api/events): recent events kept for Last-Event-ID resume, and per-subscriber buffer
+    EVENT_HISTORY_SIZE = 1000
+    EVENT_SUBSCRIBER_QUEUE_SIZE = 256  # a subscriber this far behind is disconnected
+    EVENT_STREAM_HEARTBEAT = 15.0  # seconds between keep-alive comments on an idle stream
     
     # Bot Settings
     CASE_INSENSITIVE = True
@@ -24,6 +156,7 @@ class Config:
     
     # Permissions
     DEFAULT_ADMIN_ROLES = ['Admin', 'Administrator', 'Moderator']
+    WHITELIST_PAGE_SIZE = 10
     
     @classmethod
     def validate(cls):
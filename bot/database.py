@@ -1,7 +1,50 @@
 import aiosqlite
 import asyncio
+import json
 import os
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# (granularity, SQL expression for the bucket a timestamp column falls in)
+ROLLUP_BUCKETS = (
+    ('hour', "strftime('%Y-%m-%d %H:00:00', {column})"),
+    ('day', "date({column})"),
+)
+# PRAGMA user_version once the rollup tables have been backfilled from raw rows
+ROLLUPS_BACKFILLED = 1
+
+def rollup_window(days: int):
+    """(granularity, first bucket) covering the last `days` days; hourly buckets for short windows"""
+    now = datetime.now(timezone.utc)
+    if days <= 2:
+        return 'hour', (now - timedelta(days=days)).strftime('%Y-%m-%d %H:00:00')
+    return 'day', (now - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+# Analytics read only the rollups, so their cost depends on the window, not on how many raw rows exist
+COMMAND_USAGE_QUERY = '''
+    SELECT command, SUM(count) AS total, SUM(CASE WHEN success THEN 0 ELSE count END) AS failed
+    FROM command_usage_rollups
+    WHERE granularity = ? AND guild_id = ? AND bucket >= ?
+    GROUP BY command
+    ORDER BY total DESC, command
+    LIMIT ?
+'''
+COMMAND_TIMELINE_QUERY = '''
+    SELECT bucket, SUM(count) AS total, SUM(CASE WHEN success THEN 0 ELSE count END) AS failed
+    FROM command_usage_rollups
+    WHERE granularity = ? AND guild_id = ? AND bucket >= ?
+    GROUP BY bucket
+    ORDER BY bucket
+'''
+DELETION_COUNTS_QUERY = '''
+    SELECT channel_id, SUM(count) AS total
+    FROM deletion_rollups
+    WHERE granularity = ? AND guild_id = ? AND bucket >= ?
+    GROUP BY channel_id
+    ORDER BY total DESC, channel_id
+    LIMIT ?
+'''
 
 class Database:
     def __init__(self, db_path='./data/bot.db'):
@@ -15,6 +58,9 @@ class Database:
     async def initialize(self):
         """Initialize database tables"""
         async with aiosqlite.connect(self.db_path) as db:
+            # WAL lets the API's reader connection run alongside the bot's writers
+            await db.execute('PRAGMA journal_mode=WAL')
+            
             # Whitelist table
             await db.execute('''
                 CREATE TABLE IF NOT EXISTS whitelist (
@@ -51,9 +97,11 @@ class Database:
                     author_id TEXT NOT NULL,
                     content TEXT,
                     deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    attachments TEXT DEFAULT '[]' -- JSON array of attachment URLs
+                    attachments TEXT DEFAULT '[]', -- JSON array of attachment URLs
+                    deleted_by TEXT -- filled in later from the audit log; NULL until attributed
                 )
             ''')
+            await self._add_missing_columns(db, 'deleted_messages', {'deleted_by': 'TEXT'})
             
             # Command logs table
             await db.execute('''
@@ -70,8 +118,204 @@ class Database:
                 )
             ''')
             
+            # Bulk role jobs (resumable from checkpoint_id after a restart)
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS role_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id TEXT NOT NULL,
+                    role_id TEXT NOT NULL,
+                    action TEXT NOT NULL, -- 'add' or 'remove'
+                    filters TEXT DEFAULT '{}', -- JSON object of member filters
+                    status TEXT DEFAULT 'pending', -- pending, running, completed, cancelled, failed
+                    total INTEGER DEFAULT 0,
+                    processed INTEGER DEFAULT 0,
+                    changed INTEGER DEFAULT 0,
+                    skipped INTEGER DEFAULT 0,
+                    failed INTEGER DEFAULT 0,
+                    checkpoint_id TEXT DEFAULT '0', -- highest member id already handled
+                    channel_id TEXT,
+                    message_id TEXT,
+                    created_by TEXT NOT NULL,
+                    error_message TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # @everyone overwrites saved by channel lock, restored by unlock
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS channel_lock_snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    overwrite TEXT, -- JSON {"allow": int, "deny": int}, NULL if there was no overwrite
+                    locked_by TEXT NOT NULL,
+                    locked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    UNIQUE(guild_id, channel_id)
+                )
+            ''')
+            
+            # Finished voice sessions, written in batches by VoiceSessionRecorder
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS voice_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id TEXT NOT NULL,
+                    user_id TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    joined_at TIMESTAMP NOT NULL,
+                    left_at TIMESTAMP NOT NULL,
+                    duration_seconds INTEGER NOT NULL,
+                    end_reason TEXT NOT NULL, -- left, moved, shutdown
+                    moved_to TEXT
+                )
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_voice_sessions_guild ON voice_sessions (guild_id, id)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_voice_sessions_user ON voice_sessions (guild_id, user_id, id)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_voice_sessions_channel ON voice_sessions (guild_id, channel_id, id)
+            ''')
+            
+            # Moderation actions, written in batches by ModerationCog
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS moderation_actions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    guild_id TEXT NOT NULL,
+                    action TEXT NOT NULL, -- drag, nsfw, unnsfw, role_add, role_remove, role_create, channel_create
+                    moderator_id TEXT NOT NULL,
+                    target_type TEXT NOT NULL, -- user, channel or role
+                    target_id TEXT NOT NULL,
+                    details TEXT DEFAULT '{}', -- JSON object
+                    created_at TIMESTAMP NOT NULL
+                )
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_moderation_actions_target
+                ON moderation_actions (guild_id, target_id, created_at, id)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_moderation_actions_moderator
+                ON moderation_actions (guild_id, moderator_id, created_at, id)
+            ''')
+            
+            # Usage rollups, maintained in the same transaction as the raw log inserts.
+            # granularity is 'hour' (bucket 'YYYY-MM-DD HH:00:00') or 'day' (bucket 'YYYY-MM-DD'), in UTC like executed_at
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS command_usage_rollups (
+                    granularity TEXT NOT NULL,
+                    guild_id TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    command TEXT NOT NULL,
+                    success INTEGER NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (granularity, guild_id, bucket, command, success)
+                ) WITHOUT ROWID
+            ''')
+            await db.execute('''
+                CREATE TABLE IF NOT EXISTS deletion_rollups (
+                    granularity TEXT NOT NULL,
+                    guild_id TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    channel_id TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (granularity, guild_id, bucket, channel_id)
+                ) WITHOUT ROWID
+            ''')
+            await self._backfill_rollups(db)
+            
+            # Keyset pagination over a guild's whitelist walks (guild_id, id)
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_whitelist_guild_id ON whitelist (guild_id, id)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_command_logs_guild_id ON command_logs (guild_id, id)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_deleted_messages_guild_id ON deleted_messages (guild_id, id)
+            ''')
+            # Retention passes find expired raw rows by time
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_command_logs_executed_at ON command_logs (executed_at)
+            ''')
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_deleted_messages_deleted_at ON deleted_messages (deleted_at)
+            ''')
+            # Attribution updates find rows by message id
+            await db.execute('''
+                CREATE INDEX IF NOT EXISTS idx_deleted_messages_message_id ON deleted_messages (message_id)
+            ''')
+            
             await db.commit()
     
+    async def _add_missing_columns(self, db, table: str, columns: dict):
+        """Add columns introduced after a table was first created"""
+        async with db.execute(f'PRAGMA table_info({table})') as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        for name, definition in columns.items():
+            if name not in existing:
+                await db.execute(f'ALTER TABLE {table} ADD COLUMN {name} {definition}')
+    
+    async def _backfill_rollups(self, db):
+        """Build rollups from existing raw rows, once per database"""
+        async with db.execute('PRAGMA user_version') as cursor:
+            if (await cursor.fetchone())[0] >= ROLLUPS_BACKFILLED:
+                return
+        
+        # Databases backfilled before the marker existed: only fill tables that are still empty
+        async with db.execute('SELECT EXISTS (SELECT 1 FROM command_usage_rollups)') as cursor:
+            commands_done = (await cursor.fetchone())[0]
+        async with db.execute('SELECT EXISTS (SELECT 1 FROM deletion_rollups)') as cursor:
+            deletions_done = (await cursor.fetchone())[0]
+        
+        for granularity, bucket in ROLLUP_BUCKETS:
+            if not commands_done:
+                await db.execute(f'''
+                    INSERT INTO command_usage_rollups (granularity, guild_id, bucket, command, success, count)
+                    SELECT ?, guild_id, {bucket.format(column='executed_at')}, command, success != 0, COUNT(*)
+                    FROM command_logs GROUP BY 2, 3, 4, 5
+                ''', (granularity,))
+            if not deletions_done:
+                await db.execute(f'''
+                    INSERT INTO deletion_rollups (granularity, guild_id, bucket, channel_id, count)
+                    SELECT ?, guild_id, {bucket.format(column='deleted_at')}, channel_id, COUNT(*)
+                    FROM deleted_messages GROUP BY 2, 3, 4
+                ''', (granularity,))
+        # Written in the same transaction as the backfill, so a crash before commit retries it
+        await db.execute(f'PRAGMA user_version = {ROLLUPS_BACKFILLED}')
+    
+    async def _add_to_rollups(self, db, commands: list, deletions: list):
+        """Count (guild_id, command, success) and (guild_id, channel_id) events into the current buckets"""
+        now = datetime.now(timezone.utc)
+        buckets = [('hour', now.strftime('%Y-%m-%d %H:00:00')), ('day', now.strftime('%Y-%m-%d'))]
+        
+        if commands:
+            counts = Counter((guild_id, command, 1 if success else 0) for guild_id, command, success in commands)
+            await db.executemany('''
+                INSERT INTO command_usage_rollups (granularity, guild_id, bucket, command, success, count)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (granularity, guild_id, bucket, command, success)
+                DO UPDATE SET count = count + excluded.count
+            ''', [
+                (granularity, guild_id, bucket, command, success, count)
+                for granularity, bucket in buckets
+                for (guild_id, command, success), count in counts.items()
+            ])
+        if deletions:
+            counts = Counter(deletions)
+            await db.executemany('''
+                INSERT INTO deletion_rollups (granularity, guild_id, bucket, channel_id, count)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (granularity, guild_id, bucket, channel_id)
+                DO UPDATE SET count = count + excluded.count
+            ''', [
+                (granularity, guild_id, bucket, channel_id, count)
+                for granularity, bucket in buckets
+                for (guild_id, channel_id), count in counts.items()
+            ])
+    
     async def add_to_whitelist(self, type_: str, discord_id: str, guild_id: str, permissions: list, added_by: str):
         """Add user or role to whitelist"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -97,6 +341,26 @@ class Database:
             ''', (guild_id,)) as cursor:
                 return await cursor.fetchall()
     
+    async def get_whitelist_page(self, guild_id: str, after_id: int = 0, limit: int = 10):
+        """Get up to limit whitelist entries with an id greater than after_id"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute('''
+                SELECT id, type, discord_id, permissions FROM whitelist
+                WHERE guild_id = ? AND id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (guild_id, after_id, limit)) as cursor:
+                return await cursor.fetchall()
+    
+    async def count_whitelist(self, guild_id: str):
+        """Count whitelist entries for a guild"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute('''
+                SELECT COUNT(*) FROM whitelist WHERE guild_id = ?
+            ''', (guild_id,)) as cursor:
+                result = await cursor.fetchone()
+                return result[0]
+    
     async def is_whitelisted(self, user_id: str, role_ids: list, guild_id: str):
         """Check if user or their roles are whitelisted"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -128,6 +392,175 @@ class Database:
             ''', (guild_id, key, value))
             await db.commit()
     
+    async def get_configs_for_keys(self, keys: list, guild_id: str = None):
+        """Get (guild_id, key, value) rows for the given keys, across all guilds unless guild_id is set"""
+        placeholders = ", ".join("?" for _ in keys)
+        query = f'SELECT guild_id, key, value FROM config WHERE key IN ({placeholders})'
+        params = list(keys)
+        if guild_id:
+            query += ' AND guild_id = ?'
+            params.append(guild_id)
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+    
+    async def get_configs_with_prefix(self, guild_id: str, prefix: str):
+        """Get {key: value} for every config key starting with prefix"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute('''
+                SELECT key, value FROM config WHERE guild_id = ? AND key LIKE ? ESCAPE '\\' ORDER BY key
+            ''', (guild_id, prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')) as cursor:
+                return dict(await cursor.fetchall())
+    
+    async def delete_config(self, guild_id: str, key: str):
+        """Delete a configuration value; returns whether it existed"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute('''
+                DELETE FROM config WHERE guild_id = ? AND key = ?
+            ''', (guild_id, key))
+            await db.commit()
+            return cursor.rowcount > 0
+    
+    async def create_role_job(self, guild_id: str, role_id: str, action: str, filters: dict,
+                              created_by: str, channel_id: str = None):
+        """Create a bulk role job and return its id"""
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute('''
+                INSERT INTO role_jobs (guild_id, role_id, action, filters, created_by, channel_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (guild_id, role_id, action, json.dumps(filters), created_by, channel_id))
+            await db.commit()
+            return cursor.lastrowid
+    
+    async def update_role_job(self, job_id: int, **fields):
+        """Update columns of a bulk role job"""
+        columns = ", ".join(f"{column} = ?" for column in fields)
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(f'''
+                UPDATE role_jobs SET {columns}, updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            ''', (*fields.values(), job_id))
+            await db.commit()
+    
+    async def get_role_job(self, job_id: int):
+        """Get one bulk role job as a dict"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute('''
+                SELECT * FROM role_jobs WHERE id = ?
+            ''', (job_id,)) as cursor:
+                result = await cursor.fetchone()
+                return dict(result) if result else None
+    
+    async def get_role_jobs(self, guild_id: str, limit: int = 10):
+        """Get the most recent bulk role jobs for a guild"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute('''
+                SELECT * FROM role_jobs WHERE guild_id = ? ORDER BY id DESC LIMIT ?
+            ''', (guild_id, limit)) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    async def get_unfinished_role_jobs(self):
+        """Get bulk role jobs that were pending or running, oldest first"""
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute('''
+                SELECT * FROM role_jobs WHERE status IN ('pending', 'running') ORDER BY id
+            ''') as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    async def save_lock_snapshots(self, rows: list):
+        """Store (guild_id, channel_id, overwrite, locked_by) rows, keeping any existing snapshot"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany('''
+                INSERT OR IGNORE INTO channel_lock_snapshots (guild_id, channel_id, overwrite, locked_by)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+            await db.commit()
+    
+    async def get_lock_snapshots(self, guild_id: str):
+        """Get saved lock snapshots for a guild as {channel_id: overwrite}"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute('''
+                SELECT channel_id, overwrite FROM channel_lock_snapshots WHERE guild_id = ?
+            ''', (guild_id,)) as cursor:
+                return {channel_id: overwrite for channel_id, overwrite in await cursor.fetchall()}
+    
+    async def delete_lock_snapshots(self, guild_id: str, channel_ids: list):
+        """Forget lock snapshots once channels are unlocked"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany('''
+                DELETE FROM channel_lock_snapshots WHERE guild_id = ? AND channel_id = ?
+            ''', [(guild_id, channel_id) for channel_id in channel_ids])
+            await db.commit()
+    
+    async def add_voice_sessions(self, sessions: list):
+        """Insert a batch of finished voice sessions in one transaction"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany('''
+                INSERT INTO voice_sessions (guild_id, user_id, channel_id, joined_at, left_at,
+                                            duration_seconds, end_reason, moved_to)
+                VALUES (:guild_id, :user_id, :channel_id, :joined_at, :left_at,
+                        :duration_seconds, :end_reason, :moved_to)
+            ''', sessions)
+            await db.commit()
+    
+    async def get_voice_sessions_page(self, guild_id: str, user_id: str = None, channel_id: str = None,
+                                      before_id: int = None, limit: int = 10):
+        """Get one page of voice sessions, newest first, keyed on the last id seen"""
+        query = 'SELECT * FROM voice_sessions WHERE guild_id = ?'
+        params = [guild_id]
+        if user_id:
+            query += ' AND user_id = ?'
+            params.append(user_id)
+        if channel_id:
+            query += ' AND channel_id = ?'
+            params.append(channel_id)
+        if before_id:
+            query += ' AND id < ?'
+            params.append(before_id)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(query, params) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
+    async def add_moderation_actions(self, actions: list):
+        """Insert a batch of moderation actions in one transaction"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany('''
+                INSERT INTO moderation_actions (guild_id, action, moderator_id, target_type, target_id,
+                                                details, created_at)
+                VALUES (:guild_id, :action, :moderator_id, :target_type, :target_id, :details, :created_at)
+            ''', actions)
+            await db.commit()
+    
+    async def get_moderation_actions_page(self, guild_id: str, target_id: str = None, moderator_id: str = None,
+                                          before: tuple = None, limit: int = 10):
+        """One page of moderation actions, newest first, keyed on the last (created_at, id) seen"""
+        query = 'SELECT * FROM moderation_actions WHERE guild_id = ?'
+        params = [guild_id]
+        # Filtering on exactly one of target/moderator lets SQLite walk the matching index in order
+        if target_id:
+            query += ' AND target_id = ?'
+            params.append(target_id)
+        if moderator_id:
+            query += ' AND moderator_id = ?'
+            params.append(moderator_id)
+        if before:
+            query += ' AND (created_at, id) < (?, ?)'
+            params.extend(before)
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit)
+        
+        async with aiosqlite.connect(self.db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(query, params) as cursor:
+                return [dict(row) for row in await cursor.fetchall()]
+    
     async def get_config(self, guild_id: str, key: str, default=None):
         """Get configuration value"""
         async with aiosqlite.connect(self.db_path) as db:
@@ -145,6 +578,15 @@ class Database:
                 INSERT INTO deleted_messages (message_id, channel_id, guild_id, author_id, content, attachments)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (message_id, channel_id, guild_id, author_id, content, str(attachments)))
+            await self._add_to_rollups(db, [], [(guild_id, channel_id)])
+            await db.commit()
+    
+    async def set_deleted_by(self, attributions: list):
+        """Record who deleted messages, from (deleted_by, guild_id, message_id) rows"""
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany('''
+                UPDATE deleted_messages SET deleted_by = ? WHERE guild_id = ? AND message_id = ?
+            ''', attributions)
             await db.commit()
     
     async def get_last_deleted_message(self, channel_id: str):
@@ -167,4 +609,140 @@ class Database:
                 INSERT INTO command_logs (guild_id, channel_id, user_id, command, args, success, error_message)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (guild_id, channel_id, user_id, command, args, success, error_message))
+            await self._add_to_rollups(db, [(guild_id, command, success)], [])
+            await db.commit()
+    
+    async def write_log_batch(self, command_rows: list, deleted_rows: list):
+        """Insert command log and deleted message rows in a single transaction"""
+        async with aiosqlite.connect(self.db_path) as db:
+            if command_rows:
+                await db.executemany('''
+                    INSERT INTO command_logs (guild_id, channel_id, user_id, command, args, success, error_message)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', command_rows)
+            if deleted_rows:
+                await db.executemany('''
+                    INSERT INTO deleted_messages (message_id, channel_id, guild_id, author_id, content, attachments)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', deleted_rows)
+            await self._add_to_rollups(
+                db,
+                [(row[0], row[3], row[5]) for row in command_rows],
+                [(row[2], row[1]) for row in deleted_rows]
+            )
+            await db.commit()
+    
+    async def get_command_usage(self, guild_id: str, since: str, granularity: str = 'day', limit: int = 10):
+        """Per-command (command, total, failed) from the rollups since a bucket, busiest first"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(COMMAND_USAGE_QUERY, (granularity, guild_id, since, limit)) as cursor:
+                return await cursor.fetchall()
+    
+    async def get_command_timeline(self, guild_id: str, since: str, granularity: str = 'day'):
+        """(bucket, total, failed) per bucket since a bucket, oldest first"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(COMMAND_TIMELINE_QUERY, (granularity, guild_id, since)) as cursor:
+                return await cursor.fetchall()
+    
+    async def get_deletion_counts(self, guild_id: str, since: str, granularity: str = 'day', limit: int = 10):
+        """(channel_id, total) deletions from the rollups since a bucket, busiest first"""
+        async with aiosqlite.connect(self.db_path) as db:
+            async with db.execute(DELETION_COUNTS_QUERY, (granularity, guild_id, since, limit)) as cursor:
+                return await cursor.fetchall()
+    
+    async def prune_logs(self, command_days: int, deleted_days: int, hourly_days: int, chunk_size: int = 5000):
+        """Delete raw log rows and hourly rollups past their retention (0 keeps forever); daily rollups are kept"""
+        deleted = {}
+        async with aiosqlite.connect(self.db_path) as db:
+            # Raw tables can hold millions of rows: delete in chunks, committing each, so writers only wait for one
+            for name, column, days in (
+                ('command_logs', 'executed_at', command_days),
+                ('deleted_messages', 'deleted_at', deleted_days),
+            ):
+                if not days:
+                    continue
+                deleted[name] = 0
+                while True:
+                    cursor = await db.execute(f'''
+                        DELETE FROM {name} WHERE id IN (
+                            SELECT id FROM {name} WHERE {column} < datetime('now', ?) LIMIT ?
+                        )
+                    ''', (f'-{int(days)} days', chunk_size))
+                    await db.commit()
+                    deleted[name] += cursor.rowcount
+                    if cursor.rowcount < chunk_size:
+                        break
+                    await asyncio.sleep(0)
+            
+            # Hourly rollups are bounded by the retention window, so one statement each is enough
+            for name in ('command_usage_rollups', 'deletion_rollups'):
+                if hourly_days:
+                    cursor = await db.execute(
+                        f"DELETE FROM {name} WHERE granularity = 'hour' AND bucket < datetime('now', ?)",
+                        (f'-{int(hourly_days)} days',)
+                    )
+                    deleted[name] = cursor.rowcount
             await db.commit()
+        return deleted
+
+class DatabaseReader:
+    """One long-lived read-only connection for serving the dashboard API"""
+    
+    def __init__(self, db_path='./data/bot.db'):
+        self.db_path = db_path
+        self.connection = None
+    
+    async def open(self):
+        """Open the read-only connection"""
+        if self.connection is None:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            self.connection = await aiosqlite.connect(uri, uri=True)
+            self.connection.row_factory = aiosqlite.Row
+    
+    async def close(self):
+        """Close the connection"""
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+    
+    async def fetch_all(self, query: str, params: tuple):
+        """Run a query and return its rows as dicts"""
+        async with self.connection.execute(query, params) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+    
+    async def get_whitelist_page(self, guild_id: str, after_id: int = 0, limit: int = 25):
+        """Whitelist entries with an id greater than after_id"""
+        return await self.fetch_all('''
+            SELECT id, type, discord_id, permissions, added_by, added_at FROM whitelist
+            WHERE guild_id = ? AND id > ?
+            ORDER BY id
+            LIMIT ?
+        ''', (guild_id, after_id, limit))
+    
+    async def get_command_logs_page(self, guild_id: str, before_id: int = None, limit: int = 25):
+        """Command log rows older than before_id, newest first"""
+        return await self.fetch_all('''
+            SELECT id, channel_id, user_id, command, args, success, error_message, executed_at
+            FROM command_logs
+            WHERE guild_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (guild_id, before_id or 2 ** 63 - 1, limit))
+    
+    async def get_deleted_messages_page(self, guild_id: str, before_id: int = None, limit: int = 25):
+        """Deleted messages older than before_id, newest first"""
+        return await self.fetch_all('''
+            SELECT id, message_id, channel_id, author_id, content, attachments, deleted_at, deleted_by
+            FROM deleted_messages
+            WHERE guild_id = ? AND id < ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (guild_id, before_id or 2 ** 63 - 1, limit))
+    
+    async def get_analytics(self, guild_id: str, since: str, granularity: str = 'day', limit: int = 10):
+        """Command usage, timeline and deletions from the rollups since a bucket"""
+        return {
+            "commands": await self.fetch_all(COMMAND_USAGE_QUERY, (granularity, guild_id, since, limit)),
+            "timeline": await self.fetch_all(COMMAND_TIMELINE_QUERY, (granularity, guild_id, since)),
+            "deletions": await self.fetch_all(DELETION_COUNTS_QUERY, (granularity, guild_id, since, limit))
+        }
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List
+import discord
+from utils.antispam import LRUTable, SlidingWindowCounter
+
+# Audit-log actions the detector counts, by the name their limits use
+NUKE_ACTIONS = {
+    discord.AuditLogAction.channel_delete: 'channel_delete',
+    discord.AuditLogAction.role_delete: 'role_delete',
+    discord.AuditLogAction.ban: 'ban',
+    discord.AuditLogAction.kick: 'kick',
+    discord.AuditLogAction.webhook_create: 'webhook_create',
+}
+
+class ActorRateTracker:
+    """Per-actor sliding-window counts of destructive actions"""
+    
+    def __init__(self, window: float = 60.0, buckets: int = 12, max_actors: int = 10000):
+        self.buckets = buckets
+        self.bucket_span = window / buckets
+        # (guild_id, actor_id) -> {action: counter}
+        self.actors = LRUTable(max_actors)
+    
+    def add(self, guild_id: int, actor_id: int, action: str, at: datetime) -> int:
+        """Count one action at the time the audit log gives it; returns the actor's count in the window"""
+        counters = self.actors.touch((guild_id, actor_id), dict)
+        counter = counters.get(action)
+        if counter is None:
+            counter = counters[action] = SlidingWindowCounter(self.buckets)
+        return counter.add(int(at.timestamp() / self.bucket_span))
+    
+    def reset(self, guild_id: int, actor_id: int):
+        self.actors.pop((guild_id, actor_id), None)
+
+class AuditLogFeed:
+    """Reads new audit-log entries per guild; events only wake a reader, so a burst costs a few reads"""
+    
+    def __init__(self, handle: Callable[[discord.Guild, List[discord.AuditLogEntry]], Awaitable[None]],
+                 delay: float = 0.25, max_pages: int = 3, lookback: float = 10.0, empty_retries: int = 1):
+        self.handle = handle
+        self.delay = delay
+        self.max_pages = max_pages
+        self.lookback = timedelta(seconds=lookback)
+        # Entries can land in the audit log a moment after their gateway event
+        self.empty_retries = empty_retries
+        self.logger = logging.getLogger('security_bot')
+        
+        # guild_id -> id of the newest entry already handled
+        self.after: Dict[int, int] = {}
+        self.tasks: Dict[int, asyncio.Task] = {}
+        # Guilds with events that arrived while their reader was busy
+        self.dirty = set()
+        self.reads = 0
+    
+    def notify(self, guild: discord.Guild):
+        """Something destructive happened in a guild; make sure a read follows shortly"""
+        if guild.id in self.tasks:
+            self.dirty.add(guild.id)
+            return
+        if guild.id not in self.after:
+            # Only look slightly back on the first read, so old entries aren't counted
+            self.after[guild.id] = discord.utils.time_snowflake(discord.utils.utcnow() - self.lookback)
+        self.tasks[guild.id] = asyncio.get_running_loop().create_task(
+            self._read_guild(guild), name=f'audit-log-feed-{guild.id}'
+        )
+    
+    async def stop(self):
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _read_guild(self, guild: discord.Guild):
+        retries = self.empty_retries
+        try:
+            while True:
+                self.dirty.discard(guild.id)
+                await asyncio.sleep(self.delay)
+                
+                entries = [
+                    entry async for entry in guild.audit_logs(
+                        limit=100 * self.max_pages, after=discord.Object(self.after[guild.id]), oldest_first=True
+                    )
+                ]
+                self.reads += 1
+                if entries:
+                    self.after[guild.id] = max(entry.id for entry in entries)
+                    await self.handle(guild, entries)
+                    retries = self.empty_retries
+                elif guild.id not in self.dirty:
+                    # Nothing new and no new events: stop once the retries for late entries are spent
+                    if retries == 0:
+                        break
+                    retries -= 1
+        except discord.HTTPException as e:
+            self.logger.warning(f"Couldn't read the audit log for {guild.id}: {e}")
+        except Exception as e:
+            self.logger.error(f"Audit log feed failed for {guild.id}: {e}")
+        finally:
+            self.tasks.pop(guild.id, None)
@@ -0,0 +1,144 @@
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+class SlidingWindowCounter:
+    """Event count over the last `buckets` time buckets, kept in a fixed-size ring"""
+    __slots__ = ('counts', 'stamps', 'total')
+    
+    def __init__(self, buckets: int):
+        self.counts = [0] * buckets
+        # Which absolute bucket each slot currently holds, so stale slots are recognised and reused
+        self.stamps = [-1] * buckets
+        self.total = 0
+    
+    def add(self, bucket: int, amount: int = 1) -> int:
+        """Count amount in an absolute bucket number and return the window total"""
+        counts, stamps = self.counts, self.stamps
+        size = len(counts)
+        slot = bucket % size
+        if stamps[slot] != bucket:
+            # Expire every slot that fell out of the window; at most one pass over the ring
+            total = 0
+            for index in range(size):
+                if bucket - stamps[index] >= size:
+                    counts[index] = 0
+                    stamps[index] = -1
+                else:
+                    total += counts[index]
+            stamps[slot] = bucket
+            counts[slot] = 0
+            self.total = total
+        counts[slot] += amount
+        self.total += amount
+        return self.total
+
+class LRUTable(OrderedDict):
+    """Dict capped at max_size entries, evicting the least recently used"""
+    
+    def __init__(self, max_size: int):
+        super().__init__()
+        self.max_size = max_size
+    
+    def touch(self, key, factory):
+        """The value for key, created with factory() if missing, marked most recently used"""
+        value = self.get(key)
+        if value is None:
+            value = self[key] = factory()
+            if len(self) > self.max_size:
+                self.popitem(last=False)
+        else:
+            self.move_to_end(key)
+        return value
+
+class SpamThresholds(NamedTuple):
+    """Per-window limits for one guild"""
+    messages: int
+    mentions: int
+    links: int
+    duplicates: int
+    channel_messages: int
+    guild_messages: int
+
+class SpamViolation(NamedTuple):
+    scope: str  # user, channel or guild
+    metric: str  # messages, mentions, links or duplicates
+    count: int
+    limit: int
+
+class UserState:
+    __slots__ = ('messages', 'mentions', 'links', 'duplicates', 'last_hash')
+    
+    def __init__(self, buckets: int):
+        self.messages = SlidingWindowCounter(buckets)
+        self.mentions = SlidingWindowCounter(buckets)
+        self.links = SlidingWindowCounter(buckets)
+        self.duplicates = SlidingWindowCounter(buckets)
+        self.last_hash = None
+
+class AntiSpamEngine:
+    """Per-user, per-channel and per-guild sliding-window counters; O(1) work and bounded memory per message"""
+    
+    def __init__(self, window: float = 10.0, buckets: int = 10, max_users: int = 50000,
+                 max_channels: int = 10000, max_guilds: int = 5000, action_cooldown: float = 30.0):
+        self.buckets = buckets
+        self.bucket_span = window / buckets
+        self.action_cooldown = action_cooldown
+        # Least recently active keys are dropped first; a dropped key just starts counting from zero again
+        self.users = LRUTable(max_users)
+        self.channels = LRUTable(max_channels)
+        self.guilds = LRUTable(max_guilds)
+        # (scope, id) -> when it was last acted on
+        self.actioned = LRUTable(max_users)
+    
+    def check(self, guild_id: int, channel_id: int, user_id: int, content: str, mentions: int, links: int,
+              thresholds: SpamThresholds, now: Optional[float] = None) -> List[SpamViolation]:
+        """Count one message and return every limit it puts its user, channel or guild over"""
+        bucket = int((time.monotonic() if now is None else now) / self.bucket_span)
+        buckets = self.buckets
+        violations = []
+        
+        user = self.users.touch((guild_id, user_id), lambda: UserState(buckets))
+        count = user.messages.add(bucket)
+        if count > thresholds.messages:
+            violations.append(SpamViolation('user', 'messages', count, thresholds.messages))
+        if mentions:
+            count = user.mentions.add(bucket, mentions)
+            if count > thresholds.mentions:
+                violations.append(SpamViolation('user', 'mentions', count, thresholds.mentions))
+        if links:
+            count = user.links.add(bucket, links)
+            if count > thresholds.links:
+                violations.append(SpamViolation('user', 'links', count, thresholds.links))
+        if content:
+            # Consecutive repeats of the same text
+            content_hash = hash(content)
+            if content_hash == user.last_hash:
+                count = user.duplicates.add(bucket)
+                if count > thresholds.duplicates:
+                    violations.append(SpamViolation('user', 'duplicates', count, thresholds.duplicates))
+            user.last_hash = content_hash
+        
+        count = self.channels.touch(channel_id, lambda: SlidingWindowCounter(buckets)).add(bucket)
+        if count > thresholds.channel_messages:
+            violations.append(SpamViolation('channel', 'messages', count, thresholds.channel_messages))
+        count = self.guilds.touch(guild_id, lambda: SlidingWindowCounter(buckets)).add(bucket)
+        if count > thresholds.guild_messages:
+            violations.append(SpamViolation('guild', 'messages', count, thresholds.guild_messages))
+        return violations
+    
+    def should_act(self, key, now: Optional[float] = None) -> bool:
+        """Whether a user/channel/guild is due an action, i.e. wasn't acted on within the cooldown"""
+        now = time.monotonic() if now is None else now
+        last = self.actioned.get(key)
+        if last is not None and now - last < self.action_cooldown:
+            return False
+        self.actioned[key] = now
+        self.actioned.move_to_end(key)
+        if len(self.actioned) > self.actioned.max_size:
+            self.actioned.popitem(last=False)
+        return True
+
+def count_links(content: str) -> int:
+    """Number of http(s) links in a message"""
+    return content.count('http://') + content.count('https://') if 'http' in content else 0
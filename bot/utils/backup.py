@@ -0,0 +1,170 @@
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import List, Optional
+import aiosqlite
+
+BACKUP_PREFIX = 'bot-'
+PRE_RESTORE_PREFIX = 'pre-restore-'
+
+class BackupRestarted(Exception):
+    """Raised from the progress callback when writes keep restarting a stepped backup"""
+
+class BackupManager:
+    """Online backups of the bot database through SQLite's backup API, with rotation and verification"""
+    
+    def __init__(self, db_path: str, backup_dir: str, keep: int = 7, step_pages: int = 1024,
+                 step_sleep: float = 0.01, max_restarts: int = 3, probe_interval: float = 0.1):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.step_pages = step_pages
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+        self.probe_interval = probe_interval
+        # Only one backup or restore at a time
+        self.lock = asyncio.Lock()
+        self.last_result: Optional[dict] = None
+        os.makedirs(backup_dir, exist_ok=True)
+    
+    def list_backups(self) -> List[dict]:
+        """Backup files, newest first"""
+        backups = []
+        for name in os.listdir(self.backup_dir):
+            if name.endswith('.db') and name.startswith((BACKUP_PREFIX, PRE_RESTORE_PREFIX)):
+                path = os.path.join(self.backup_dir, name)
+                stat = os.stat(path)
+                backups.append({"name": name, "path": path, "size": stat.st_size, "created": stat.st_mtime})
+        return sorted(backups, key=lambda backup: backup["created"], reverse=True)
+    
+    async def create(self, prefix: str = BACKUP_PREFIX) -> dict:
+        """Copy the live database to a new verified backup file and rotate old ones"""
+        async with self.lock:
+            name = f"{prefix}{datetime.now():%Y%m%d-%H%M%S}.db"
+            path = os.path.join(self.backup_dir, name)
+            partial = path + '.part'
+            
+            stalls = []
+            probe = asyncio.create_task(self._probe_writers(stalls))
+            started = time.monotonic()
+            try:
+                copy = await asyncio.to_thread(self._copy, partial)
+            except BaseException:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise
+            finally:
+                probe.cancel()
+                await asyncio.gather(probe, return_exceptions=True)
+            duration = time.monotonic() - started
+            
+            integrity = await asyncio.to_thread(self.verify, partial)
+            if integrity != 'ok':
+                os.remove(partial)
+                raise RuntimeError(f"Backup failed its integrity check: {integrity}")
+            os.replace(partial, path)
+            removed = self.rotate() if prefix == BACKUP_PREFIX else []
+            
+            self.last_result = {
+                "name": name,
+                "path": path,
+                "size": os.path.getsize(path),
+                "duration": duration,
+                "steps": copy["steps"],
+                "restarts": copy["restarts"],
+                "single_step": copy["single_step"],
+                "writer_stall_max_ms": max(stalls, default=0.0) * 1000,
+                "writer_stall_total_ms": sum(stalls) * 1000,
+                "removed": removed,
+                "finished_at": datetime.now()
+            }
+            return self.last_result
+    
+    def _copy(self, destination: str) -> dict:
+        """Step through the backup, falling back to one step if concurrent writes keep restarting it"""
+        stats = {"steps": 0, "restarts": 0, "single_step": False}
+        last_remaining = None
+        
+        def progress(status, remaining, total):
+            nonlocal last_remaining
+            stats["steps"] += 1
+            # Another connection wrote to the source, so SQLite started the copy over
+            if last_remaining is not None and remaining > last_remaining:
+                stats["restarts"] += 1
+                if stats["restarts"] > self.max_restarts:
+                    raise BackupRestarted()
+            last_remaining = remaining
+        
+        source = sqlite3.connect(self.db_path, timeout=30)
+        target = sqlite3.connect(destination)
+        try:
+            try:
+                # Between steps the source is unlocked (and the sleep lets writers in)
+                source.backup(target, pages=self.step_pages, progress=progress, sleep=self.step_sleep)
+            except BackupRestarted:
+                # In WAL mode one step reads a snapshot, so writers still aren't blocked
+                stats["single_step"] = True
+                source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        return stats
+    
+    async def _probe_writers(self, stalls: list):
+        """Time how long taking the write lock takes while the backup runs"""
+        async with aiosqlite.connect(self.db_path, timeout=30) as db:
+            while True:
+                started = time.monotonic()
+                await db.execute('BEGIN IMMEDIATE')
+                await db.rollback()
+                stalls.append(time.monotonic() - started)
+                await asyncio.sleep(self.probe_interval)
+    
+    @staticmethod
+    def verify(path: str) -> str:
+        """'ok', or the first problem PRAGMA integrity_check reports"""
+        try:
+            connection = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+            try:
+                return connection.execute('PRAGMA integrity_check').fetchone()[0]
+            finally:
+                connection.close()
+        except sqlite3.Error as e:
+            return str(e)
+    
+    def rotate(self) -> List[str]:
+        """Delete scheduled/manual backups beyond the newest `keep`"""
+        backups = [backup for backup in self.list_backups() if backup["name"].startswith(BACKUP_PREFIX)]
+        removed = []
+        for backup in backups[self.keep:]:
+            os.remove(backup["path"])
+            removed.append(backup["name"])
+        return removed
+    
+    async def restore(self, name: str) -> dict:
+        """Replace the live database's contents with a backup, keeping a pre-restore copy first"""
+        path = os.path.join(self.backup_dir, os.path.basename(name))
+        if not os.path.exists(path):
+            raise ValueError(f"No backup named `{name}`")
+        
+        integrity = await asyncio.to_thread(self.verify, path)
+        if integrity != 'ok':
+            raise ValueError(f"Backup `{name}` failed its integrity check: {integrity}")
+        
+        safety = await self.create(PRE_RESTORE_PREFIX)
+        async with self.lock:
+            started = time.monotonic()
+            await asyncio.to_thread(self._restore, path)
+            return {"name": name, "pre_restore": safety["name"], "duration": time.monotonic() - started}
+    
+    def _restore(self, path: str):
+        # Copying through the backup API takes SQLite's locks, so open connections see the restored data
+        source = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        target = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
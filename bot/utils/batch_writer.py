@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+class BatchWriter:
+    """Buffers rows and writes them to SQLite in batches, on a timer or as soon as a batch fills"""
+    
+    def __init__(self, write: Callable[[List[dict]], Awaitable[None]], name: str, batch_size: int = 100,
+                 flush_interval: float = 5.0, max_buffer: int = 10000, max_attempts: int = 3):
+        self.write = write
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger('security_bot')
+        self.buffer = []
+        self.written = 0
+        self.dropped = 0
+        self._flush_lock = asyncio.Lock()
+        self._task = None
+        self._tasks = set()
+        # (rows, failed attempts) batches that must be written before anything newer
+        self._retry = []
+    
+    def start(self):
+        """Start the periodic flush"""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._flush_loop(), name=f'{self.name}-flush')
+    
+    async def stop(self):
+        """Stop the periodic flush and write whatever is buffered"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.flush()
+    
+    def record(self, rows: List[dict]):
+        """Buffer rows; a full batch is written right away"""
+        self.buffer.extend(rows)
+        
+        # Keep memory bounded if the database stays unavailable
+        overflow = len(self.buffer) - self.max_buffer
+        if overflow > 0:
+            del self.buffer[:overflow]
+            self.dropped += overflow
+        
+        if len(self.buffer) >= self.batch_size and not self._flush_lock.locked():
+            task = asyncio.get_running_loop().create_task(self.flush(), name=f'{self.name}-flush-batch')
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def flush(self):
+        """Write buffered rows in one transaction; a batch that keeps failing is split to isolate the bad rows"""
+        async with self._flush_lock:
+            while True:
+                if not self._retry:
+                    if not self.buffer:
+                        return
+                    self._retry.append((self.buffer, 0))
+                    self.buffer = []
+                
+                rows, attempts = self._retry[0]
+                try:
+                    await self.write(rows)
+                except Exception as e:
+                    attempts += 1
+                    self.logger.error(
+                        f"Failed to write {len(rows)} {self.name} rows ({attempts}/{self.max_attempts}): {e}"
+                    )
+                    if attempts < self.max_attempts:
+                        # Retry with the next flush
+                        self._retry[0] = (rows, attempts)
+                    elif len(rows) > 1:
+                        half = len(rows) // 2
+                        self._retry[:1] = [(rows[:half], 0), (rows[half:], 0)]
+                    else:
+                        del self._retry[0]
+                        self.dropped += 1
+                        self.logger.error(f"Dropped {self.name} row after {attempts} failed writes: {rows[0]}")
+                    return
+                
+                del self._retry[0]
+                self.written += len(rows)
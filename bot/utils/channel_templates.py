@@ -0,0 +1,230 @@
+import json
+from typing import Callable, Optional
+import discord
+from utils.rate_limit import RateLimitedExecutor
+
+# Templates live in the config table under this prefix, one row per template
+TEMPLATE_KEY_PREFIX = 'channel_template:'
+CHANNEL_TYPES = ('text', 'voice')
+CHANNEL_OPTIONS = {
+    'text': ('topic', 'nsfw', 'slowmode_delay'),
+    'voice': ('bitrate', 'user_limit')
+}
+
+# Example accepted by parse_template:
+# {
+#   "categories": [
+#     {"name": "Game Night", "overwrites": {"@everyone": {"view_channel": false}, "Event Staff": {"view_channel": true}},
+#      "channels": [{"name": "announcements", "topic": "Read me", "overwrites": {"@everyone": {"send_messages": false}}},
+#                   {"name": "Lobby", "type": "voice", "user_limit": 20}]}
+#   ],
+#   "channels": [{"name": "event-feedback"}]
+# }
+
+def parse_template(text: str) -> dict:
+    """Validate a template definition; raises ValueError describing the first problem"""
+    try:
+        template = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Template is not valid JSON: {e}")
+    
+    if not isinstance(template, dict):
+        raise ValueError("Template must be a JSON object with `categories` and/or `channels`")
+    
+    categories = template.get("categories", [])
+    channels = template.get("channels", [])
+    if not isinstance(categories, list) or not isinstance(channels, list):
+        raise ValueError("`categories` and `channels` must be lists")
+    if not categories and not channels:
+        raise ValueError("Template defines no categories or channels")
+    
+    parsed = {"categories": [], "channels": [parse_channel(spec) for spec in channels]}
+    for spec in categories:
+        if not isinstance(spec, dict) or not isinstance(spec.get("name"), str) or not spec["name"].strip():
+            raise ValueError("Every category needs a `name`")
+        parsed["categories"].append({
+            "name": spec["name"].strip(),
+            "overwrites": parse_overwrites(spec.get("overwrites", {})),
+            "channels": [parse_channel(channel) for channel in spec.get("channels", [])]
+        })
+    return parsed
+
+def parse_channel(spec) -> dict:
+    """Validate one channel definition"""
+    if not isinstance(spec, dict) or not isinstance(spec.get("name"), str) or not spec["name"].strip():
+        raise ValueError("Every channel needs a `name`")
+    
+    channel_type = spec.get("type", "text")
+    if channel_type not in CHANNEL_TYPES:
+        raise ValueError(f"Channel `{spec['name']}` has unknown type `{channel_type}` (use text or voice)")
+    
+    options = {key: spec[key] for key in CHANNEL_OPTIONS[channel_type] if key in spec}
+    unknown = set(spec) - {"name", "type", "overwrites"} - set(CHANNEL_OPTIONS[channel_type])
+    if unknown:
+        raise ValueError(f"Channel `{spec['name']}` has unknown field(s): {', '.join(sorted(unknown))}")
+    
+    return {
+        "name": spec["name"].strip(),
+        "type": channel_type,
+        "options": options,
+        "overwrites": parse_overwrites(spec.get("overwrites", {}))
+    }
+
+def parse_overwrites(spec) -> dict:
+    """Validate {target: {permission: true/false}}; targets are @everyone, role names or role IDs"""
+    if not isinstance(spec, dict):
+        raise ValueError("`overwrites` must map role names to permissions")
+    
+    for target, permissions in spec.items():
+        if not isinstance(permissions, dict):
+            raise ValueError(f"Overwrite for `{target}` must map permission names to true/false")
+        for name, value in permissions.items():
+            if name not in discord.Permissions.VALID_FLAGS:
+                raise ValueError(f"Unknown permission `{name}` in overwrite for `{target}`")
+            if value is not None and not isinstance(value, bool):
+                raise ValueError(f"Permission `{name}` for `{target}` must be true, false or null")
+    return spec
+
+def resolve_role(guild: discord.Guild, target: str) -> Optional[discord.Role]:
+    """Find an overwrite target by @everyone, ID, mention or exact name"""
+    if target == '@everyone':
+        return guild.default_role
+    
+    role_id = target.strip('<@&>')
+    if role_id.isdigit():
+        return guild.get_role(int(role_id))
+    return discord.utils.get(guild.roles, name=target)
+
+def build_overwrites(guild: discord.Guild, *specs: dict) -> dict:
+    """Merge overwrite specs in order (later ones win per permission) into PermissionOverwrite objects"""
+    overwrites = {}
+    for spec in specs:
+        for target, permissions in spec.items():
+            role = resolve_role(guild, target)
+            if role is None:
+                raise ValueError(f"Role `{target}` does not exist in this server")
+            overwrites.setdefault(role, discord.PermissionOverwrite()).update(**permissions)
+    return overwrites
+
+def channel_name(name: str, channel_type: str) -> str:
+    """The name Discord will store, so re-runs recognise channels they created"""
+    if channel_type == 'text':
+        return '-'.join(name.lower().split())
+    return name
+
+def find_existing(guild: discord.Guild, name: str, channel_type: str,
+                  category: Optional[discord.CategoryChannel] = None):
+    """An existing channel matching a template entry, or None"""
+    if channel_type == 'category':
+        return discord.utils.find(lambda c: c.name.lower() == name.lower(), guild.categories)
+    
+    expected = channel_name(name, channel_type).lower()
+    pool = guild.text_channels if channel_type == 'text' else guild.voice_channels
+    category_id = category.id if category else None
+    return discord.utils.find(lambda c: c.name.lower() == expected and c.category_id == category_id, pool)
+
+class TemplateApplier:
+    """Creates whatever a template describes that the guild is missing, categories first"""
+    
+    def __init__(self, guild: discord.Guild, template: dict, executor: RateLimitedExecutor, reason: str):
+        self.guild = guild
+        self.template = template
+        self.executor = executor
+        self.reason = reason
+        self.created = []
+        self.existing = 0
+        self.failures = []
+        self.skipped = 0
+    
+    def count_missing(self) -> int:
+        """How many creations apply() would make, ignoring failures"""
+        missing = 0
+        for spec in self.template["categories"]:
+            category = find_existing(self.guild, spec["name"], 'category')
+            if category is None:
+                missing += 1 + len(spec["channels"])
+            else:
+                missing += sum(
+                    find_existing(self.guild, channel["name"], channel["type"], category) is None
+                    for channel in spec["channels"]
+                )
+        missing += sum(
+            find_existing(self.guild, channel["name"], channel["type"]) is None for channel in self.template["channels"]
+        )
+        return missing
+    
+    def validate(self):
+        """Resolve every overwrite target up front so a bad role name fails before anything is created"""
+        for spec in self.template["categories"]:
+            build_overwrites(self.guild, spec["overwrites"])
+            for channel in spec["channels"]:
+                build_overwrites(self.guild, channel["overwrites"])
+        for channel in self.template["channels"]:
+            build_overwrites(self.guild, channel["overwrites"])
+    
+    async def apply(self, on_result: Optional[Callable] = None) -> dict:
+        """Create missing categories concurrently, then their channels and the uncategorised ones"""
+        self.validate()
+        
+        categories = {}
+        missing_categories = []
+        for spec in self.template["categories"]:
+            category = find_existing(self.guild, spec["name"], 'category')
+            if category is None:
+                missing_categories.append(spec)
+            else:
+                categories[spec["name"]] = category
+                self.existing += 1
+        
+        async def create_category(spec):
+            categories[spec["name"]] = await self.guild.create_category(
+                spec["name"], overwrites=build_overwrites(self.guild, spec["overwrites"]), reason=self.reason
+            )
+        
+        for spec, error in await self.executor.map(create_category, missing_categories, on_result):
+            if error:
+                self.failures.append((f"📁 {spec['name']}", error))
+                # Its channels have nowhere to go
+                self.skipped += len(spec["channels"])
+            else:
+                self.created.append(f"📁 {spec['name']}")
+        
+        # Channels only depend on their category, so they all go out together
+        pending = []
+        for spec in self.template["categories"]:
+            category = categories.get(spec["name"])
+            if category is None:
+                continue
+            for channel in spec["channels"]:
+                pending.append((channel, category, spec["overwrites"]))
+        for channel in self.template["channels"]:
+            pending.append((channel, None, {}))
+        
+        missing_channels = []
+        for channel, category, inherited in pending:
+            if find_existing(self.guild, channel["name"], channel["type"], category) is None:
+                missing_channels.append((channel, category, inherited))
+            else:
+                self.existing += 1
+        
+        async def create_channel(item):
+            spec, category, inherited = item
+            # Start from the category's overwrites, as a synced channel would
+            overwrites = build_overwrites(self.guild, inherited, spec["overwrites"])
+            create = self.guild.create_text_channel if spec["type"] == 'text' else self.guild.create_voice_channel
+            await create(spec["name"], category=category, overwrites=overwrites, reason=self.reason, **spec["options"])
+        
+        for (spec, category, _), error in await self.executor.map(create_channel, missing_channels, on_result):
+            icon = "#" if spec["type"] == 'text' else "🔊"
+            label = f"{icon} {spec['name']}" + (f" ({category.name})" if category else "")
+            if error:
+                self.failures.append((label, error))
+            else:
+                self.created.append(label)
+        
+        return {
+            "created": self.created,
+            "existing": self.existing,
+            "skipped": self.skipped,
+            "failures": self.failures
+        }
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, List
+import discord
+
+class DeletionAttributor:
+    """Works out who deleted messages from coalesced, cached audit-log reads and fills in deleted_by"""
+    
+    def __init__(self, db, window: float = 2.0, group_window: float = 300.0, max_pages: int = 3,
+                 retries: int = 1, entry_ttl: float = 900.0):
+        self.db = db
+        self.window = window
+        # Discord folds repeat deletions (same moderator, author and channel) into a recent entry's count
+        self.group_window = timedelta(seconds=group_window)
+        self.max_pages = max_pages
+        self.retries = retries
+        self.entry_ttl = entry_ttl
+        self.logger = logging.getLogger('security_bot')
+        
+        # guild_id -> deletions waiting for the next audit-log read
+        self.pending: Dict[int, List[dict]] = defaultdict(list)
+        # guild_id -> audit entry id -> entry, with how many of its deletions have been matched ("used")
+        self.entries: Dict[int, Dict[int, dict]] = defaultdict(dict)
+        self.tasks: Dict[int, asyncio.Task] = {}
+        self.fetches = 0
+        self.attributed = 0
+    
+    def track(self, message: discord.Message):
+        """Queue a deleted message for attribution"""
+        guild = message.guild
+        if not guild.me or not guild.me.guild_permissions.view_audit_log:
+            return
+        
+        self.pending[guild.id].append({
+            "message_id": message.id,
+            "channel_id": message.channel.id,
+            "author_id": message.author.id,
+            "deleted_at": discord.utils.utcnow(),
+            "attempts": 0
+        })
+        # One reader per guild; deletions that arrive meanwhile wait for its next read
+        if guild.id not in self.tasks:
+            self.tasks[guild.id] = asyncio.get_running_loop().create_task(
+                self._resolve_guild(guild), name=f'deletion-attribution-{guild.id}'
+            )
+    
+    async def stop(self):
+        """Cancel pending reads; unattributed rows keep deleted_by NULL"""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.pending.clear()
+    
+    async def _resolve_guild(self, guild: discord.Guild):
+        try:
+            while self.pending.get(guild.id):
+                # Waiting a window lets a burst share one read and gives Discord time to write the entries
+                await asyncio.sleep(self.window)
+                batch, self.pending[guild.id] = self.pending[guild.id], []
+                
+                try:
+                    await self.refresh(guild, min(deletion["deleted_at"] for deletion in batch))
+                except discord.HTTPException as e:
+                    self.logger.warning(f"Couldn't read the audit log for {guild.id}: {e}")
+                    continue
+                
+                resolved, retry = self.match(guild.id, batch)
+                self.pending[guild.id][:0] = retry
+                if resolved:
+                    await self.db.set_deleted_by(
+                        [(str(deleted_by), str(guild.id), str(message_id)) for message_id, deleted_by in resolved]
+                    )
+                    self.attributed += len(resolved)
+        except Exception as e:
+            self.logger.error(f"Deletion attribution failed for {guild.id}: {e}")
+        finally:
+            self.tasks.pop(guild.id, None)
+            if not self.pending.get(guild.id):
+                self.pending.pop(guild.id, None)
+    
+    async def refresh(self, guild: discord.Guild, oldest):
+        """Read recent message_delete entries into the guild's cache"""
+        self.fetches += 1
+        cache = self.entries[guild.id]
+        now = time.monotonic()
+        # Older entries can only matter if Discord is still adding to their count
+        cutoff = oldest - self.group_window
+        
+        async for entry in guild.audit_logs(limit=100 * self.max_pages, action=discord.AuditLogAction.message_delete):
+            if entry.created_at < cutoff:
+                break
+            channel = getattr(entry.extra, 'channel', None)
+            if entry.target is None or channel is None:
+                continue
+            count = getattr(entry.extra, 'count', 1) or 1
+            
+            cached = cache.get(entry.id)
+            if cached:
+                cached["count"] = count
+                cached["seen"] = now
+                continue
+            cache[entry.id] = {
+                "moderator_id": entry.user_id,
+                "target_id": entry.target.id,
+                "channel_id": channel.id,
+                "count": count,
+                # An entry first seen now but made before these deletions was for earlier ones
+                "used": count if entry.created_at < oldest - timedelta(seconds=self.window) else 0,
+                "seen": now
+            }
+        
+        # Keep the cache small: drop entries the audit log has stopped returning
+        for entry_id in [entry_id for entry_id, entry in cache.items() if now - entry["seen"] > self.entry_ttl]:
+            del cache[entry_id]
+    
+    def match(self, guild_id: int, batch: List[dict]):
+        """Assign deletions to cached entries by channel, author and unused count"""
+        available = defaultdict(list)
+        for entry in self.entries[guild_id].values():
+            if entry["used"] < entry["count"]:
+                available[(entry["channel_id"], entry["target_id"])].append(entry)
+        
+        resolved, retry = [], []
+        for deletion in sorted(batch, key=lambda deletion: deletion["deleted_at"]):
+            candidates = available.get((deletion["channel_id"], deletion["author_id"]))
+            entry = next((entry for entry in candidates or () if entry["used"] < entry["count"]), None)
+            if entry:
+                entry["used"] += 1
+                resolved.append((deletion["message_id"], entry["moderator_id"]))
+            elif deletion["attempts"] < self.retries:
+                # The entry may not have been written yet
+                deletion["attempts"] += 1
+                retry.append(deletion)
+            else:
+                # Authors deleting their own messages leave no audit-log entry
+                resolved.append((deletion["message_id"], deletion["author_id"]))
+        return resolved, retry
@@ -0,0 +1,112 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from datetime import datetime
+from typing import Iterable, List, Optional, Set
+
+class Subscription:
+    """One subscriber's bounded queue of events matching its filter"""
+    
+    def __init__(self, bus, guild_id: Optional[str], event_types: Optional[Set[str]], queue_size: int):
+        self.bus = bus
+        self.guild_id = guild_id
+        self.event_types = event_types
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.backlog: List[dict] = []
+        self.closed = False
+        # Why the stream ended: None while open, then 'overflow', 'closed' or 'shutdown'
+        self.close_reason: Optional[str] = None
+    
+    def matches(self, event: dict) -> bool:
+        if self.guild_id is not None and event["guild_id"] != self.guild_id:
+            return False
+        return self.event_types is None or event["type"] in self.event_types
+    
+    def offer(self, event: dict):
+        """Queue an event without waiting; a full queue means the consumer fell behind and is dropped"""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.bus.dropped += 1
+            self.close('overflow')
+    
+    def close(self, reason: str = 'closed'):
+        """Stop receiving events and wake the consumer"""
+        if self.closed:
+            return
+        self.closed = True
+        self.close_reason = reason
+        self.bus.unsubscribe(self)
+        # Make room for the end-of-stream marker
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+    
+    async def get(self, timeout: float = None) -> Optional[dict]:
+        """Next event (replayed backlog first); None once closed, raises TimeoutError if nothing arrives in time"""
+        if self.backlog:
+            return self.backlog.pop(0)
+        if self.closed and self.queue.empty():
+            return None
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+class EventBus:
+    """Fans out log events to in-process subscribers, keeping a short history for resuming"""
+    
+    def __init__(self, history_size: int = 1000, queue_size: int = 256):
+        self.queue_size = queue_size
+        self.history = deque(maxlen=history_size)
+        self.subscribers: Set[Subscription] = set()
+        # Event ids are "<epoch>-<seq>" so a client resuming across a restart isn't matched against new sequence numbers
+        self.epoch = str(int(time.time()))
+        self._sequence = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+    
+    def publish(self, event_type: str, guild_id: Optional[str], data: dict) -> dict:
+        """Record an event and hand it to every matching subscriber; never waits"""
+        event = {
+            "id": f"{self.epoch}-{next(self._sequence)}",
+            "type": event_type,
+            "guild_id": guild_id,
+            "timestamp": datetime.now().isoformat(),
+            "data": data
+        }
+        self.history.append(event)
+        self.published += 1
+        for subscription in list(self.subscribers):
+            if subscription.matches(event):
+                subscription.offer(event)
+        return event
+    
+    def subscribe(self, guild_id: Optional[str] = None, event_types: Iterable[str] = None,
+                  last_event_id: Optional[str] = None) -> Subscription:
+        """Start receiving events, first replaying what came after last_event_id if it is still in the history"""
+        subscription = Subscription(
+            self, guild_id, set(event_types) if event_types else None, self.queue_size
+        )
+        if last_event_id:
+            subscription.backlog = [event for event in self.events_after(last_event_id) if subscription.matches(event)]
+        self.subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+    
+    def events_after(self, last_event_id: str) -> List[dict]:
+        """History newer than last_event_id; all of it if the id is from another run or already evicted"""
+        epoch, _, sequence = last_event_id.partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return list(self.history)
+        
+        sequence = int(sequence)
+        oldest = int(self.history[0]["id"].partition('-')[2]) if self.history else sequence + 1
+        if sequence < oldest - 1:
+            return list(self.history)
+        return [event for event in self.history if int(event["id"].partition('-')[2]) > sequence]
+    
+    def close_all(self, reason: str = 'shutdown'):
+        """End every subscription, e.g. when the API stops"""
+        for subscription in list(self.subscribers):
+            subscription.close(reason)
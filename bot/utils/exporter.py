@@ -0,0 +1,166 @@
+import csv
+import io
+import json
+import os
+import time
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+import aiofiles
+import aiosqlite
+
+# export type -> (table, timestamp column, exported columns)
+EXPORT_TABLES = {
+    'commands': ('command_logs', 'executed_at', (
+        'id', 'guild_id', 'channel_id', 'user_id', 'command', 'args', 'success', 'error_message', 'executed_at'
+    )),
+    'deleted': ('deleted_messages', 'deleted_at', (
+        'id', 'message_id', 'guild_id', 'channel_id', 'author_id', 'content', 'attachments', 'deleted_at',
+        'deleted_by'
+    )),
+}
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+class ExportCancelled(Exception):
+    """Raised inside an export when it is cancelled"""
+
+class LogExport:
+    """Streams one guild's log rows for a date range to a (optionally gzipped) NDJSON or CSV file"""
+    
+    def __init__(self, db_path: str, export_dir: str, guild_id: str, export_type: str, fmt: str = 'ndjson',
+                 start: Optional[datetime] = None, end: Optional[datetime] = None, compress: bool = True,
+                 chunk_size: int = 1000):
+        if export_type not in EXPORT_TABLES:
+            raise ValueError(f"Export type must be one of: {', '.join(EXPORT_TABLES)}")
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format must be one of: {', '.join(EXPORT_FORMATS)}")
+        if start and end and end < start:
+            raise ValueError("The end date is before the start date")
+        
+        self.db_path = db_path
+        self.guild_id = guild_id
+        self.export_type = export_type
+        self.fmt = fmt
+        self.start = start
+        self.end = end
+        self.compress = compress
+        self.chunk_size = chunk_size
+        
+        span = f"{start:%Y%m%d}-{end:%Y%m%d}" if start and end else (
+            f"from{start:%Y%m%d}" if start else (f"to{end:%Y%m%d}" if end else "all")
+        )
+        filename = f"{guild_id}_{export_type}_{span}_{datetime.now():%Y%m%d%H%M%S}.{fmt}"
+        self.path = os.path.join(export_dir, filename + ('.gz' if compress else ''))
+        os.makedirs(export_dir, exist_ok=True)
+        
+        self.status = 'pending'  # pending, running, completed, cancelled, failed
+        self.error: Optional[str] = None
+        self.total = 0
+        self.rows = 0
+        self.bytes_written = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._cancelled = False
+    
+    def cancel(self):
+        """Stop after the current chunk; the partial file is removed"""
+        self._cancelled = True
+    
+    @property
+    def elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+    
+    def query(self):
+        """SQL and parameters selecting this export's rows in id order"""
+        table, column, columns = EXPORT_TABLES[self.export_type]
+        where = ['guild_id = ?']
+        params = [self.guild_id]
+        if self.start:
+            where.append(f'{column} >= ?')
+            params.append(self.start.strftime('%Y-%m-%d'))
+        if self.end:
+            # The end date is inclusive
+            where.append(f'{column} < ?')
+            params.append((self.end + timedelta(days=1)).strftime('%Y-%m-%d'))
+        return table, columns, ' AND '.join(where), params
+    
+    async def run(self):
+        """Write the export; a cancelled or failed export leaves no file behind"""
+        self.status = 'running'
+        self.started_at = time.monotonic()
+        partial = self.path + '.part'
+        table, columns, where, params = self.query()
+        
+        try:
+            uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+            async with aiosqlite.connect(uri, uri=True) as db:
+                # One read transaction, so the count and the rows come from the same snapshot
+                await db.execute('BEGIN')
+                async with db.execute(f'SELECT COUNT(*) FROM {table} WHERE {where}', params) as cursor:
+                    self.total = (await cursor.fetchone())[0]
+                
+                # gzip framing (wbits 31) so the output opens with any gunzip
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if self.compress else None
+                async with aiofiles.open(partial, 'wb') as f:
+                    async def write(data: bytes):
+                        if compressor:
+                            data = compressor.compress(data)
+                        if data:
+                            await f.write(data)
+                            self.bytes_written += len(data)
+                    
+                    if self.fmt == 'csv':
+                        await write(self.encode_csv([columns]))
+                    
+                    # One statement read in chunks, so only chunk_size rows are ever held in memory
+                    async with db.execute(
+                        f'SELECT {", ".join(columns)} FROM {table} WHERE {where} ORDER BY id', params
+                    ) as cursor:
+                        while True:
+                            if self._cancelled:
+                                raise ExportCancelled()
+                            rows = await cursor.fetchmany(self.chunk_size)
+                            if not rows:
+                                break
+                            await write(self.encode(columns, rows))
+                            self.rows += len(rows)
+                    
+                    if compressor:
+                        tail = compressor.flush()
+                        await f.write(tail)
+                        self.bytes_written += len(tail)
+            
+            os.replace(partial, self.path)
+            self.status = 'completed'
+        except ExportCancelled:
+            self.status = 'cancelled'
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+        finally:
+            self.finished_at = time.monotonic()
+            if self.status != 'completed' and os.path.exists(partial):
+                os.remove(partial)
+    
+    def encode(self, columns, rows) -> bytes:
+        if self.fmt == 'csv':
+            return self.encode_csv(rows)
+        return ''.join(
+            json.dumps(dict(zip(columns, row)), ensure_ascii=False, separators=(',', ':')) + '\n' for row in rows
+        ).encode()
+    
+    @staticmethod
+    def encode_csv(rows) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+    
+    def progress_text(self) -> str:
+        """One-line status for progress messages"""
+        percent = f" ({self.rows / self.total:.0%})" if self.total else ""
+        rate = self.rows / self.elapsed if self.elapsed else 0
+        return (f"{self.rows:,}/{self.total:,} rows{percent} • {self.bytes_written / 1024 / 1024:,.1f} MiB "
+                f"• {rate:,.0f} rows/s • {self.elapsed:.0f}s")
@@ -1,25 +1,36 @@
 import os
+import time
+import uuid
 import aiofiles
 from datetime import datetime
 import json
 
+# Bytes read per backwards seek when paging through a log file
+PAGE_READ_BLOCK = 8192
+# Hard cap on bytes read for one page, so a huge single line can't stall the viewer
+PAGE_MAX_BYTES = 65536
+
 class FileLogger:
-    def __init__(self, base_dir='./data/logs'):
+    def __init__(self, base_dir='./data/logs', session_ttl: float = 600):
         self.base_dir = base_dir
+        self.session_ttl = session_ttl
+        # session_id -> paging cursor over one day's log file
+        self.sessions = {}
         self.ensure_directories()
     
     def ensure_directories(self):
         """Ensure log directories exist"""
         os.makedirs(self.base_dir, exist_ok=True)
     
-    def get_log_path(self, log_type: str, date: datetime = None):
+    def get_log_path(self, log_type: str, date: datetime = None, create: bool = True):
         """Get log file path for specific type and date"""
         if date is None:
             date = datetime.now()
         
         date_str = date.strftime('%Y-%m-%d')
         log_dir = os.path.join(self.base_dir, date_str, log_type)
-        os.makedirs(log_dir, exist_ok=True)
+        if create:
+            os.makedirs(log_dir, exist_ok=True)
         
         return os.path.join(log_dir, f'{log_type}.log')
     
@@ -43,9 +54,28 @@ class FileLogger:
             timestamp = datetime.now()
         
         data['timestamp'] = timestamp.isoformat()
-        log_message = json.dumps(data, ensure_ascii=False)
+        log_message = self.format_json(data)
         await self.write_log(log_type, log_message, timestamp)
     
+    @staticmethod
+    def format_json(data: dict) -> str:
+        """Serialize a JSON log entry the way write_json_log does"""
+        return json.dumps(data, ensure_ascii=False)
+    
+    async def write_log_batch(self, log_type: str, entries: list):
+        """Append several (message, timestamp) entries with one write per log file"""
+        by_path = {}
+        for message, timestamp in entries:
+            log_path = self.get_log_path(log_type, timestamp)
+            by_path.setdefault(log_path, []).append(f"[{timestamp.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+        
+        for log_path, lines in by_path.items():
+            try:
+                async with aiofiles.open(log_path, 'a', encoding='utf-8') as f:
+                    await f.write("".join(lines))
+            except Exception as e:
+                print(f"Error writing to log file {log_path}: {e}")
+    
     async def read_logs(self, log_type: str, date: datetime = None, limit: int = 100):
         """Read log entries from file"""
         log_path = self.get_log_path(log_type, date)
@@ -96,3 +126,125 @@ class FileLogger:
                 log_types.append(item)
         
         return sorted(log_types)
+    
+    def open_session(self, log_type: str, date: datetime = None) -> str:
+        """Start paging through a day's log, newest entries first"""
+        self.expire_sessions()
+        
+        log_path = self.get_log_path(log_type, date, create=False)
+        size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = {
+            "path": log_path,
+            "log_type": log_type,
+            "date": (date or datetime.now()).strftime('%Y-%m-%d'),
+            "size": size,
+            # page_ends[n] is the byte offset page n ends at; page 0 ends where the file did on open
+            "page_ends": [size],
+            "last_used": time.monotonic()
+        }
+        return session_id
+    
+    def get_session(self, session_id: str):
+        """Get a paging session, or None if it expired"""
+        self.expire_sessions()
+        session = self.sessions.get(session_id)
+        if session:
+            session["last_used"] = time.monotonic()
+        return session
+    
+    def close_session(self, session_id: str):
+        """Forget a paging session"""
+        self.sessions.pop(session_id, None)
+    
+    def expire_sessions(self):
+        """Drop sessions that have been idle longer than the TTL"""
+        cutoff = time.monotonic() - self.session_ttl
+        for session_id in [sid for sid, session in self.sessions.items() if session["last_used"] < cutoff]:
+            del self.sessions[session_id]
+    
+    async def read_page(self, session_id: str, page: int, max_lines: int = 15, max_chars: int = 3800):
+        """Read one page of a session, seeking to remembered offsets instead of re-reading the file"""
+        session = self.get_session(session_id)
+        if session is None:
+            return None
+        
+        page_ends = session["page_ends"]
+        if session["size"] == 0:
+            return {"date": session["date"], "page": 0, "lines": [], "start": 0, "end": 0, "size": 0, "has_older": False}
+        
+        try:
+            async with aiofiles.open(session["path"], 'rb') as f:
+                # Walk forward from the furthest page we know the end of
+                known = min(page, len(page_ends) - 1)
+                while True:
+                    lines, start = await self._read_lines_before(f, page_ends[known], max_lines, max_chars)
+                    if known == len(page_ends) - 1 and start > 0:
+                        page_ends.append(start)
+                    if known == page or start == 0:
+                        break
+                    known += 1
+        except OSError as e:
+            print(f"Error reading log file {session['path']}: {e}")
+            return None
+        
+        return {
+            "date": session["date"],
+            "page": known,
+            "lines": lines,
+            "start": start,
+            "end": page_ends[known],
+            "size": session["size"],
+            "has_older": start > 0
+        }
+    
+    async def read_lines_at(self, log_type: str, date: datetime, end: int = None, max_lines: int = 50,
+                            max_chars: int = 65536):
+        """Read lines ending at byte offset end (default: end of file) without a session"""
+        log_path = self.get_log_path(log_type, date, create=False)
+        if not os.path.exists(log_path):
+            return None
+        
+        size = os.path.getsize(log_path)
+        end = size if end is None else min(end, size)
+        if end == 0:
+            return {"lines": [], "start": 0, "end": 0, "size": size}
+        
+        try:
+            async with aiofiles.open(log_path, 'rb') as f:
+                lines, start = await self._read_lines_before(f, end, max_lines, max_chars)
+        except OSError as e:
+            print(f"Error reading log file {log_path}: {e}")
+            return None
+        
+        return {"lines": lines, "start": start, "end": end, "size": size}
+    
+    async def _read_lines_before(self, f, end: int, max_lines: int, max_chars: int):
+        """Read up to max_lines whole lines ending at byte offset end; returns (lines, start offset)"""
+        pos = end
+        buffer = b''
+        while pos > 0 and buffer.count(b'\n') <= max_lines and len(buffer) < PAGE_MAX_BYTES:
+            size = min(PAGE_READ_BLOCK, pos)
+            pos -= size
+            await f.seek(pos)
+            buffer = await f.read(size) + buffer
+        
+        trailing = 1 if buffer.endswith(b'\n') else 0
+        parts = buffer[:len(buffer) - trailing].split(b'\n')
+        if pos > 0 and len(parts) > 1:
+            # The first part is the tail of a line that belongs to the next page
+            parts = parts[1:]
+        
+        lines = []
+        used_bytes = trailing
+        used_chars = 0
+        for part in reversed(parts):
+            text = part.decode('utf-8', errors='replace')
+            if lines and (len(lines) >= max_lines or used_chars + len(text) > max_chars):
+                break
+            lines.append(text)
+            used_chars += len(text)
+            used_bytes += len(part) + (1 if len(lines) > 1 else 0)
+        
+        lines.reverse()
+        return lines, max(0, end - used_bytes)
@@ -0,0 +1,196 @@
+import json
+from typing import Dict, Optional
+import discord
+
+def parse_prefix(guild: discord.Guild, value: str) -> str:
+    """Validate a command prefix"""
+    value = value.strip()
+    if not value or len(value) > 5 or any(char.isspace() for char in value):
+        raise ValueError("Prefix must be 1-5 characters with no spaces")
+    return value
+
+def parse_text_channel(guild: discord.Guild, value: str) -> str:
+    """Resolve a text channel mention or ID to its ID"""
+    channel_id = value.strip().strip('<#>')
+    channel = guild.get_channel(int(channel_id)) if channel_id.isdigit() else None
+    if not isinstance(channel, discord.TextChannel):
+        raise ValueError("Give a text channel mention or ID from this server")
+    return str(channel.id)
+
+def show_channel(value) -> str:
+    """Format a stored channel ID"""
+    return f"<#{value}>" if value else "Not set"
+
+def parse_toggle(guild: discord.Guild, value: str) -> str:
+    """Accept on/off style switches"""
+    value = value.strip().lower()
+    if value in ('on', 'true', 'yes', 'enable', 'enabled'):
+        return 'on'
+    if value in ('off', 'false', 'no', 'disable', 'disabled'):
+        return 'off'
+    raise ValueError("Use on or off")
+
+def is_on(value) -> bool:
+    """Whether a stored switch (or a boolean default from Config) is on"""
+    return value is True or value == 'on'
+
+def show_toggle(value) -> str:
+    return "On" if is_on(value) else "Off"
+
+def parse_limit(guild: discord.Guild, value: str) -> str:
+    """Validate a per-window limit"""
+    value = value.strip()
+    if not value.isdigit() or not 1 <= int(value) <= 10000:
+        raise ValueError("Limit must be a whole number from 1 to 10000")
+    return str(int(value))
+
+# Log event types that can be routed to their own channel with log_channel:<type>
+LOG_EVENT_TYPES = ('commands', 'deleted', 'automod')
+
+# key -> (description, Config attribute holding the global default or None, parser, formatter)
+SETTINGS = {
+    'prefix': ("Command prefix", 'BOT_PREFIX', parse_prefix, lambda value: f"`{value}`"),
+    'log_channel': ("Channel that receives log embeds", 'LOG_CHANNEL_ID', parse_text_channel, show_channel),
+}
+for event_type in LOG_EVENT_TYPES:
+    SETTINGS[f'log_channel:{event_type}'] = (
+        f"Channel for {event_type} logs (overrides log_channel)", None, parse_text_channel, show_channel
+    )
+SETTINGS['antispam'] = ("Anti-spam on or off", 'ANTISPAM_ENABLED', parse_toggle, show_toggle)
+for name, attribute, description in (
+    ('messages', 'ANTISPAM_MAX_MESSAGES', "messages per member"),
+    ('mentions', 'ANTISPAM_MAX_MENTIONS', "mentions per member"),
+    ('links', 'ANTISPAM_MAX_LINKS', "links per member"),
+    ('duplicates', 'ANTISPAM_MAX_DUPLICATES', "repeated messages per member"),
+    ('channel_messages', 'ANTISPAM_MAX_CHANNEL_MESSAGES', "messages per channel"),
+    ('guild_messages', 'ANTISPAM_MAX_GUILD_MESSAGES', "messages across the server"),
+):
+    SETTINGS[f'antispam:{name}'] = (
+        f"Anti-spam limit: {description} per window", attribute, parse_limit, str
+    )
+
+SETTINGS['antinuke'] = ("Anti-nuke on or off", 'ANTINUKE_ENABLED', parse_toggle, show_toggle)
+for name, attribute, description in (
+    ('channel_delete', 'ANTINUKE_MAX_CHANNEL_DELETES', "channels deleted"),
+    ('role_delete', 'ANTINUKE_MAX_ROLE_DELETES', "roles deleted"),
+    ('ban', 'ANTINUKE_MAX_BANS', "members banned"),
+    ('kick', 'ANTINUKE_MAX_KICKS', "members kicked"),
+    ('webhook_create', 'ANTINUKE_MAX_WEBHOOK_CREATES', "webhooks created"),
+):
+    SETTINGS[f'antinuke:{name}'] = (
+        f"Anti-nuke limit: {description} per member per window", attribute, parse_limit, str
+    )
+
+SETTINGS['automod'] = ("Blocked word and domain filter on or off", 'AUTOMOD_ENABLED', parse_toggle, show_toggle)
+
+# Lists kept in the config table as JSON arrays and edited with their own commands rather than config set
+LIST_SETTINGS = {
+    'automod:words': "Blocked words and phrases",
+    'automod:domains': "Blocked link domains",
+    'automod:regex': "Custom regex rules",
+}
+
+class GuildConfigService:
+    """Per-guild settings from the config table, served from memory and written through to SQLite"""
+    
+    def __init__(self, db, defaults):
+        self.db = db
+        self.defaults = defaults
+        # guild_id -> {key: value}; only keys that override a default are present
+        self.cache: Dict[str, Dict[str, str]] = {}
+        # Bumped on every change, so callers can cache values derived from settings
+        self.version = 0
+    
+    async def load(self):
+        """Read every guild's settings in one query"""
+        cache = {}
+        for guild_id, key, value in await self.db.get_configs_for_keys([*SETTINGS, *LIST_SETTINGS]):
+            cache.setdefault(guild_id, {})[key] = value
+        self.cache = cache
+        self.version += 1
+    
+    async def reload(self, guild_id: Optional[int] = None):
+        """Re-read settings from the database, e.g. after it was edited outside the bot"""
+        if guild_id is None:
+            await self.load()
+            return
+        
+        rows = await self.db.get_configs_for_keys([*SETTINGS, *LIST_SETTINGS], str(guild_id))
+        self.cache[str(guild_id)] = {key: value for _, key, value in rows}
+        self.version += 1
+    
+    def default(self, key: str):
+        """The global value from Config"""
+        attribute = SETTINGS[key][1]
+        return getattr(self.defaults, attribute) if attribute else None
+    
+    def get(self, guild_id: Optional[int], key: str):
+        """A guild's value for key, falling back to the global default"""
+        if guild_id is not None:
+            value = self.cache.get(str(guild_id), {}).get(key)
+            if value is not None:
+                return value
+        return self.default(key)
+    
+    def is_overridden(self, guild_id: int, key: str) -> bool:
+        """Whether a guild has its own value for key"""
+        return key in self.cache.get(str(guild_id), {})
+    
+    def get_raw(self, guild_id: int, key: str) -> Optional[str]:
+        """A guild's stored value for key as it is in the database, or None"""
+        return self.cache.get(str(guild_id), {}).get(key)
+    
+    def get_list(self, guild_id: int, key: str) -> list:
+        """A guild's entries for a list setting"""
+        raw = self.get_raw(guild_id, key)
+        return json.loads(raw) if raw else []
+    
+    async def set_list(self, guild: discord.Guild, key: str, items: list):
+        """Store a guild's entries for a list setting; an empty list removes the row"""
+        if key not in LIST_SETTINGS:
+            raise ValueError(f"Unknown list `{key}`. Available: {', '.join(LIST_SETTINGS)}")
+        
+        if items:
+            value = json.dumps(items)
+            await self.db.set_config(str(guild.id), key, value)
+            self.cache.setdefault(str(guild.id), {})[key] = value
+        else:
+            await self.db.delete_config(str(guild.id), key)
+            self.cache.get(str(guild.id), {}).pop(key, None)
+        self.version += 1
+    
+    def get_log_channel_id(self, guild_id: Optional[int], event_type: str):
+        """Where a guild's logs of one type go: its per-type channel, its log channel, then the global one"""
+        if guild_id is not None:
+            routed = self.cache.get(str(guild_id), {}).get(f'log_channel:{event_type}')
+            if routed:
+                return routed
+        return self.get(guild_id, 'log_channel')
+    
+    def get_prefix(self, guild: Optional[discord.Guild]) -> str:
+        """Command prefix for a guild (or DMs)"""
+        return self.get(guild.id if guild else None, 'prefix')
+    
+    def describe(self, key: str, value) -> str:
+        """Human-readable value for embeds"""
+        return SETTINGS[key][3](value)
+    
+    async def set(self, guild: discord.Guild, key: str, raw_value: str) -> str:
+        """Validate, store and cache a value; raises ValueError for bad input"""
+        if key not in SETTINGS:
+            raise ValueError(f"Unknown setting `{key}`. Available: {', '.join(SETTINGS)}")
+        
+        value = SETTINGS[key][2](guild, raw_value)
+        await self.db.set_config(str(guild.id), key, value)
+        self.cache.setdefault(str(guild.id), {})[key] = value
+        self.version += 1
+        return value
+    
+    async def reset(self, guild: discord.Guild, key: str) -> bool:
+        """Drop a guild's override so the default applies again"""
+        if key not in SETTINGS:
+            raise ValueError(f"Unknown setting `{key}`. Available: {', '.join(SETTINGS)}")
+        
+        self.cache.get(str(guild.id), {}).pop(key, None)
+        self.version += 1
+        return await self.db.delete_config(str(guild.id), key)
@@ -0,0 +1,133 @@
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Look-alike characters folded onto the letter they imitate (Cyrillic/Greek homoglyphs and common leetspeak)
+CONFUSABLES = {
+    'а': 'a', 'в': 'b', 'е': 'e', 'ё': 'e', 'к': 'k', 'м': 'm', 'н': 'h', 'о': 'o', 'р': 'p', 'с': 'c',
+    'т': 't', 'у': 'y', 'х': 'x', 'і': 'i', 'ј': 'j', 'ѕ': 's', 'ԁ': 'd', 'ӏ': 'l',
+    'α': 'a', 'β': 'b', 'ε': 'e', 'ι': 'i', 'κ': 'k', 'ν': 'v', 'ο': 'o', 'ρ': 'p', 'τ': 't', 'υ': 'u',
+    'χ': 'x', 'ς': 's',
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '@': 'a', '$': 's',
+}
+# Invisible characters dropped before matching, so they can't be used to split a word
+INVISIBLE = '­͏؜ᅟᅠ឴឵᠎​‌‍‎‏⁠⁡⁢⁣⁤﻿'
+TRANSLATION = str.maketrans({**CONFUSABLES, **{char: None for char in INVISIBLE}})
+
+# Characters that can be part of a host name; a domain match must not run into one of these
+HOST_CHARS = frozenset('abcdefghijklmnopqrstuvwxyz0123456789-.')
+
+def normalize(text: str) -> str:
+    """Fold case, accents, look-alikes and invisible characters; one pass per step, so linear in length"""
+    text = unicodedata.normalize('NFKD', text.casefold())
+    if not text.isascii():
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+    return text.translate(TRANSLATION)
+
+class FilterMatch(NamedTuple):
+    term: str  # the term as it was added
+    kind: str  # word or domain
+    start: int  # offsets into the normalized text
+    end: int
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over a guild's blocked words, phrases and domains"""
+    
+    def __init__(self, words: Iterable[str] = (), domains: Iterable[str] = ()):
+        # Per state: transitions, failure link and the patterns ending there (including via failure links)
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[Tuple[Tuple[str, str, int, bool, bool], ...]] = [()]
+        self.size = 0
+        
+        for word in words:
+            pattern = normalize(word.strip())
+            # A * at either end lets the term match inside a longer word on that side
+            left = not pattern.startswith('*')
+            right = not pattern.endswith('*')
+            pattern = pattern.strip('*').strip()
+            if pattern:
+                self._add(pattern, (word, 'word', len(pattern), left, right))
+        for domain in domains:
+            pattern = normalize(domain.strip())
+            if pattern:
+                self._add(pattern, (domain, 'domain', len(pattern), True, True))
+        self._build()
+    
+    def _add(self, pattern: str, info: tuple):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(())
+            state = next_state
+        self.output[state] += (info,)
+        self.size += 1
+    
+    def _build(self):
+        """Breadth-first failure links; each state's output also gets its failure state's output"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] += self.output[self.fail[next_state]]
+    
+    def search(self, text: str, first_only: bool = True) -> List[FilterMatch]:
+        """Blocked terms in a message, in one pass over its normalized text"""
+        if not self.size:
+            return []
+        text = normalize(text)
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                for term, kind, length, left, right in output[state]:
+                    start = index - length + 1
+                    if self._bounded(text, kind, start, index + 1, left, right):
+                        matches.append(FilterMatch(term, kind, start, index + 1))
+                        if first_only:
+                            return matches
+        return matches
+    
+    @staticmethod
+    def _bounded(text: str, kind: str, start: int, end: int, left: bool, right: bool) -> bool:
+        """Whether a hit stands on its own rather than being part of a longer word or host name"""
+        before = text[start - 1] if start > 0 else ''
+        after = text[end] if end < len(text) else ''
+        if kind == 'domain':
+            # Subdomains ("cdn.evil.com") still match; "notevil.com" and "evil.com.au" don't
+            return (not before or before == '.' or before not in HOST_CHARS) and \
+                   (not after or after not in HOST_CHARS or (after == '.' and not text[end + 1:end + 2].isalnum()))
+        return (not left or not before.isalnum()) and (not right or not after.isalnum())
+
+class KeywordFilterCache:
+    """Compiled matchers per guild, rebuilt only when that guild's stored lists change"""
+    
+    def __init__(self):
+        # guild_id -> (raw words value, raw domains value, matcher)
+        self.matchers: Dict[int, Tuple[Optional[str], Optional[str], KeywordMatcher]] = {}
+        self.builds = 0
+    
+    def get(self, guild_id: int, raw_words: Optional[str], raw_domains: Optional[str],
+            words: List[str], domains: List[str]) -> KeywordMatcher:
+        cached = self.matchers.get(guild_id)
+        if cached is not None and cached[0] == raw_words and cached[1] == raw_domains:
+            return cached[2]
+        matcher = KeywordMatcher(words, domains)
+        self.matchers[guild_id] = (raw_words, raw_domains, matcher)
+        self.builds += 1
+        return matcher
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+import aiohttp
+import discord
+
+# Webhook credentials are remembered per channel in the config table so restarts reuse them
+WEBHOOK_KEY_PREFIX = 'log_webhook:'
+
+class LogRouter:
+    """Delivers log embeds to each guild's log channels through bot-owned webhooks"""
+    
+    def __init__(self, bot, webhooks_enabled: bool = True, pool_size: int = 20, retry_after: float = 300.0):
+        self.bot = bot
+        self.webhooks_enabled = webhooks_enabled
+        self.pool_size = pool_size
+        self.retry_after = retry_after
+        self.logger = logging.getLogger('security_bot')
+        self.session: Optional[aiohttp.ClientSession] = None
+        # channel_id -> Webhook bound to the shared session
+        self.webhooks: Dict[int, discord.Webhook] = {}
+        # channel_id -> monotonic time until which we send as the bot instead of retrying webhook setup
+        self.webhook_unavailable: Dict[int, float] = {}
+        # One setup at a time per channel, so a burst of logs creates one webhook
+        self._setup_locks: Dict[int, asyncio.Lock] = {}
+        self.stats = {"webhook": 0, "channel": 0, "failed": 0, "webhooks_created": 0}
+    
+    async def start(self):
+        """Open the pooled HTTP session shared by every webhook"""
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector)
+    
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+    
+    async def send(self, guild: Optional[discord.Guild], event_type: str, embed: discord.Embed):
+        """Send an embed to wherever the guild routes event_type"""
+        channel_id = self.bot.guild_config.get_log_channel_id(guild.id if guild else None, event_type)
+        if not channel_id:
+            return
+        
+        channel = self.bot.get_channel(int(channel_id))
+        if not isinstance(channel, discord.TextChannel):
+            return
+        
+        webhook = await self.get_webhook(channel)
+        if webhook is not None:
+            try:
+                await webhook.send(
+                    embed=embed,
+                    username=self.bot.user.display_name if self.bot.user else None,
+                    avatar_url=self.bot.user.display_avatar.url if self.bot.user else None
+                )
+                self.stats["webhook"] += 1
+                return
+            except discord.NotFound:
+                # Someone deleted the webhook; make a new one next time
+                await self.forget_webhook(channel.id)
+            except discord.HTTPException as e:
+                self.logger.error(f"Log webhook for #{channel.name} failed: {e}")
+        
+        try:
+            await channel.send(embed=embed)
+            self.stats["channel"] += 1
+        except discord.HTTPException as e:
+            self.stats["failed"] += 1
+            self.logger.error(f"Failed to send log to channel: {e}")
+    
+    async def get_webhook(self, channel: discord.TextChannel) -> Optional[discord.Webhook]:
+        """The cached webhook for a channel, loading or creating it on first use"""
+        if not self.webhooks_enabled or self.session is None:
+            return None
+        
+        webhook = self.webhooks.get(channel.id)
+        if webhook is not None:
+            return webhook
+        
+        async with self._setup_locks.setdefault(channel.id, asyncio.Lock()):
+            webhook = self.webhooks.get(channel.id)
+            if webhook is not None or self.webhook_unavailable.get(channel.id, 0) > time.monotonic():
+                return webhook
+            
+            stored = await self.bot.db.get_config(str(channel.guild.id), f"{WEBHOOK_KEY_PREFIX}{channel.id}")
+            if stored:
+                webhook_id, _, token = stored.partition(':')
+                webhook = discord.Webhook.partial(int(webhook_id), token, session=self.session)
+            else:
+                webhook = await self.create_webhook(channel)
+            
+            if webhook is not None:
+                self.webhooks[channel.id] = webhook
+            return webhook
+    
+    async def create_webhook(self, channel: discord.TextChannel) -> Optional[discord.Webhook]:
+        """Reuse a webhook this bot already owns in the channel, or create one"""
+        if not channel.permissions_for(channel.guild.me).manage_webhooks:
+            self.webhook_unavailable[channel.id] = time.monotonic() + self.retry_after
+            return None
+        
+        name = self.bot.config.LOG_WEBHOOK_NAME
+        try:
+            owned = [
+                hook for hook in await channel.webhooks()
+                if hook.token and hook.user and hook.user.id == self.bot.user.id and hook.name == name
+            ]
+            created = owned[0] if owned else await channel.create_webhook(name=name, reason="Log delivery")
+        except discord.HTTPException as e:
+            self.logger.error(f"Could not set up a log webhook in #{channel.name}: {e}")
+            self.webhook_unavailable[channel.id] = time.monotonic() + self.retry_after
+            return None
+        
+        if not owned:
+            self.stats["webhooks_created"] += 1
+        await self.bot.db.set_config(
+            str(channel.guild.id), f"{WEBHOOK_KEY_PREFIX}{channel.id}", f"{created.id}:{created.token}"
+        )
+        return discord.Webhook.partial(created.id, created.token, session=self.session)
+    
+    async def forget_webhook(self, channel_id: int):
+        """Drop a webhook that no longer works"""
+        self.webhooks.pop(channel_id, None)
+        channel = self.bot.get_channel(channel_id)
+        if channel is not None:
+            await self.bot.db.delete_config(str(channel.guild.id), f"{WEBHOOK_KEY_PREFIX}{channel_id}")
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import time
+from collections import defaultdict
+from datetime import datetime
+from database import Database
+from utils.file_utils import FileLogger
+
+# Records pulled from the queue per SQLite transaction / file append
+BATCH_SIZE = 200
+
+class LogWriterProcess:
+    """Hands log persistence (SQLite inserts and log files) to a separate writer process"""
+    
+    def __init__(self, db_path: str, log_dir: str, max_queue: int = 10000,
+                 put_timeout: float = 5.0, heartbeat_timeout: float = 10.0, check_interval: float = 2.0):
+        self.db_path = db_path
+        self.log_dir = log_dir
+        self.max_queue = max_queue
+        self.put_timeout = put_timeout
+        self.heartbeat_timeout = heartbeat_timeout
+        self.check_interval = check_interval
+        
+        self.logger = logging.getLogger('security_bot')
+        self._context = multiprocessing.get_context('spawn')
+        self._queue = None
+        self._process = None
+        self._monitor_task = None
+        self._heartbeat = self._context.Value('d', 0.0)
+        self._processed = self._context.Value('q', 0)
+        self._failed = self._context.Value('q', 0)
+        
+        self.submitted = 0
+        self.dropped = 0
+        self.restarts = 0
+        self.lost = 0
+        self.backpressure_waits = 0
+    
+    def start(self):
+        """Spawn the writer process and start the health check"""
+        self._spawn()
+        self._monitor_task = asyncio.get_running_loop().create_task(self._monitor(), name='log-writer-monitor')
+    
+    def _spawn(self):
+        """Start a writer process on a fresh queue"""
+        self._queue = self._context.Queue(self.max_queue)
+        self._heartbeat.value = time.time()
+        self._process = self._context.Process(
+            target=writer_main,
+            args=(self._queue, self._heartbeat, self._processed, self._failed, self.db_path, self.log_dir),
+            name='log-writer',
+            daemon=True
+        )
+        self._process.start()
+    
+    async def submit(self, kind: str, payload: dict):
+        """Queue one record, waiting while the writer is behind"""
+        if self._process is None:
+            # Not started, or already stopped and the queue closed
+            self.dropped += 1
+            return
+        
+        record = (kind, payload)
+        try:
+            self._queue.put_nowait(record)
+            self.submitted += 1
+            return
+        except queue.Full:
+            self.backpressure_waits += 1
+        
+        deadline = time.monotonic() + self.put_timeout
+        delay = 0.005
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+            try:
+                self._queue.put_nowait(record)
+                self.submitted += 1
+                return
+            except queue.Full:
+                continue
+        
+        self.dropped += 1
+        self.logger.error(f"Log writer queue full for {self.put_timeout}s, dropped {kind} record")
+    
+    async def _monitor(self):
+        """Restart the writer when it exits or stops sending heartbeats"""
+        while True:
+            await asyncio.sleep(self.check_interval)
+            if not self.is_healthy():
+                reason = "exited" if not self._process.is_alive() else "stopped responding"
+                self.logger.error(f"Log writer process {reason}, restarting")
+                self.restart()
+    
+    def is_healthy(self) -> bool:
+        """The writer is running and has checked in recently"""
+        if self._process is None or not self._process.is_alive():
+            return False
+        return time.time() - self._heartbeat.value < self.heartbeat_timeout
+    
+    def restart(self):
+        """Replace the writer process, carrying over whatever is still queued"""
+        old_queue = self._queue
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process.join(timeout=5)
+        
+        # A killed writer may leave the old queue's lock held, so records move to a new one
+        self._spawn()
+        self.restarts += 1
+        moved = 0
+        while True:
+            try:
+                self._queue.put_nowait(old_queue.get_nowait())
+                moved += 1
+            except (queue.Empty, queue.Full, OSError, EOFError):
+                break
+        old_queue.close()
+        
+        # Whatever the old writer had taken off the queue but not written is gone
+        self.lost = self.submitted - self._processed.value - self._failed.value - moved
+        if moved:
+            self.logger.info(f"Moved {moved} queued log records to the new writer")
+    
+    async def flush(self, timeout: float = 30.0) -> bool:
+        """Wait until everything submitted so far has been handled; False if any of it failed to write"""
+        deadline = time.monotonic() + timeout
+        failed = self._failed.value
+        while self._processed.value + self._failed.value + self.lost < self.submitted:
+            if time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(0.01)
+        return self._failed.value == failed
+    
+    def _pending(self) -> int:
+        """Records waiting in the queue (approximate)"""
+        try:
+            return self._queue.qsize()
+        except NotImplementedError:
+            return 0
+    
+    async def stop(self, timeout: float = 10.0):
+        """Let the writer drain the queue and exit"""
+        if self._monitor_task is not None:
+            self._monitor_task.cancel()
+            self._monitor_task = None
+        
+        if self._process is None:
+            return
+        
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._process.join, timeout)
+        if self._process.is_alive():
+            self.logger.error("Log writer did not exit in time, terminating")
+            self._process.terminate()
+        self._queue.close()
+        self._process = None
+    
+    def stats(self) -> dict:
+        """Queue and process health counters"""
+        return {
+            "alive": self._process is not None and self._process.is_alive(),
+            "pid": self._process.pid if self._process else None,
+            "queued": self._pending() if self._process else 0,
+            "submitted": self.submitted,
+            "written": self._processed.value,
+            "failed": self._failed.value,
+            "dropped": self.dropped,
+            "lost": self.lost,
+            "backpressure_waits": self.backpressure_waits,
+            "restarts": self.restarts,
+            "heartbeat_age_sec": round(time.time() - self._heartbeat.value, 3)
+        }
+
+def writer_main(record_queue, heartbeat, processed, failed, db_path: str, log_dir: str):
+    """Entry point of the writer process"""
+    try:
+        asyncio.run(_write_records(record_queue, heartbeat, processed, failed, db_path, log_dir))
+    except KeyboardInterrupt:
+        pass
+
+async def _write_records(record_queue, heartbeat, processed, failed, db_path: str, log_dir: str):
+    """Pull records in batches and persist each batch in one transaction / append per file"""
+    db = Database(db_path)
+    await db.initialize()
+    file_logger = FileLogger(log_dir)
+    logger = logging.getLogger('security_bot')
+    loop = asyncio.get_running_loop()
+    
+    while True:
+        heartbeat.value = time.time()
+        try:
+            first = await loop.run_in_executor(None, record_queue.get, True, 0.5)
+        except queue.Empty:
+            continue
+        
+        batch = [first]
+        while len(batch) < BATCH_SIZE and batch[-1] is not None:
+            try:
+                batch.append(record_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        stopping = batch[-1] is None
+        records = [record for record in batch if record is not None]
+        # Failed batches are counted apart, so they never show up as written
+        counter = processed
+        try:
+            await _persist(db, file_logger, records)
+        except Exception as e:
+            logger.error(f"Log writer failed to persist {len(records)} records: {e}")
+            counter = failed
+        
+        with counter.get_lock():
+            counter.value += len(records)
+        
+        if stopping:
+            return
+
+async def _persist(db, file_logger, records: list):
+    """Write one batch of (kind, payload) records"""
+    command_rows = []
+    deleted_rows = []
+    lines = defaultdict(list)
+    
+    for kind, payload in records:
+        timestamp = datetime.fromisoformat(payload["timestamp"])
+        if kind == 'console':
+            lines['console'].append((f"[{payload['level']}] {payload['message']}", timestamp))
+        elif kind == 'command':
+            command_rows.append((
+                payload["guild_id"], payload["channel_id"], payload["user_id"],
+                payload["command"], payload["args"], payload["success"], payload["error"]
+            ))
+            lines['commands'].append((file_logger.format_json(payload), timestamp))
+        elif kind == 'deleted':
+            deleted_rows.append((
+                payload["message_id"], payload["channel_id"], payload["guild_id"],
+                payload["author_id"], payload["content"], str(payload["attachments"])
+            ))
+            lines['deleted'].append((file_logger.format_json(payload), timestamp))
+    
+    if command_rows or deleted_rows:
+        await db.write_log_batch(command_rows, deleted_rows)
+    
+    for log_type, entries in lines.items():
+        await file_logger.write_log_batch(log_type, entries)
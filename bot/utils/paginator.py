@@ -0,0 +1,185 @@
+import discord
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+# fetch_page(cursor) -> (embed, next_cursor); next_cursor is None on the last page
+PageFetcher = Callable[[Any], Awaitable[Tuple[discord.Embed, Optional[Any]]]]
+
+class KeysetPaginator(discord.ui.View):
+    """Button navigation over keyset-paginated results; only the page being shown is fetched"""
+    
+    def __init__(self, fetch_page: PageFetcher, author_id: int, first_cursor: Any = None, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.fetch_page = fetch_page
+        self.author_id = author_id
+        self.message = None
+        
+        # Cursors of the pages before the current one, so Previous can walk back
+        self.history = []
+        self.cursor = first_cursor
+        self.next_cursor = None
+    
+    async def start(self, ctx) -> discord.Message:
+        """Send the first page"""
+        embed, self.next_cursor = await self.fetch_page(self.cursor)
+        self.update_buttons()
+        
+        # Single pages don't need navigation
+        if self.next_cursor is None:
+            self.stop()
+            self.message = await ctx.send(embed=embed)
+        else:
+            self.message = await ctx.send(embed=embed, view=self)
+        return self.message
+    
+    def update_buttons(self):
+        """Enable the buttons that lead somewhere"""
+        self.previous_page.disabled = not self.history
+        self.next_page.disabled = self.next_cursor is None
+    
+    async def show(self, interaction: discord.Interaction, cursor: Any):
+        """Fetch and display the page starting at cursor"""
+        self.cursor = cursor
+        embed, self.next_cursor = await self.fetch_page(cursor)
+        self.update_buttons()
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Only the user who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(label="Previous", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.history.pop())
+    
+    @discord.ui.button(label="Next", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.history.append(self.cursor)
+        await self.show(interaction, self.next_cursor)
+    
+    async def on_timeout(self):
+        """Disable navigation once the view expires"""
+        for item in self.children:
+            item.disabled = True
+        
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+class JumpToPageModal(discord.ui.Modal, title="Jump to page"):
+    """Asks which page of a log to show"""
+    page = discord.ui.TextInput(label="Page number (1 = newest)", placeholder="1", max_length=6)
+    
+    def __init__(self, viewer: "LogPaginator"):
+        super().__init__()
+        self.viewer = viewer
+    
+    async def on_submit(self, interaction: discord.Interaction):
+        if not self.page.value.isdigit() or int(self.page.value) < 1:
+            await interaction.response.send_message("❌ Enter a page number of 1 or more.", ephemeral=True)
+            return
+        await self.viewer.show(interaction, int(self.page.value) - 1)
+
+class LogPaginator(discord.ui.View):
+    """Pages through a day's log file via FileLogger paging sessions"""
+    
+    def __init__(self, file_logger, log_type: str, date, author_id: int, render: Callable[[dict], discord.Embed],
+                 dates: list = None, max_lines: int = 15, timeout: float = 600):
+        super().__init__(timeout=timeout)
+        self.file_logger = file_logger
+        self.log_type = log_type
+        self.author_id = author_id
+        self.render = render
+        self.max_lines = max_lines
+        self.message = None
+        self.page = 0
+        self.has_older = False
+        self.session_id = file_logger.open_session(log_type, date)
+        
+        # Discord caps select menus at 25 options
+        dates = (dates or [])[:25]
+        if dates:
+            selected = self.file_logger.sessions[self.session_id]["date"]
+            self.date_select.options = [
+                discord.SelectOption(label=day, value=day, default=day == selected) for day in dates
+            ]
+        else:
+            self.remove_item(self.date_select)
+    
+    async def fetch(self, page: int):
+        """Read a page and render it; None if the paging session has expired"""
+        data = await self.file_logger.read_page(self.session_id, page, self.max_lines)
+        if data is None:
+            return None
+        
+        self.page = data["page"]
+        self.has_older = data["has_older"]
+        self.newer_page.disabled = self.page == 0
+        self.older_page.disabled = not self.has_older
+        self.jump_page.disabled = self.page == 0 and not self.has_older
+        return self.render(data)
+    
+    async def start(self, ctx) -> discord.Message:
+        """Send the newest page"""
+        embed = await self.fetch(0)
+        self.message = await ctx.send(embed=embed, view=self)
+        return self.message
+    
+    async def show(self, interaction: discord.Interaction, page: int):
+        """Display a page in response to a button or modal"""
+        embed = await self.fetch(page)
+        if embed is None:
+            await self.expire(interaction)
+            return
+        await interaction.response.edit_message(embed=embed, view=self)
+    
+    async def expire(self, interaction: discord.Interaction):
+        """Tell the user the paging session is gone and shut the view down"""
+        self.stop()
+        for item in self.children:
+            item.disabled = True
+        await interaction.response.edit_message(view=self)
+        await interaction.followup.send("⌛ This log view has expired. Run the command again.", ephemeral=True)
+    
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if interaction.user.id != self.author_id:
+            await interaction.response.send_message("❌ Only the user who ran this command can change pages.", ephemeral=True)
+            return False
+        return True
+    
+    @discord.ui.button(label="Newer", emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def newer_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, max(0, self.page - 1))
+    
+    @discord.ui.button(label="Older", emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def older_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
+    
+    @discord.ui.button(label="Jump", emoji="🔢", style=discord.ButtonStyle.primary)
+    async def jump_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(JumpToPageModal(self))
+    
+    @discord.ui.select(placeholder="Choose a date")
+    async def date_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        date = datetime.strptime(select.values[0], '%Y-%m-%d')
+        self.file_logger.close_session(self.session_id)
+        self.session_id = self.file_logger.open_session(self.log_type, date)
+        for option in select.options:
+            option.default = option.value == select.values[0]
+        await self.show(interaction, 0)
+    
+    async def on_timeout(self):
+        """Release the paging session and disable navigation"""
+        self.file_logger.close_session(self.session_id)
+        for item in self.children:
+            item.disabled = True
+        
+        if self.message:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
@@ -6,6 +6,8 @@ from database import Database
 class PermissionManager:
     def __init__(self, database: Database):
         self.db = database
+        # Bumped on every whitelist change so cached views of it can tell they are stale
+        self.whitelist_versions = {}
     
     async def check_whitelist(self, ctx: commands.Context, required_permissions: List[str] = None) -> bool:
         """Check if user is whitelisted and has required permissions"""
@@ -40,22 +42,42 @@ class PermissionManager:
     async def add_user_to_whitelist(self, guild_id: str, user_id: str, permissions: List[str], added_by: str):
         """Add user to whitelist"""
         await self.db.add_to_whitelist('user', user_id, guild_id, permissions, added_by)
+        self.bump_whitelist_version(guild_id)
     
     async def add_role_to_whitelist(self, guild_id: str, role_id: str, permissions: List[str], added_by: str):
         """Add role to whitelist"""
         await self.db.add_to_whitelist('role', role_id, guild_id, permissions, added_by)
+        self.bump_whitelist_version(guild_id)
     
     async def remove_user_from_whitelist(self, guild_id: str, user_id: str):
         """Remove user from whitelist"""
         await self.db.remove_from_whitelist('user', user_id, guild_id)
+        self.bump_whitelist_version(guild_id)
     
     async def remove_role_from_whitelist(self, guild_id: str, role_id: str):
         """Remove role from whitelist"""
         await self.db.remove_from_whitelist('role', role_id, guild_id)
+        self.bump_whitelist_version(guild_id)
     
     async def get_whitelist_entries(self, guild_id: str):
         """Get all whitelist entries for a guild"""
         return await self.db.get_whitelist(guild_id)
+    
+    async def get_whitelist_page(self, guild_id: str, after_id: int = 0, limit: int = 10):
+        """Get one page of whitelist entries, keyed on the last entry id seen"""
+        return await self.db.get_whitelist_page(guild_id, after_id, limit)
+    
+    async def count_whitelist_entries(self, guild_id: str) -> int:
+        """Count whitelist entries for a guild"""
+        return await self.db.count_whitelist(guild_id)
+    
+    def bump_whitelist_version(self, guild_id: str):
+        """Mark a guild's whitelist as changed"""
+        self.whitelist_versions[guild_id] = self.whitelist_versions.get(guild_id, 0) + 1
+    
+    def get_whitelist_version(self, guild_id: str) -> int:
+        """Current change counter for a guild's whitelist"""
+        return self.whitelist_versions.get(guild_id, 0)
 
 def whitelist_required(permissions: List[str] = None):
     """Decorator to check if user is whitelisted with required permissions"""
@@ -117,6 +139,7 @@ class Permissions:
     # Logging
     VIEW_LOGS = "view_logs"
     CLEAR_LOGS = "clear_logs"
+    EXPORT_LOGS = "export_logs"
     
     # Special permissions
     ALL = "*"  # All permissions
@@ -127,5 +150,5 @@ class Permissions:
         return [
             cls.SNIPE, cls.DRAG, cls.NSFW, cls.MANAGE_ROLES, cls.MANAGE_CHANNELS,
             cls.MANAGE_WHITELIST, cls.VIEW_WHITELIST, cls.MANAGE_CONFIG, cls.VIEW_CONFIG,
-            cls.VIEW_LOGS, cls.CLEAR_LOGS
+            cls.VIEW_LOGS, cls.CLEAR_LOGS, cls.EXPORT_LOGS
         ]
@@ -0,0 +1,56 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+# discord.py already waits out 429s per route; this keeps bulk jobs from bursting
+# into them in the first place and leaves headroom for everything else the bot does
+class RateLimitedExecutor:
+    """Runs REST-bound coroutines with bounded concurrency and a token-bucket rate limit"""
+    
+    def __init__(self, concurrency: int = 5, rate: float = 10, per: float = 1.0):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.per = per
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._bucket_lock = asyncio.Lock()
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+    
+    async def acquire(self):
+        """Wait for a token from the bucket"""
+        async with self._bucket_lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.per)
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) * self.per / self.rate)
+    
+    async def submit(self, func: Callable[..., Awaitable], *args, **kwargs):
+        """Run one call once a concurrency slot and a token are free"""
+        async with self._semaphore:
+            await self.acquire()
+            return await func(*args, **kwargs)
+    
+    async def map(self, func: Callable[..., Awaitable], items: Iterable,
+                  on_result: Optional[Callable] = None) -> List[Tuple[object, Optional[Exception]]]:
+        """Call func(item) for every item; returns (item, error) pairs in completion order"""
+        results = []
+        
+        async def run(item):
+            error = None
+            try:
+                await self.submit(func, item)
+            except Exception as e:
+                error = e
+            
+            results.append((item, error))
+            if on_result:
+                on_result(item, error)
+        
+        await asyncio.gather(*(run(item) for item in items))
+        return results
@@ -0,0 +1,300 @@
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Shared per-worker slot: batch id, group index, rule id, when the current evaluation started (0 while idle)
+SLOT_SIZE = 4
+
+def compile_rule(pattern: str, max_length: int = 200):
+    """Validate an admin-supplied pattern; raises ValueError with a readable reason"""
+    if not pattern or len(pattern) > max_length:
+        raise ValueError(f"Patterns must be 1-{max_length} characters")
+    try:
+        return re.compile(pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid regex: {e}")
+
+class RuleMatch(NamedTuple):
+    rule_id: int
+    start: int
+    end: int
+
+class RuleStats:
+    """Cost and outcome counters for one rule since the bot started"""
+    __slots__ = ('evals', 'seconds', 'worst', 'hits', 'timeouts')
+    
+    def __init__(self):
+        self.evals = 0
+        self.seconds = 0.0
+        self.worst = 0.0
+        self.hits = 0
+        self.timeouts = 0
+
+class RuleTimeout(Exception):
+    """One rule ran past the per-evaluation timeout on one message"""
+    
+    def __init__(self, group_index: int, rule_id: int):
+        super().__init__(f"rule {rule_id} timed out")
+        self.group_index = group_index
+        self.rule_id = rule_id
+
+class RegexRuleEngine:
+    """Runs guilds' regex rules in worker processes, in batches, killing any evaluation that runs too long"""
+    
+    def __init__(self, workers: int = 2, batch_size: int = 50, batch_delay: float = 0.05, timeout: float = 0.25,
+                 strikes: int = 3, max_pending: int = 5000,
+                 on_disable: Optional[Callable[[int, int, 'RuleStats'], Awaitable[None]]] = None):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.timeout = timeout
+        self.strikes = strikes
+        self.max_pending = max_pending
+        self.on_disable = on_disable
+        self.logger = logging.getLogger('security_bot')
+        
+        self._context = multiprocessing.get_context('spawn')
+        self._pool = None
+        self._slots = None
+        self._flush_handle = None
+        self._tasks = set()
+        # (guild_id, rules, content, future) waiting for a batch
+        self.pending = []
+        self.in_flight = 0
+        
+        # (guild_id, rule_id) -> counters
+        self.stats: Dict[Tuple[int, int], RuleStats] = {}
+        # Rules switched off for timing out, skipped even before the stored list catches up
+        self.disabled = set()
+        self.batches = 0
+        self.restarts = 0
+        self.skipped = 0
+    
+    def check(self, guild_id: int, rules: Tuple[Tuple[int, str], ...], content: str) -> asyncio.Future:
+        """Queue a message against a guild's (rule_id, pattern) rules; resolves to the first RuleMatch or None"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if len(self.pending) >= self.max_pending:
+            # Workers can't keep up; let messages through rather than queue without bound
+            self.skipped += 1
+            future.set_result(None)
+            return future
+        
+        self.pending.append((guild_id, rules, content, future))
+        if len(self.pending) >= self.batch_size:
+            self._dispatch()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_delay, self._dispatch)
+        return future
+    
+    def _dispatch(self):
+        """Send pending messages to free workers, one batch each"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        loop = asyncio.get_running_loop()
+        while self.pending and self.in_flight < self.workers:
+            batch, self.pending = self.pending[:self.batch_size], self.pending[self.batch_size:]
+            self.in_flight += 1
+            task = loop.create_task(self._run(batch), name='regex-rules-batch')
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        # Anything left goes out as soon as a batch comes back
+    
+    async def _run(self, batch: list):
+        # Messages with the same guild rules share one group, so the worker looks their patterns up once
+        groups: Dict[Tuple[int, tuple], list] = {}
+        for index, (guild_id, rules, content, _future) in enumerate(batch):
+            groups.setdefault((guild_id, rules), []).append((index, content))
+        keys = list(groups)
+        skip = set()
+        results = {}
+        
+        try:
+            # A timeout or a pool restarted by another batch gets a retry without the offending rule
+            for _attempt in range(3):
+                excluded = self.disabled | skip
+                payload = [
+                    (tuple(rule for rule in rules if (guild_id, rule[0]) not in excluded), groups[(guild_id, rules)])
+                    for guild_id, rules in keys
+                ]
+                try:
+                    hits, costs = await self._evaluate(payload)
+                except RuleTimeout as e:
+                    guild_id = keys[e.group_index][0]
+                    skip.add((guild_id, e.rule_id))
+                    await self._strike(guild_id, e.rule_id)
+                    continue
+                except BrokenProcessPool:
+                    continue
+                
+                for group_index, rule_costs in enumerate(costs):
+                    guild_id = keys[group_index][0]
+                    for rule_id, evals, seconds, worst in rule_costs:
+                        stats = self.stats.get((guild_id, rule_id))
+                        if stats is None:
+                            stats = self.stats[(guild_id, rule_id)] = RuleStats()
+                        stats.evals += evals
+                        stats.seconds += seconds
+                        stats.worst = max(stats.worst, worst)
+                for group_index, index, rule_id, start, end in hits:
+                    self.stats[(keys[group_index][0], rule_id)].hits += 1
+                    results[index] = RuleMatch(rule_id, start, end)
+                break
+        except Exception as e:
+            self.logger.error(f"Regex rule batch failed: {e}")
+        finally:
+            for index, (_guild_id, _rules, _content, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(results.get(index))
+            self.in_flight -= 1
+            if self.pending:
+                self._dispatch()
+    
+    async def _evaluate(self, payload: list):
+        """Run one batch in the pool, watching the worker's slot for an evaluation past the timeout"""
+        pool = self._ensure_pool()
+        self.batches += 1
+        batch_id = self.batches
+        future = asyncio.wrap_future(pool.submit(evaluate_batch, batch_id, payload))
+        # Killing the pool fails this future too; nothing else will read that error
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        
+        while True:
+            done, _ = await asyncio.wait({future}, timeout=self.timeout / 2)
+            if done:
+                return future.result()
+            overrun = self._find_overrun(batch_id)
+            if overrun is not None:
+                self._kill_pool(pool)
+                raise RuleTimeout(*overrun)
+    
+    def _find_overrun(self, batch_id: int) -> Optional[Tuple[int, int]]:
+        """(group index, rule id) of an evaluation of this batch running past the timeout"""
+        slots = self._slots
+        now = time.time()
+        for base in range(0, len(slots), SLOT_SIZE):
+            started = slots[base + 3]
+            if slots[base] == batch_id and started and now - started > self.timeout:
+                return int(slots[base + 1]), int(slots[base + 2])
+        return None
+    
+    async def _strike(self, guild_id: int, rule_id: int):
+        """Count a timeout against a rule and switch it off once it has too many"""
+        stats = self.stats.get((guild_id, rule_id))
+        if stats is None:
+            stats = self.stats[(guild_id, rule_id)] = RuleStats()
+        stats.timeouts += 1
+        # The killed evaluation cost at least the timeout
+        stats.evals += 1
+        stats.seconds += self.timeout
+        stats.worst = max(stats.worst, self.timeout)
+        self.logger.warning(f"Regex rule {rule_id} in {guild_id} timed out ({stats.timeouts}/{self.strikes})")
+        
+        if stats.timeouts >= self.strikes and (guild_id, rule_id) not in self.disabled:
+            self.disabled.add((guild_id, rule_id))
+            if self.on_disable:
+                try:
+                    await self.on_disable(guild_id, rule_id, stats)
+                except Exception as e:
+                    self.logger.error(f"Couldn't disable regex rule {rule_id} in {guild_id}: {e}")
+    
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._slots = self._context.RawArray('d', SLOT_SIZE * self.workers)
+            claimed = self._context.Value('i', 0)
+            self._pool = ProcessPoolExecutor(
+                self.workers, mp_context=self._context, initializer=_init_worker, initargs=(self._slots, claimed)
+            )
+        return self._pool
+    
+    def _kill_pool(self, pool: ProcessPoolExecutor):
+        """Terminate the workers; a running regex can't be interrupted any other way"""
+        if pool is not self._pool:
+            return
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self.restarts += 1
+    
+    async def stop(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        for _guild_id, _rules, _content, future in self.pending:
+            if not future.done():
+                future.set_result(None)
+        self.pending = []
+        
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._kill_pool(self._pool)
+    
+    def forget(self, guild_id: int, rule_id: int):
+        """Drop a removed or re-enabled rule's counters"""
+        self.stats.pop((guild_id, rule_id), None)
+        self.disabled.discard((guild_id, rule_id))
+
+# Worker process state
+_slots = None
+_slot = None
+_compiled: Dict[tuple, list] = {}
+
+def _init_worker(slots, claimed):
+    global _slots, _slot
+    with claimed.get_lock():
+        index = claimed.value
+        claimed.value += 1
+    if (index + 1) * SLOT_SIZE <= len(slots):
+        _slots = slots
+        _slot = index * SLOT_SIZE
+
+def evaluate_batch(batch_id: int, groups: List[Tuple[tuple, list]]):
+    """Worker entry point: first matching rule per message, and what each rule cost"""
+    slots, base = _slots, _slot
+    if slots is not None:
+        slots[base] = batch_id
+    hits = []
+    costs = []
+    
+    for group_index, (rules, messages) in enumerate(groups):
+        compiled = _compiled.get(rules)
+        if compiled is None:
+            if len(_compiled) >= 256:
+                _compiled.clear()
+            compiled = _compiled[rules] = [(rule_id, re.compile(pattern, re.IGNORECASE)) for rule_id, pattern in rules]
+        # Per rule: evaluations, CPU seconds, slowest evaluation
+        rule_costs = [[rule_id, 0, 0.0, 0.0] for rule_id, _regex in compiled]
+        
+        for index, content in messages:
+            for position, (rule_id, regex) in enumerate(compiled):
+                if slots is not None:
+                    slots[base + 1] = group_index
+                    slots[base + 2] = rule_id
+                    slots[base + 3] = time.time()
+                start = time.thread_time()
+                match = regex.search(content)
+                elapsed = time.thread_time() - start
+                cost = rule_costs[position]
+                cost[1] += 1
+                cost[2] += elapsed
+                if elapsed > cost[3]:
+                    cost[3] = elapsed
+                if match:
+                    hits.append((group_index, index, rule_id, match.start(), match.end()))
+                    break
+        costs.append([tuple(cost) for cost in rule_costs])
+    
+    if slots is not None:
+        slots[base + 3] = 0.0
+    return hits, costs
@@ -0,0 +1,255 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timezone
+import discord
+from utils.rate_limit import RateLimitedExecutor
+
+class RoleJobManager:
+    """Runs bulk role changes as background jobs that are checkpointed in SQLite and resume after restarts"""
+    
+    def __init__(self, bot):
+        self.bot = bot
+        self.db = bot.db
+        self.logger = logging.getLogger('security_bot')
+        # job_id -> asyncio.Task for jobs running in this process
+        self.tasks = {}
+        # job_id -> live counters and rate for progress/ETA
+        self.progress = {}
+    
+    async def create_job(self, guild: discord.Guild, role: discord.Role, action: str, filters: dict,
+                         created_by: int, channel: discord.abc.Messageable = None) -> int:
+        """Persist a new job and start it"""
+        job_id = await self.db.create_role_job(
+            str(guild.id), str(role.id), action, filters, str(created_by),
+            str(channel.id) if channel else None
+        )
+        self.start(await self.db.get_role_job(job_id))
+        return job_id
+    
+    def start(self, job: dict):
+        """Run a job in the background unless it is already running here"""
+        if job["id"] in self.tasks:
+            return
+        
+        task = asyncio.create_task(self.run(job), name=f"role-job-{job['id']}")
+        self.tasks[job["id"]] = task
+        task.add_done_callback(lambda _: self.tasks.pop(job["id"], None))
+    
+    async def resume(self):
+        """Restart jobs that were pending or running when the bot last stopped"""
+        for job in await self.db.get_unfinished_role_jobs():
+            if job["id"] not in self.tasks:
+                self.logger.info(f"Resuming role job #{job['id']} from member {job['checkpoint_id']}")
+                self.start(job)
+    
+    async def cancel(self, job_id: int) -> bool:
+        """Cancel a job; returns False if it had already finished"""
+        job = await self.db.get_role_job(job_id)
+        if not job or job["status"] not in ('pending', 'running'):
+            return False
+        
+        await self.db.update_role_job(job_id, status='cancelled')
+        task = self.tasks.get(job_id)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.report_progress(job_id, force=True)
+        return True
+    
+    async def stop(self):
+        """Stop running jobs without changing their status, so they resume on the next start"""
+        tasks = list(self.tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    @staticmethod
+    def matches(member: discord.Member, filters: dict) -> bool:
+        """Check a member against a job's filters"""
+        if member.bot and not filters.get("include_bots"):
+            return False
+        
+        if filters.get("has_role") and not member.get_role(int(filters["has_role"])):
+            return False
+        
+        joined_at = member.joined_at
+        if filters.get("joined_after"):
+            if not joined_at or joined_at < datetime.fromisoformat(filters["joined_after"]):
+                return False
+        if filters.get("joined_before"):
+            if not joined_at or joined_at >= datetime.fromisoformat(filters["joined_before"]):
+                return False
+        
+        return True
+    
+    @staticmethod
+    def parse_date(value: str) -> str:
+        """Turn a YYYY-MM-DD filter value into a UTC ISO timestamp"""
+        return datetime.strptime(value, '%Y-%m-%d').replace(tzinfo=timezone.utc).isoformat()
+    
+    async def run(self, job: dict):
+        """Work through a job's members in id order, checkpointing after each batch"""
+        job_id = job["id"]
+        config = self.bot.config
+        
+        guild = self.bot.get_guild(int(job["guild_id"]))
+        role = guild.get_role(int(job["role_id"])) if guild else None
+        if not role:
+            await self.db.update_role_job(job_id, status='failed', error_message="Guild or role no longer exists")
+            return
+        
+        try:
+            if not guild.chunked:
+                await guild.chunk()
+            
+            filters = json.loads(job["filters"] or '{}')
+            checkpoint = int(job["checkpoint_id"] or 0)
+            remaining = sorted(
+                (member for member in guild.members if member.id > checkpoint and self.matches(member, filters)),
+                key=lambda member: member.id
+            )
+            
+            counters = {key: job[key] for key in ('processed', 'changed', 'skipped', 'failed')}
+            counters["total"] = job["processed"] + len(remaining)
+            self.progress[job_id] = {
+                **counters, "started": time.monotonic(), "processed_at_start": job["processed"], "last_report": 0.0
+            }
+            await self.db.update_role_job(job_id, status='running', total=counters["total"])
+            await self.report_progress(job_id, force=True)
+            
+            adding = job["action"] == 'add'
+            reason = f"Bulk role job #{job_id}"
+            executor = RateLimitedExecutor(config.ROLE_JOB_CONCURRENCY, config.ROLE_JOB_RATE, config.ROLE_JOB_PER)
+            
+            async def apply(member):
+                if adding:
+                    await member.add_roles(role, reason=reason)
+                else:
+                    await member.remove_roles(role, reason=reason)
+            
+            for start in range(0, len(remaining), config.ROLE_JOB_BATCH):
+                batch = remaining[start:start + config.ROLE_JOB_BATCH]
+                
+                # Members already in the target state cost nothing
+                pending = [member for member in batch if (member.get_role(role.id) is None) == adding]
+                counters["skipped"] += len(batch) - len(pending)
+                
+                for member, error in await executor.map(apply, pending):
+                    counters["failed" if error else "changed"] += 1
+                counters["processed"] += len(batch)
+                
+                await self.db.update_role_job(
+                    job_id,
+                    processed=counters["processed"],
+                    changed=counters["changed"],
+                    skipped=counters["skipped"],
+                    failed=counters["failed"],
+                    checkpoint_id=str(batch[-1].id)
+                )
+                self.progress[job_id].update(counters)
+                await self.report_progress(job_id)
+            
+            await self.db.update_role_job(job_id, status='completed')
+            await self.report_progress(job_id, force=True)
+            
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Role job #{job_id} failed: {e}")
+            await self.db.update_role_job(job_id, status='failed', error_message=str(e))
+            await self.report_progress(job_id, force=True)
+        finally:
+            self.progress.pop(job_id, None)
+    
+    def estimate(self, job_id: int):
+        """Members per second and seconds remaining for a running job"""
+        progress = self.progress.get(job_id)
+        if not progress:
+            return None, None
+        
+        elapsed = time.monotonic() - progress["started"]
+        done = progress["processed"] - progress["processed_at_start"]
+        if not done or not elapsed:
+            return None, None
+        
+        rate = done / elapsed
+        return rate, (progress["total"] - progress["processed"]) / rate
+    
+    async def report_progress(self, job_id: int, force: bool = False):
+        """Edit the job's progress message, at most every ROLE_JOB_PROGRESS_INTERVAL seconds"""
+        progress = self.progress.get(job_id)
+        now = time.monotonic()
+        if progress and not force and now - progress["last_report"] < self.bot.config.ROLE_JOB_PROGRESS_INTERVAL:
+            return
+        if progress:
+            progress["last_report"] = now
+        
+        job = await self.db.get_role_job(job_id)
+        if not job or not job["channel_id"]:
+            return
+        
+        channel = self.bot.get_channel(int(job["channel_id"]))
+        if not channel:
+            return
+        
+        embed = self.create_job_embed(job)
+        try:
+            if job["message_id"]:
+                await channel.get_partial_message(int(job["message_id"])).edit(embed=embed)
+            else:
+                message = await channel.send(embed=embed)
+                await self.db.update_role_job(job_id, message_id=str(message.id))
+        except discord.NotFound:
+            message = await channel.send(embed=embed)
+            await self.db.update_role_job(job_id, message_id=str(message.id))
+        except discord.HTTPException as e:
+            self.logger.error(f"Failed to update progress for role job #{job_id}: {e}")
+    
+    def create_job_embed(self, job: dict) -> discord.Embed:
+        """Render a job's status and progress"""
+        colors = {
+            'pending': discord.Color.light_grey(),
+            'running': discord.Color.blue(),
+            'completed': discord.Color.green(),
+            'cancelled': discord.Color.orange(),
+            'failed': discord.Color.red()
+        }
+        verb = "Add" if job["action"] == 'add' else "Remove"
+        total = job["total"] or 0
+        percent = job["processed"] / total * 100 if total else 0.0
+        
+        embed = discord.Embed(
+            title=f"Role Job #{job['id']}",
+            description=f"{verb} <@&{job['role_id']}> • **{job['status'].title()}**",
+            color=colors.get(job["status"], discord.Color.blue()),
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="Progress", value=f"{job['processed']:,}/{total:,} ({percent:.0f}%)", inline=True)
+        embed.add_field(name="Changed", value=f"{job['changed']:,}", inline=True)
+        embed.add_field(name="Skipped", value=f"{job['skipped']:,}", inline=True)
+        embed.add_field(name="Failed", value=f"{job['failed']:,}", inline=True)
+        
+        rate, eta = self.estimate(job["id"])
+        if job["status"] == 'running' and rate:
+            embed.add_field(name="Rate / ETA", value=f"{rate:.1f}/s • ~{int(eta // 60)}m {int(eta % 60)}s", inline=True)
+        
+        filters = json.loads(job["filters"] or '{}')
+        described = []
+        if filters.get("has_role"):
+            described.append(f"has <@&{filters['has_role']}>")
+        if filters.get("joined_after"):
+            described.append(f"joined after {filters['joined_after'][:10]}")
+        if filters.get("joined_before"):
+            described.append(f"joined before {filters['joined_before'][:10]}")
+        if filters.get("include_bots"):
+            described.append("including bots")
+        embed.add_field(name="Filters", value=", ".join(described) or "All members", inline=False)
+        embed.add_field(name="Started By", value=f"<@{job['created_by']}>", inline=True)
+        
+        if job["error_message"]:
+            embed.add_field(name="Error", value=job["error_message"][:1024], inline=False)
+        
+        embed.set_footer(text="Role Job")
+        return embed
@@ -0,0 +1,130 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import discord
+from utils.batch_writer import BatchWriter
+
+class VoiceIndex:
+    """In-memory channel -> members and member -> channel maps, kept current from voice state updates"""
+    
+    def __init__(self):
+        # guild_id -> channel_id -> {member_id: joined_at}
+        self.channels: Dict[int, Dict[int, Dict[int, datetime]]] = {}
+        # guild_id -> {member_id: channel_id}
+        self.members: Dict[int, Dict[int, int]] = {}
+    
+    def join(self, guild_id: int, channel_id: int, member_id: int, joined_at: datetime):
+        """Record a member entering a channel"""
+        self.channels.setdefault(guild_id, {}).setdefault(channel_id, {})[member_id] = joined_at
+        self.members.setdefault(guild_id, {})[member_id] = channel_id
+    
+    def leave(self, guild_id: int, member_id: int):
+        """Remove a member; returns (channel_id, joined_at) or None if they weren't tracked"""
+        channel_id = self.members.get(guild_id, {}).pop(member_id, None)
+        if channel_id is None:
+            return None
+        
+        occupants = self.channels[guild_id][channel_id]
+        joined_at = occupants.pop(member_id)
+        if not occupants:
+            del self.channels[guild_id][channel_id]
+        return channel_id, joined_at
+    
+    def update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState) -> List[dict]:
+        """Apply a voice state update; returns the sessions it finished"""
+        guild_id = member.guild.id
+        after_id = after.channel.id if after.channel else None
+        
+        # Mute/deafen/stream changes keep the member where they are
+        if after_id is not None and self.channel_of(guild_id, member.id) == after_id:
+            return []
+        
+        now = datetime.now(timezone.utc)
+        finished = []
+        previous = self.leave(guild_id, member.id)
+        if previous:
+            channel_id, joined_at = previous
+            finished.append(self.session(guild_id, member.id, channel_id, joined_at, now,
+                                         'moved' if after_id else 'left', after_id))
+        if after_id is not None:
+            self.join(guild_id, after_id, member.id, now)
+        return finished
+    
+    def rebuild(self, guild: discord.Guild) -> List[dict]:
+        """Reconcile the index with the gateway cache (after connecting or resuming); returns sessions it closed"""
+        now = datetime.now(timezone.utc)
+        actual = {
+            member.id: member.voice.channel.id
+            for member in guild.members if member.voice and member.voice.channel
+        }
+        
+        finished = []
+        for member_id, channel_id in list(self.members.get(guild.id, {}).items()):
+            if actual.get(member_id) != channel_id:
+                _, joined_at = self.leave(guild.id, member_id)
+                finished.append(self.session(guild.id, member_id, channel_id, joined_at, now, 'left'))
+        
+        # Anyone already connected is tracked from now; their real join time is unknown
+        for member_id, channel_id in actual.items():
+            if self.channel_of(guild.id, member_id) is None:
+                self.join(guild.id, channel_id, member_id, now)
+        return finished
+    
+    def close_all(self, guild_id: Optional[int] = None, reason: str = 'shutdown') -> List[dict]:
+        """End every open session (for one guild or all of them) and forget it"""
+        now = datetime.now(timezone.utc)
+        finished = []
+        for current_guild in [guild_id] if guild_id is not None else list(self.members):
+            for member_id, channel_id in list(self.members.get(current_guild, {}).items()):
+                _, joined_at = self.leave(current_guild, member_id)
+                finished.append(self.session(current_guild, member_id, channel_id, joined_at, now, reason))
+            self.members.pop(current_guild, None)
+            self.channels.pop(current_guild, None)
+        return finished
+    
+    def channel_of(self, guild_id: int, member_id: int) -> Optional[int]:
+        """The voice channel a member is in, if any"""
+        return self.members.get(guild_id, {}).get(member_id)
+    
+    def members_in(self, guild_id: int, channel_id: int) -> Dict[int, datetime]:
+        """{member_id: joined_at} for one channel"""
+        return dict(self.channels.get(guild_id, {}).get(channel_id, {}))
+    
+    def connected(self, guild_id: int) -> Dict[int, int]:
+        """{member_id: channel_id} for everyone in voice in a guild"""
+        return dict(self.members.get(guild_id, {}))
+    
+    def occupancy(self, guild_id: int) -> Dict[int, Dict[int, datetime]]:
+        """{channel_id: {member_id: joined_at}} for every occupied channel"""
+        return {channel_id: dict(occupants) for channel_id, occupants in self.channels.get(guild_id, {}).items()}
+    
+    @staticmethod
+    def session(guild_id: int, member_id: int, channel_id: int, joined_at: datetime, left_at: datetime,
+                end_reason: str, moved_to: Optional[int] = None) -> dict:
+        """A finished session as stored in voice_sessions"""
+        return {
+            "guild_id": str(guild_id),
+            "user_id": str(member_id),
+            "channel_id": str(channel_id),
+            "joined_at": joined_at.isoformat(),
+            "left_at": left_at.isoformat(),
+            "duration_seconds": int((left_at - joined_at).total_seconds()),
+            "end_reason": end_reason,
+            "moved_to": str(moved_to) if moved_to else None
+        }
+
+class VoiceSessionRecorder(BatchWriter):
+    """Buffers finished voice sessions and writes them to SQLite in batches"""
+    
+    def __init__(self, db, batch_size: int = 100, flush_interval: float = 5.0, max_buffer: int = 10000):
+        super().__init__(db.add_voice_sessions, 'voice-session', batch_size, flush_interval, max_buffer)
+
+def format_duration(seconds: float) -> str:
+    """Compact duration such as 1h 5m or 42s"""
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
@@ -0,0 +1,184 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+# Upper bounds (ms) of the lag histogram buckets; anything slower lands in the overflow bucket
+LAG_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+class LoopWatchdog:
+    """Measures event loop scheduling lag and samples the loop thread's stack when it stalls"""
+    
+    def __init__(self, log_dir: str, interval: float = 0.1, threshold: float = 0.25,
+                 export_interval: float = 60.0):
+        self.log_dir = log_dir
+        self.interval = interval
+        self.threshold = threshold
+        self.export_interval = export_interval
+        self.export_path = os.path.join(log_dir, 'loop_lag.json')
+        
+        self.logger = logging.getLogger('security_bot.watchdog')
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task = None
+        self._thread = None
+        self._loop_thread_id = None
+        self._last_tick = time.monotonic()
+        self.reset()
+    
+    def reset(self):
+        """Clear collected statistics"""
+        with self._lock:
+            self.buckets = [0] * (len(LAG_BUCKETS_MS) + 1)
+            self.ticks = 0
+            self.total_lag = 0.0
+            self.max_lag = 0.0
+            self.stall_count = 0
+            self.recent_stalls = deque(maxlen=20)
+    
+    def setup_file_logging(self):
+        """Send watchdog reports to a rolling file next to the other logs"""
+        os.makedirs(self.log_dir, exist_ok=True)
+        if any(isinstance(handler, RotatingFileHandler) for handler in self.logger.handlers):
+            return
+        
+        handler = RotatingFileHandler(
+            os.path.join(self.log_dir, 'watchdog.log'), maxBytes=1024 * 1024, backupCount=5, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s', datefmt='%Y-%m-%d %H:%M:%S'))
+        self.logger.addHandler(handler)
+        self.logger.setLevel(logging.INFO)
+    
+    def start(self):
+        """Start monitoring; must be called from the event loop thread"""
+        if self._task is not None:
+            return
+        
+        self.setup_file_logging()
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._monitor(), name='loop-watchdog')
+        self._thread = threading.Thread(target=self._sampler, name='loop-watchdog-sampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop monitoring and write a final histogram export"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join(timeout=2)
+            self._thread = None
+            self.export()
+    
+    async def _monitor(self):
+        """Sleep for a fixed interval and record how late the loop woke us up"""
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - scheduled - self.interval)
+            self._last_tick = time.monotonic()
+            self.record(lag)
+    
+    def record(self, lag: float):
+        """Add one lag observation (seconds) to the histogram"""
+        lag_ms = lag * 1000
+        index = next((i for i, bound in enumerate(LAG_BUCKETS_MS) if lag_ms <= bound), len(LAG_BUCKETS_MS))
+        with self._lock:
+            self.buckets[index] += 1
+            self.ticks += 1
+            self.total_lag += lag
+            self.max_lag = max(self.max_lag, lag)
+    
+    def _sampler(self):
+        """Helper thread: sample the loop thread's stack while the loop is stalled"""
+        stall = None
+        sample_every = min(self.interval, self.threshold / 2)
+        last_export = time.monotonic()
+        
+        while not self._stop.wait(sample_every):
+            now = time.monotonic()
+            stalled_for = now - self._last_tick - self.interval
+            
+            if stalled_for >= self.threshold:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    stack = traceback.extract_stack(frame)
+                    del frame
+                    if stall is None:
+                        stall = {"started": datetime.now().isoformat(), "samples": Counter(), "stack": stack}
+                    stall["samples"][self.describe_frame(stack)] += 1
+                    stall["duration"] = stalled_for
+            elif stall is not None:
+                self.report_stall(stall)
+                stall = None
+            
+            if now - last_export >= self.export_interval:
+                self.export()
+                last_export = now
+    
+    @staticmethod
+    def describe_frame(stack: traceback.StackSummary) -> str:
+        """Name the innermost frame outside the standard library's asyncio/selectors machinery"""
+        for frame in reversed(stack):
+            if os.sep + 'asyncio' + os.sep not in frame.filename and not frame.filename.endswith('selectors.py'):
+                return f"{frame.filename}:{frame.lineno} in {frame.name}"
+        return f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}"
+    
+    def report_stall(self, stall: dict):
+        """Log a finished stall with the function that was blocking"""
+        culprit, hits = stall["samples"].most_common(1)[0]
+        total = sum(stall["samples"].values())
+        duration_ms = round(stall["duration"] * 1000)
+        
+        with self._lock:
+            self.stall_count += 1
+            self.recent_stalls.append({
+                "started": stall["started"],
+                "duration_ms": duration_ms,
+                "culprit": culprit,
+                "samples": dict(stall["samples"])
+            })
+        
+        stack_text = "".join(traceback.format_list(stall["stack"][-15:]))
+        self.logger.warning(
+            f"Event loop blocked for ~{duration_ms}ms in {culprit} ({hits}/{total} samples)\n{stack_text}"
+        )
+    
+    def snapshot(self) -> dict:
+        """Current histogram and stall summary"""
+        with self._lock:
+            labels = [f"<={bound}ms" for bound in LAG_BUCKETS_MS] + [f">{LAG_BUCKETS_MS[-1]}ms"]
+            return {
+                "generated_at": datetime.now().isoformat(),
+                "interval_ms": round(self.interval * 1000),
+                "threshold_ms": round(self.threshold * 1000),
+                "ticks": self.ticks,
+                "mean_lag_ms": round(self.total_lag / self.ticks * 1000, 3) if self.ticks else 0.0,
+                "max_lag_ms": round(self.max_lag * 1000, 3),
+                "histogram": dict(zip(labels, self.buckets)),
+                "stalls": self.stall_count,
+                "recent_stalls": list(self.recent_stalls)
+            }
+    
+    def export(self):
+        """Write the histogram to loop_lag.json in the log directory"""
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            tmp_path = self.export_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            os.replace(tmp_path, self.export_path)
+        except OSError as e:
+            self.logger.error(f"Failed to export loop lag histogram: {e}")